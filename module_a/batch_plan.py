@@ -0,0 +1,173 @@
+"""
+Batch shot planning: many briefs, one process, bounded-concurrency async Gemini calls.
+
+Input is JSONL, one brief per line, either a JSON string or an object:
+    {"id": "spring-01", "brief": "Brand: ...; Product: ...", "shot_count": 4}
+
+Each brief is planned through one shared GenerativeModel via generate_content_async,
+with at most --concurrency requests in flight. Cached plans (shot_plan_cache.py) are
+served without a call; failures and invalid replies (including a missing
+GEMINI_API_KEY) fall back to generate_shot_plan_stub for that brief only.
+Results record their "source": cache, gemini, or stub (GEMINI_STUB=1 or a fallback). Results are appended to the output
+JSONL as each brief finishes (completion order), so a long batch can be tailed.
+
+Run from repo root:
+    python -m module_a.batch_plan briefs.jsonl --out module_a/out/plans.jsonl --concurrency 8
+    GEMINI_STUB=1 GEMINI_STUB_LATENCY_S=1 python -m module_a.batch_plan briefs.jsonl   # offline
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from module_a.generate_adjson import (
+    DEFAULT_SHOT_COUNT,
+    GENERATION_CONFIG,
+    SHOT_PLANNER_PROMPT,
+    build_prompt,
+    cache_model_name,
+    clamp_shot_count,
+    current_model_name,
+    generate_shot_plan_stub,
+    get_gemini_model,
+    is_valid_shot_plan,
+    safe_extract_json,
+    shot_plan_to_adjson,
+)
+from module_a.profiling import MODES, enable as enable_profiling, profile_run
+from module_a.shot_plan_cache import ShotPlanCache
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_OUT = Path("module_a/out/plans.jsonl")
+
+
+def load_briefs(path: Path) -> List[Dict[str, Any]]:
+    jobs: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"brief": item}
+            if not item.get("brief"):
+                raise ValueError(f"{path}:{lineno}: missing 'brief'")
+            item.setdefault("id", str(lineno))
+            item["shot_count"] = clamp_shot_count(int(item.get("shot_count") or DEFAULT_SHOT_COUNT))
+            jobs.append(item)
+    return jobs
+
+
+def model_source(model: Any) -> str:
+    """Label for plans a model produced: offline stub runs must not be counted as Gemini."""
+    return "stub" if getattr(model, "is_stub", False) else "gemini"
+
+
+async def plan_one(
+    job: Dict[str, Any],
+    model: Any,
+    model_name: str,
+    sem: asyncio.Semaphore,
+    cache: Optional[ShotPlanCache],
+) -> Dict[str, Any]:
+    """Plan one brief. model=None uses get_gemini_model(); failing to get one only affects this brief."""
+    brief, shot_count = job["brief"], job["shot_count"]
+    t0 = time.perf_counter()
+    result: Dict[str, Any] = {"id": job["id"], "brief": brief, "shot_count": shot_count}
+
+    # Stub plans are cached under their own identity so a real run never serves them.
+    cache_name = cache_model_name(model_name, model)
+    key = ShotPlanCache.key(brief, shot_count, cache_name, SHOT_PLANNER_PROMPT) if cache else ""
+    shot_plan = cache.get(key) if cache else None
+    if shot_plan is not None:
+        result["source"] = "cache"
+    else:
+        try:
+            model = model or get_gemini_model(model_name)
+            async with sem:
+                resp = await model.generate_content_async(build_prompt(brief, shot_count), generation_config=GENERATION_CONFIG)
+            if not getattr(resp, "text", None):
+                raise ValueError("Empty response from Gemini.")
+            shot_plan = safe_extract_json(resp.text)
+            if not is_valid_shot_plan(shot_plan):
+                raise ValueError("Gemini returned JSON but missing 'shots'.")
+            if cache:
+                cache.put(key, shot_plan, brief=brief, shot_count=shot_count, model=cache_name)
+            result["source"] = model_source(model)
+        except Exception as e:
+            shot_plan = generate_shot_plan_stub(brief, shot_count)
+            result["source"] = "stub"
+            result["error"] = str(e)
+
+    result["seconds"] = round(time.perf_counter() - t0, 3)
+    result["shot_plan"] = shot_plan
+    result["adJson"] = shot_plan_to_adjson(shot_plan)
+    return result
+
+
+async def run_batch(
+    jobs: List[Dict[str, Any]],
+    out: TextIO,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    cache: Optional[ShotPlanCache] = None,
+    model: Any = None,
+) -> Dict[str, Any]:
+    """Plan all jobs, writing one JSON line per brief as it completes. Returns a summary."""
+    model_name = current_model_name()
+    sem = asyncio.Semaphore(max(1, concurrency))
+    counts: Dict[str, int] = {}
+
+    t0 = time.perf_counter()
+    tasks = [asyncio.create_task(plan_one(job, model, model_name, sem, cache)) for job in jobs]
+    for fut in asyncio.as_completed(tasks):
+        result = await fut
+        counts[result["source"]] = counts.get(result["source"], 0) + 1
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+        if result.get("error"):
+            print(f"⚠️ {result['id']}: fell back to stub ({result['error']})", file=sys.stderr)
+    elapsed = time.perf_counter() - t0
+
+    return {
+        "briefs": len(jobs),
+        "seconds": round(elapsed, 2),
+        "briefs_per_s": round(len(jobs) / elapsed, 2) if elapsed else None,
+        "sources": counts,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Plan many briefs concurrently from a JSONL file.")
+    parser.add_argument("briefs", help="JSONL file: one brief (string or {id, brief, shot_count}) per line")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="output JSONL ('-' for stdout)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--no-cache", action="store_true", help="skip the shot plan cache")
+    parser.add_argument("--profile", choices=MODES, help="profile the run (same as AD_PROFILE=...)")
+    args = parser.parse_args()
+    enable_profiling(args.profile)
+
+    jobs = load_briefs(Path(args.briefs))
+    cache = None if args.no_cache else ShotPlanCache.from_env()
+
+    with profile_run("batch_plan"):
+        if args.out == "-":
+            summary = asyncio.run(run_batch(jobs, sys.stdout, args.concurrency, cache))
+        else:
+            out_path = Path(args.out)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with out_path.open("w", encoding="utf-8") as f:
+                summary = asyncio.run(run_batch(jobs, f, args.concurrency, cache))
+            print(f"✅ wrote: {out_path}", file=sys.stderr)
+
+    print(f"📊 {summary['briefs']} briefs in {summary['seconds']}s "
+          f"({summary['briefs_per_s']}/s, concurrency={args.concurrency}) sources={summary['sources']}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,27 @@
 import json
 import os
-<<<<<<< HEAD
 import re
+import sys
+import threading
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
-
-import google.generativeai as genai
-from sentence_transformers import SentenceTransformer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import google.generativeai as genai
+except ImportError:  # GEMINI_STUB=1 runs (stub_llm.py) work without the SDK
+    genai = None
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # only needed to encode shot queries
+    SentenceTransformer = None
+
+from module_a.hedged_call import DeadlineExceeded, LatencyTracker, hedged_call
+from module_a.json_stream import ShotStreamParser
+from module_a.shot_plan_cache import ShotPlanCache
+from module_a.profiling import profile_run, profile_section
+from module_a.run_manifest import RunManifest, count, span
+from module_a.stage_cache import StageCache, code_version, run_stage
 
 
 # -----------------------------
@@ -16,8 +31,18 @@ from sentence_transformers import SentenceTransformer
 DEFAULT_MODEL = os.environ.get("GEMINI_MODEL", "models/gemini-flash-latest")
 DEFAULT_SHOT_COUNT = int(os.environ.get("SHOT_COUNT", "4"))  # 3-5 recommended
 DEFAULT_DURATION_MS = 2200  # per shot, keep short for demo
+EMBED_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BRIEF = "Brand: XXX; Product: drink bottle; Style: dreamy futuristic mini-world; Elements: transparent pipes, fruit, balls, ferris wheel, trees, little people"
 OUT_DIR = "module_a/out"
 
+# Latency budget for one shot plan (see plan_with_deadline). Until enough calls have
+# been observed, the hedge fires after GEMINI_HEDGE_DELAY_S; then at the p-th percentile.
+GEMINI_DEADLINE_S = float(os.environ.get("GEMINI_DEADLINE_S", "25"))
+GEMINI_HEDGE = os.environ.get("GEMINI_HEDGE", "1").strip() != "0"
+GEMINI_HEDGE_PERCENTILE = float(os.environ.get("GEMINI_HEDGE_PERCENTILE", "95"))
+GEMINI_HEDGE_DELAY_S = float(os.environ.get("GEMINI_HEDGE_DELAY_S", "8"))
+LATENCY_DIR = Path(__file__).parent / ".cache" / "gemini_latency"
+
 
 # -----------------------------
 # Prompt (IMPORTANT: no .format braces conflicts)
@@ -92,6 +117,20 @@ def write_json(path: str, data: Any) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def write_json_if_changed(path: str, data: Any) -> bool:
+    """Write data unless path already holds exactly the same JSON; True if written."""
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
 def safe_extract_json(text: str) -> Dict[str, Any]:
     """
     Best-effort JSON extraction:
@@ -123,25 +162,88 @@ def clamp_shot_count(n: int) -> int:
 # Gemini call
 # -----------------------------
 
-def call_gemini_for_shot_plan(brief: str, shot_count: int) -> Dict[str, Any]:
-    api_key = os.environ.get("GEMINI_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("Missing GEMINI_API_KEY in environment.")
+GENERATION_CONFIG = {
+    # This is the key: force JSON output
+    "response_mime_type": "application/json",
+    "temperature": 0.3,
+}
+
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
 
-    genai.configure(api_key=api_key)
-    model_name = os.environ.get("GEMINI_MODEL", DEFAULT_MODEL)
-    model = genai.GenerativeModel(model_name)
+def current_model_name() -> str:
+    return os.environ.get("GEMINI_MODEL", DEFAULT_MODEL)
 
-    prompt = SHOT_PLANNER_PROMPT.replace("{brief}", brief).replace("{shot_count}", str(shot_count))
 
-    resp = model.generate_content(
-        prompt,
-        generation_config={
-            # This is the key: force JSON output
-            "response_mime_type": "application/json",
-            "temperature": 0.3,
-        },
-    )
+def stub_enabled() -> bool:
+    return os.environ.get("GEMINI_STUB", "").strip() == "1"
+
+
+def cache_model_name(model_name: str, model: Any = None) -> str:
+    """
+    Model identity for shot plan cache keys. Stub plans (GEMINI_STUB=1, or an injected
+    StubGenerativeModel) get their own namespace, so a real Gemini run never replays them.
+    """
+    stub = getattr(model, "is_stub", False) if model is not None else stub_enabled()
+    return f"stub:{model_name}" if stub else model_name
+
+
+def get_gemini_model(model_name: Optional[str] = None) -> Any:
+    """
+    Configure the SDK once per process and reuse one GenerativeModel per model name,
+    so batch and pipeline runs don't rebuild the client for every brief.
+    """
+    model_name = model_name or current_model_name()
+    with _models_lock:
+        if model_name not in _models and stub_enabled():
+            from module_a.stub_llm import StubGenerativeModel  # offline runs / tests
+
+            _models[model_name] = StubGenerativeModel(model_name)
+        if model_name not in _models:
+            api_key = os.environ.get("GEMINI_API_KEY", "").strip()
+            if not api_key:
+                raise RuntimeError("Missing GEMINI_API_KEY in environment.")
+            if genai is None:
+                raise RuntimeError("google-generativeai is not installed (set GEMINI_STUB=1 to run offline).")
+            genai.configure(api_key=api_key)
+            _models[model_name] = genai.GenerativeModel(model_name)
+        return _models[model_name]
+
+
+def build_prompt(brief: str, shot_count: int) -> str:
+    return SHOT_PLANNER_PROMPT.replace("{brief}", brief).replace("{shot_count}", str(shot_count))
+
+
+def is_valid_shot_plan(shot_plan: Any) -> bool:
+    return isinstance(shot_plan, dict) and isinstance(shot_plan.get("shots"), list) and len(shot_plan["shots"]) > 0
+
+
+def call_gemini_for_shot_plan(brief: str, shot_count: int, cache: Optional[ShotPlanCache] = None) -> Dict[str, Any]:
+    """
+    Ask Gemini for a shot plan. Valid plans are cached (see shot_plan_cache.py), so a
+    repeated or retried brief returns without an API call; pass cache=None to skip it.
+    """
+    model_name = current_model_name()
+    cache_name = cache_model_name(model_name)
+    key = ShotPlanCache.key(brief, shot_count, cache_name, SHOT_PLANNER_PROMPT) if cache else ""
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            print("⚡ shot plan cache hit")
+            return cached
+
+    shot_plan = request_shot_plan(get_gemini_model(model_name), brief, shot_count)
+    # Only cache plans main() would accept; a malformed reply should be retried, not replayed.
+    if cache and is_valid_shot_plan(shot_plan):
+        cache.put(key, shot_plan, brief=brief, shot_count=shot_count, model=cache_name)
+    return shot_plan
+
+
+def request_shot_plan(model: Any, brief: str, shot_count: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """One uncached Gemini request, parsed to a dict."""
+    kwargs: Dict[str, Any] = {"request_options": {"timeout": timeout}} if timeout else {}
+    resp = model.generate_content(build_prompt(brief, shot_count), generation_config=GENERATION_CONFIG, **kwargs)
 
     if not getattr(resp, "text", None):
         raise ValueError("Empty response from Gemini.")
@@ -149,6 +251,109 @@ def call_gemini_for_shot_plan(brief: str, shot_count: int) -> Dict[str, Any]:
     return safe_extract_json(resp.text)
 
 
+def plan_with_deadline(
+    brief: str,
+    shot_count: int,
+    cache: Optional[ShotPlanCache] = None,
+    deadline_s: Optional[float] = None,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Shot plan within a latency budget. Returns (shot_plan, source), source being
+    "cache", "gemini", "similar" (cached plan for a similar brief) or "stub".
+
+    The request is hedged: if it hasn't answered after the recent p95 latency
+    (GEMINI_HEDGE_PERCENTILE), a second identical request is sent and the first
+    valid reply wins. When deadline_s (GEMINI_DEADLINE_S) passes, or both
+    attempts fail, the best available fallback is returned instead of waiting.
+    """
+    deadline_s = deadline_s or GEMINI_DEADLINE_S
+    model_name = current_model_name()
+    cache_name = cache_model_name(model_name)
+    key = ShotPlanCache.key(brief, shot_count, cache_name, SHOT_PLANNER_PROMPT) if cache else ""
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            print("⚡ shot plan cache hit")
+            return cached, "cache"
+
+    tracker = LatencyTracker(LATENCY_DIR / (re.sub(r"[^\w.-]", "_", model_name) + ".json"))
+    hedge_after = tracker.percentile(GEMINI_HEDGE_PERCENTILE, GEMINI_HEDGE_DELAY_S) if GEMINI_HEDGE else None
+
+    def attempt() -> Dict[str, Any]:
+        shot_plan = request_shot_plan(get_gemini_model(model_name), brief, shot_count, timeout=deadline_s)
+        if not is_valid_shot_plan(shot_plan):
+            raise ValueError("Gemini returned JSON but missing 'shots'.")
+        return shot_plan
+
+    try:
+        shot_plan = hedged_call(
+            attempt,
+            deadline_s,
+            hedge_after,
+            tracker,
+            on_hedge=lambda: print(f"🔁 sending hedged request (hedge delay {hedge_after:.1f}s)"),
+        )
+    except DeadlineExceeded:
+        print(f"⏰ Gemini missed the {deadline_s:.1f}s deadline")
+    except Exception as e:
+        print(f"⚠️ Gemini failed. Reason: {e}")
+    else:
+        if cache:
+            cache.put(key, shot_plan, brief=brief, shot_count=shot_count, model=cache_name)
+        return shot_plan, "gemini"
+
+    similar = cache.find_similar(brief, shot_count, cache_name) if cache else None
+    if similar is not None:
+        print("↩️ using cached plan for a similar brief")
+        return similar, "similar"
+    print("↩️ falling back to stub plan")
+    return generate_shot_plan_stub(brief, shot_count), "stub"
+
+
+def stream_shot_plan(
+    brief: str,
+    shot_count: int,
+    on_shot: Callable[[Dict[str, Any], List[str]], None],
+    cache: Optional[ShotPlanCache] = None,
+) -> Dict[str, Any]:
+    """
+    Like call_gemini_for_shot_plan, but streams the reply and calls
+    on_shot(shot, visual_style) as soon as each element of "shots" is complete,
+    so retrieval for early shots overlaps generation of later ones.
+    visual_style is [] if the model has not emitted it before that shot.
+    Returns the full plan; on a cache hit every shot is handed off immediately.
+    """
+    model_name = current_model_name()
+    cache_name = cache_model_name(model_name)
+    key = ShotPlanCache.key(brief, shot_count, cache_name, SHOT_PLANNER_PROMPT) if cache else ""
+    if cache:
+        cached = cache.get(key)
+        if cached is not None:
+            print("⚡ shot plan cache hit")
+            for s in cached.get("shots", []):
+                on_shot(s, cached.get("visual_style", []))
+            return cached
+
+    model = get_gemini_model(model_name)
+    resp = model.generate_content(build_prompt(brief, shot_count), generation_config=GENERATION_CONFIG, stream=True)
+
+    parser = ShotStreamParser()
+    for chunk in resp:
+        for s in parser.feed(getattr(chunk, "text", "") or ""):
+            on_shot(s, parser.top.get("visual_style", []))
+
+    if not parser.buf.strip():
+        raise ValueError("Empty response from Gemini.")
+    try:
+        shot_plan = safe_extract_json(parser.buf)
+    except ValueError:
+        # Truncated stream: keep whatever shots were already handed off.
+        shot_plan = parser.result()
+    if cache and parser.done and is_valid_shot_plan(shot_plan):
+        cache.put(key, shot_plan, brief=brief, shot_count=shot_count, model=cache_name)
+    return shot_plan
+
+
 # -----------------------------
 # Stub fallback
 # -----------------------------
@@ -200,34 +405,55 @@ def shot_plan_to_adjson(shot_plan: Dict[str, Any]) -> Dict[str, Any]:
     return {"shots": shots_out}
 
 
-def build_shot_queries(shot_plan: Dict[str, Any], brief: str) -> Dict[str, Any]:
-    """
-    Build Module-B query payload.
-    Note: Module B currently searches using query_text (and re-embeds internally),
-    but we also include embeddings for transparency / future use.
-    """
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+def build_shot_query(
+    shot: Dict[str, Any], brief: str, visual_style: List[str], model: "SentenceTransformer"
+) -> Dict[str, Any]:
+    """Module-B query payload for one shot."""
+    desc = shot.get("shot_description", "")
+    keywords = shot.get("keywords", [])
+    style = " ".join(visual_style)
 
-    queries = []
-    for s in shot_plan.get("shots", []):
-        shot_id = s.get("id")
-        desc = s.get("shot_description", "")
-        keywords = s.get("keywords", [])
-        style = " ".join(shot_plan.get("visual_style", []))
+    query_text = f"{brief}. {desc}. Style: {style}. Keywords: {', '.join(keywords)}".strip()
+    emb = model.encode(query_text).tolist()
 
-        query_text = f"{brief}. {desc}. Style: {style}. Keywords: {', '.join(keywords)}".strip()
-        emb = model.encode(query_text).tolist()
+    return {
+        "shot_id": shot.get("id"),
+        "query_text": query_text,
+        "keywords": keywords,
+        "embedding": emb,
+    }
 
-        queries.append(
-            {
-                "shot_id": shot_id,
-                "query_text": query_text,
-                "keywords": keywords,
-                "embedding": emb,
-            }
-        )
 
-    return {"shots": queries}
+def build_shot_queries(
+    shot_plan: Dict[str, Any],
+    brief: str,
+    model: Optional["SentenceTransformer"] = None,
+    cache: Optional[StageCache] = None,
+    load_model: Optional[Callable[[], "SentenceTransformer"]] = None,
+) -> Dict[str, Any]:
+    """
+    Build Module-B query payload.
+    Note: Module B searches with the embeddings when given them (pipeline.py), and
+    re-embeds query_text otherwise.
+    Pass a loaded model (or a load_model callback) to reuse it across calls. With a
+    stage cache, an unchanged plan + brief is served from disk and the model is
+    never loaded.
+    """
+    def compute() -> Dict[str, Any]:
+        encoder = model
+        if encoder is None:
+            if load_model is None and SentenceTransformer is None:
+                raise RuntimeError("sentence-transformers is not installed; it is needed to encode shot queries.")
+            with span("load_encoder"):
+                encoder = load_model() if load_model else SentenceTransformer(EMBED_MODEL)
+        style = shot_plan.get("visual_style", [])
+        with span("encode") as s, profile_section("encode"):
+            shots = [build_shot_query(sh, brief, style, encoder) for sh in shot_plan.get("shots", [])]
+            s["items"] = len(shots)
+        return {"shots": shots}
+
+    inputs = {"shot_plan": shot_plan, "brief": brief, "model": EMBED_MODEL}
+    return run_stage(cache, "shot_queries", code_version(sys.modules[__name__]), inputs, compute)
 
 
 # -----------------------------
@@ -235,26 +461,42 @@ def build_shot_queries(shot_plan: Dict[str, Any], brief: str) -> Dict[str, Any]:
 # -----------------------------
 
 def main() -> None:
+    with profile_run("generate_adjson"), RunManifest.track("generate_adjson") as run:
+        _main(run)
+
+
+def _main(run: RunManifest) -> None:
     ensure_out_dir()
 
-    brief = os.environ.get("BRIEF", "").strip()
-    if not brief:
-        brief = "Brand: XXX; Product: drink bottle; Style: dreamy futuristic mini-world; Elements: transparent pipes, fruit, balls, ferris wheel, trees, little people"
+    brief = os.environ.get("BRIEF", "").strip() or DEFAULT_BRIEF
 
     shot_count = clamp_shot_count(int(os.environ.get("SHOT_COUNT", str(DEFAULT_SHOT_COUNT))))
+    plan_cache, stage_cache = ShotPlanCache.from_env(), StageCache.from_env()
 
-    # Try Gemini first; fallback to stub if anything goes wrong
-    try:
-        shot_plan = call_gemini_for_shot_plan(brief, shot_count)
-        # Basic validation
-        if "shots" not in shot_plan or not isinstance(shot_plan["shots"], list) or len(shot_plan["shots"]) == 0:
-            raise ValueError("Gemini returned JSON but missing 'shots'.")
-    except Exception as e:
-        print(f"⚠️ Gemini failed, falling back to stub. Reason: {e}")
-        shot_plan = generate_shot_plan_stub(brief, shot_count)
+    # Try Gemini within the latency budget; fall back to a similar cached plan or the stub
+    with span("plan") as s:
+        shot_plan, source = plan_with_deadline(brief, shot_count, plan_cache)
+        s.update(source=source, items=len(shot_plan.get("shots", [])))
+    print(f"🧭 shot plan source: {source}")
+    count(f"plan_source.{source}")
 
     adjson = shot_plan_to_adjson(shot_plan)
-    shot_queries = build_shot_queries(shot_plan, brief)
+    with span("shot_queries"):
+        shot_queries = build_shot_queries(shot_plan, brief, cache=stage_cache)
+
+    if plan_cache:
+        run.add_cache("shot_plan", plan_cache.stats)
+    if stage_cache:
+        run.add_cache("stage", stage_cache.stats)
+
+    # Update the "latest" stable filenames used by the rest of the pipeline; keep a
+    # timestamped copy only when something actually changed.
+    with span("write"):
+        changed = write_json_if_changed(f"{OUT_DIR}/adJson.generated.json", adjson)
+        changed = write_json_if_changed(f"{OUT_DIR}/shot_queries.json", shot_queries) or changed
+    if not changed:
+        print("♻️ outputs unchanged:", f"{OUT_DIR}/adJson.generated.json", f"{OUT_DIR}/shot_queries.json")
+        return
 
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_ad = f"{OUT_DIR}/adJson.generated.{ts}.json"
@@ -263,223 +505,10 @@ def main() -> None:
     write_json(out_ad, adjson)
     write_json(out_q, shot_queries)
 
-    # Also update the "latest" stable filenames used by the rest of the pipeline
-    write_json(f"{OUT_DIR}/adJson.generated.json", adjson)
-    write_json(f"{OUT_DIR}/shot_queries.json", shot_queries)
-
     print("✅ wrote:", out_ad)
     print("✅ wrote:", out_q)
     print("✅ updated:", f"{OUT_DIR}/adJson.generated.json")
     print("✅ updated:", f"{OUT_DIR}/shot_queries.json")
-=======
-from datetime import datetime
-from typing import Tuple, Dict, Any, List
-
-# This is a minimal Module A stub:
-# - Generates a playable multi-shot adJson (v1-compatible)
-# - Generates shot_queries for Module B retrieval
-# - Does NOT call Gemini yet (you can replace the stub later)
-
-
-def generate_shot_plan_stub(brief: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-    """
-    Produce:
-      1) adJson: 3-shot version using the existing C renderer schema.
-      2) shot_queries: one query_text per shot for Module B retrieval.
-    """
-
-    # --- 3-shot adJson (9 seconds total: 3s + 3s + 3s) ---
-    adjson: Dict[str, Any] = {
-        "shots": [
-            # Shot 1: Product reveal (clean, minimal)
-            {
-                "id": 1,
-                "duration": 3000,
-                "camera": {"movement": "slow-zoom-in", "angle": "slightly-top-down"},
-                "elements": [
-                    {"id": "track", "type": "track-layer"},
-                    {
-                        "id": "product",
-                        "type": "bottle",
-                        "motion": "yaw",
-                        "position": {"x": 50, "y": 52},
-                        "presetPosition": "pos-bottle-center",
-                        "asset": None,
-                    },
-                    {
-                        "id": "platform",
-                        "type": "bottle-platform",
-                        "parent": "product",
-                        "asset": None,
-                    },
-                    {
-                        "id": "sign1",
-                        "type": "sign",
-                        "motion": "spin-slow",
-                        "presetPosition": "pos-sign-1",
-                        "asset": None,
-                    },
-                    {
-                        "id": "tree1",
-                        "type": "tree",
-                        "motion": None,
-                        "presetPosition": "pos-tree-1",
-                        "asset": None,
-                    },
-                ],
-            },
-            # Shot 2: Playful world motion (more props)
-            {
-                "id": 2,
-                "duration": 3000,
-                "camera": {"movement": "slow-zoom-in", "angle": "slightly-top-down"},
-                "elements": [
-                    {"id": "track", "type": "track-layer"},
-                    {
-                        "id": "product",
-                        "type": "bottle",
-                        "motion": "yaw",
-                        "position": {"x": 50, "y": 52},
-                        "presetPosition": "pos-bottle-center",
-                        "asset": None,
-                    },
-                    {
-                        "id": "wheelRight",
-                        "type": "ferris-wheel",
-                        "motion": "rotate-wheel",
-                        "presetPosition": "pos-wheel-right",
-                        "asset": None,
-                    },
-                    {
-                        "id": "canLoop",
-                        "type": "can-on-track",
-                        "motion": "loop-track",
-                        "asset": None,
-                    },
-                    {
-                        "id": "person1",
-                        "type": "person",
-                        "motion": "sway",
-                        "presetPosition": "pos-person-1",
-                        "asset": None,
-                    },
-                    {
-                        "id": "person2",
-                        "type": "person",
-                        "motion": "sway",
-                        "presetPosition": "pos-person-2",
-                        "asset": None,
-                    },
-                ],
-            },
-            # Shot 3: Hero finish (close-up vibe, pedestal + crystal)
-            {
-                "id": 3,
-                "duration": 3000,
-                "camera": {"movement": "slow-zoom-in", "angle": "slightly-top-down"},
-                "elements": [
-                    {"id": "track", "type": "track-layer"},
-                    {
-                        "id": "product",
-                        "type": "bottle",
-                        "motion": "yaw",
-                        "position": {"x": 50, "y": 52},
-                        "presetPosition": "pos-bottle-center",
-                        "asset": None,
-                    },
-                    {
-                        "id": "platform",
-                        "type": "bottle-platform",
-                        "parent": "product",
-                        "asset": None,
-                    },
-                    {
-                        "id": "soloCan",
-                        "type": "solo-can",
-                        "motion": "rise-spin",
-                        "presetPosition": "pos-solo-can-left",
-                        "asset": None,
-                    },
-                    {
-                        "id": "tree3",
-                        "type": "tree",
-                        "motion": None,
-                        "presetPosition": "pos-tree-3",
-                        "asset": None,
-                    },
-                    {
-                        "id": "sign2",
-                        "type": "sign",
-                        "motion": "spin-slow",
-                        "presetPosition": "pos-sign-2",
-                        "asset": None,
-                    },
-                ],
-            },
-        ]
-    }
-
-    # --- Shot queries for Module B ---
-    # Note: B currently accepts text queries (it encodes queries internally).
-    # We keep a placeholder embedding field for future compatibility.
-    shot_queries: Dict[str, Any] = {
-        "shots": [
-            {
-                "shot_id": 1,
-                "query_text": (
-                    f"{brief}. Shot 1: product reveal, clean dreamy futuristic mini-world, "
-                    "soft pastel, minimal 3D, gradient background, elegant shapes, gentle motion"
-                ),
-                "keywords": ["product reveal", "dreamy", "futuristic", "mini-world", "minimal 3D", "gradient background"],
-                "embedding": [0.01] * 64,
-            },
-            {
-                "shot_id": 2,
-                "query_text": (
-                    f"{brief}. Shot 2: playful motion, ferris wheel, looping can, "
-                    "geometric shapes, glossy 3D props, fun mini-world, soft motion"
-                ),
-                "keywords": ["playful", "ferris wheel", "looping", "geometric", "glossy 3D", "mini-world"],
-                "embedding": [0.01] * 64,
-            },
-            {
-                "shot_id": 3,
-                "query_text": (
-                    f"{brief}. Shot 3: hero finish, pedestal, crystal, premium clean 3D, "
-                    "soft glow, minimal background, product spotlight"
-                ),
-                "keywords": ["hero finish", "pedestal", "crystal", "premium", "clean 3D", "spotlight"],
-                "embedding": [0.01] * 64,
-            },
-        ]
-    }
-
-    return adjson, shot_queries
-
-
-def main() -> None:
-    brief = os.environ.get("BRIEF", "").strip()
-    if not brief:
-        brief = "Promote a beverage bottle in a dreamy mini-world style 3D ad."
-
-    adjson, shot_queries = generate_shot_plan_stub(brief)
-
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_ad = f"module_a/out/adJson.generated.{ts}.json"
-    out_q = f"module_a/out/shot_queries.{ts}.json"
-
-    os.makedirs("module_a/out", exist_ok=True)
-
-    with open(out_ad, "w", encoding="utf-8") as f:
-        json.dump(adjson, f, ensure_ascii=False, indent=2)
-
-    with open(out_q, "w", encoding="utf-8") as f:
-        json.dump(shot_queries, f, ensure_ascii=False, indent=2)
-
-    print("✅ wrote:", out_ad)
-    print("✅ wrote:", out_q)
->>>>>>> origin/main
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
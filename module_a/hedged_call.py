@@ -0,0 +1,135 @@
+"""
+Deadline-bounded calls with a hedged second attempt.
+
+hedged_call(fn, deadline_s, hedge_after_s) runs fn() on a worker thread; if it has
+not returned after hedge_after_s a second fn() is started, and the first attempt
+to succeed wins. If every attempt fails the last error is raised, and if none has
+succeeded by deadline_s DeadlineExceeded is raised. Attempts still running at
+that point are abandoned, not killed, so fn should carry its own timeout too.
+Attempts run on daemon threads, so an abandoned one never delays interpreter
+exit (concurrent.futures would join its workers at shutdown).
+
+LatencyTracker keeps recent successful latencies on disk so the hedge delay can
+follow the observed tail (e.g. p95) instead of a fixed guess.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Callable, List, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+WINDOW = 200  # latencies kept
+MIN_SAMPLES = 10  # below this, percentile() returns the default
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class LatencyTracker:
+    def __init__(self, path: Optional[Path] = None, window: int = WINDOW):
+        self.path = Path(path) if path else None
+        self.window = window
+        self._lock = threading.Lock()
+        self.samples: List[float] = []
+        if self.path:
+            try:
+                self.samples = [float(x) for x in json.loads(self.path.read_text(encoding="utf-8"))][-window:]
+            except (OSError, ValueError, TypeError):
+                self.samples = []
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.samples = (self.samples + [seconds])[-self.window:]
+            if self.path:
+                self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump([round(s, 4) for s in self.samples], f)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def percentile(self, q: float, default: float) -> float:
+        """q-th percentile (0-100) of recorded latencies, or default with too few samples."""
+        with self._lock:
+            data = sorted(self.samples)
+        if len(data) < MIN_SAMPLES:
+            return default
+        idx = min(len(data) - 1, max(0, int(round(q / 100.0 * (len(data) - 1)))))
+        return data[idx]
+
+
+def _start(fn: Callable[[], T]) -> "Future[T]":
+    """Run fn on a daemon thread and return a Future for its outcome."""
+    fut: "Future[T]" = Future()
+    fut.set_running_or_notify_cancel()
+
+    def run() -> None:
+        try:
+            fut.set_result(fn())
+        except BaseException as e:
+            fut.set_exception(e)
+
+    threading.Thread(target=run, name="hedged", daemon=True).start()
+    return fut
+
+
+def hedged_call(
+    fn: Callable[[], T],
+    deadline_s: float,
+    hedge_after_s: Optional[float] = None,
+    tracker: Optional[LatencyTracker] = None,
+    on_hedge: Optional[Callable[[], None]] = None,
+) -> T:
+    """
+    Return the first successful fn() result within deadline_s.
+    hedge_after_s=None disables the second attempt.
+    """
+    t0 = time.perf_counter()
+    deadline = t0 + deadline_s
+
+    def timed() -> T:
+        start = time.perf_counter()
+        result = fn()
+        if tracker:
+            tracker.record(time.perf_counter() - start)
+        return result
+
+    pending: Set[Future] = {_start(timed)}
+    hedged = hedge_after_s is None
+    last_error: Optional[BaseException] = None
+
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            raise DeadlineExceeded(f"no result within {deadline_s:.1f}s")
+        until = deadline
+        if not hedged:
+            until = min(until, t0 + hedge_after_s)
+        done, pending = wait(pending, timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+
+        for fut in done:
+            if fut.exception() is None:
+                return fut.result()
+            last_error = fut.exception()
+
+        # Hedge when the delay has passed, or straight away if the first attempt failed early.
+        if not hedged and (time.perf_counter() >= t0 + hedge_after_s or not pending):
+            hedged = True
+            if on_hedge:
+                on_hedge()
+            pending.add(_start(timed))
+        elif not pending:
+            raise last_error
@@ -0,0 +1,240 @@
+"""
+Batch job runner: ad requests JSONL -> full pipeline per request -> results JSONL.
+
+Each input line is one ad request:
+    {"id": "spring-01", "brand": "Acme", "product": "sparkling can", "style": "dreamy mini-world",
+     "speed": "normal", "quality": "balanced", "shot_count": 4}
+("brief" may be given instead of brand/product/style; "id" defaults to the line number.)
+
+Requests are streamed from the input and run through AdPipeline (pipeline.py) on a
+pool of worker processes. Each worker loads the encoder and connects to Qdrant once
+at start-up and keeps them warm for every job it runs. Results are appended to the
+output JSONL as jobs finish, flushed and fsynced, so the output doubles as the
+checkpoint: rerunning the same command skips ids already recorded as done and
+retries the ones that failed. speed / quality are passed through for the renderer.
+
+Run from repo root:
+    python -m module_a.job_runner ad_requests.jsonl --out module_a/out/jobs.jsonl --workers 4
+    GEMINI_STUB=1 python -m module_a.job_runner ad_requests.jsonl          # offline planning
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, TextIO
+
+from module_a.generate_adjson import DEFAULT_SHOT_COUNT
+from module_a.profiling import MODES, enable as enable_profiling, profile_run
+from module_a.run_manifest import RunManifest
+
+DEFAULT_OUT = Path("module_a/out/jobs.jsonl")
+DEFAULT_WORKERS = 2
+PASSTHROUGH_FIELDS = ("brand", "product", "style", "speed", "quality")
+
+
+# -----------------------------
+# Input / checkpoint
+# -----------------------------
+
+def job_brief(job: Dict[str, Any]) -> str:
+    if job.get("brief"):
+        return str(job["brief"]).strip()
+    parts = [f"{label}: {job[key]}" for key, label in (("brand", "Brand"), ("product", "Product"), ("style", "Style")) if job.get(key)]
+    return "; ".join(parts)
+
+
+def iter_jobs(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield ad requests one line at a time; lines without a usable brief are skipped."""
+    with path.open("r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                print(f"⚠️ {path}:{lineno}: not JSON, skipped", file=sys.stderr)
+                continue
+            if not isinstance(item, dict) or not job_brief(item):
+                print(f"⚠️ {path}:{lineno}: no brief or brand/product/style, skipped", file=sys.stderr)
+                continue
+            item["id"] = str(item.get("id") or lineno)
+            yield item
+
+
+def load_checkpoint(out_path: Path) -> Set[str]:
+    """
+    Ids already finished in out_path. Failed records and a torn last line from a
+    crash are dropped (the file is rewritten atomically) so those jobs rerun cleanly.
+    """
+    if not out_path.exists():
+        return set()
+    kept, done, dropped = [], set(), 0
+    for line in out_path.read_text(encoding="utf-8").splitlines():
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            dropped += 1
+            continue
+        if rec.get("status") != "ok" or rec.get("id") in done:
+            dropped += 1
+            continue
+        done.add(rec["id"])
+        kept.append(line)
+
+    if dropped:
+        fd, tmp = tempfile.mkstemp(dir=out_path.parent, prefix=out_path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("".join(l + "\n" for l in kept))
+        os.replace(tmp, out_path)
+    return done
+
+
+# -----------------------------
+# Worker side
+# -----------------------------
+
+_pipeline: Any = None
+
+
+def _init_worker() -> None:
+    global _pipeline
+    from module_a.pipeline import AdPipeline
+
+    _pipeline = AdPipeline()
+    _pipeline.warm_up()
+
+
+def new_record(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": job["id"], "input": {k: job[k] for k in PASSTHROUGH_FIELDS if k in job}}
+
+
+def run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    record = new_record(job)
+    record["worker"] = os.getpid()
+    try:
+        # One manifest per job, with this job's cache hits only.
+        _pipeline.reset_cache_stats()
+        with profile_run(f"job_{job['id']}"), RunManifest.track("job", job_id=job["id"]) as run:
+            result = _pipeline.run(job_brief(job), int(job.get("shot_count") or DEFAULT_SHOT_COUNT))
+            _pipeline.record_caches(run)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+        return record
+    record.update(
+        status="ok",
+        brief=result["brief"],
+        source=result["source"],
+        seconds=result["seconds"],
+        adJson=result["final"],
+    )
+    return record
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+def run_jobs(
+    jobs: Iterator[Dict[str, Any]],
+    out: TextIO,
+    workers: int = DEFAULT_WORKERS,
+    done: Optional[Set[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Run jobs on a process pool, keeping at most 2*workers in flight. Returns a summary.
+
+    A job whose worker dies is recorded as an error. If the pool itself breaks (e.g. a
+    worker's _init_worker failed to load the encoder or reach Qdrant), in-flight jobs are
+    recorded as errors, no more are submitted, and the summary carries "aborted".
+    """
+    done = done or set()
+    counts = {"ok": 0, "error": 0, "skipped": 0}
+    t0 = time.perf_counter()
+    max_in_flight = max(1, workers) * 2
+    aborted: Optional[str] = None
+
+    ctx = multiprocessing.get_context("spawn")  # workers load torch; don't fork a threaded parent
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=ctx, initializer=_init_worker) as pool:
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+
+        def drain(block: bool) -> None:
+            nonlocal aborted
+            if not in_flight:
+                return
+            finished, _ = wait(set(in_flight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                job = in_flight.pop(fut)
+                try:
+                    record = fut.result()
+                except BrokenProcessPool as e:
+                    aborted = aborted or f"worker pool broke ({e})"
+                    record = dict(new_record(job), status="error", error=f"BrokenProcessPool: {e}")
+                except Exception as e:
+                    record = dict(new_record(job), status="error", error=f"{type(e).__name__}: {e}")
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                counts[record["status"]] += 1
+                mark = "✅" if record["status"] == "ok" else "❌"
+                print(f"{mark} {record['id']} {record.get('source') or record.get('error')}", file=sys.stderr)
+
+        for job in jobs:
+            if job["id"] in done:
+                counts["skipped"] += 1
+                continue
+            while len(in_flight) >= max_in_flight:
+                drain(block=True)
+            if aborted:
+                break
+            try:
+                in_flight[pool.submit(run_job, job)] = job
+            except BrokenProcessPool as e:
+                aborted = aborted or f"worker pool broke ({e})"
+                break
+        while in_flight:
+            drain(block=True)
+
+    elapsed = time.perf_counter() - t0
+    ran = counts["ok"] + counts["error"]
+    return {**counts, "seconds": round(elapsed, 2), "jobs_per_s": round(ran / elapsed, 2) if elapsed else None,
+            "aborted": aborted}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ad pipeline over a JSONL file of ad requests.")
+    parser.add_argument("requests", help="JSONL: one {id, brand, product, style, speed, quality, shot_count} per line")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="results JSONL (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes (each loads its own models)")
+    parser.add_argument("--restart", action="store_true", help="ignore previous results and start over")
+    parser.add_argument("--profile", choices=MODES, help="profile each job in its worker (same as AD_PROFILE=...)")
+    args = parser.parse_args()
+    enable_profiling(args.profile)  # via the environment, so spawned workers see it too
+
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if args.restart and out_path.exists():
+        out_path.unlink()
+    done = load_checkpoint(out_path)
+    if done:
+        print(f"↩️ resuming: {len(done)} jobs already done in {out_path}", file=sys.stderr)
+
+    with out_path.open("a", encoding="utf-8") as f:
+        summary = run_jobs(iter_jobs(Path(args.requests)), f, args.workers, done)
+
+    print(f"📊 ok={summary['ok']} error={summary['error']} skipped={summary['skipped']} "
+          f"in {summary['seconds']}s ({summary['jobs_per_s']}/s, workers={args.workers})", file=sys.stderr)
+    if summary["aborted"]:
+        sys.exit(f"❌ aborted: {summary['aborted']}. Workers could not start or died; check that the encoder "
+                 f"loads and Qdrant is reachable, then rerun the same command to resume.")
+
+
+if __name__ == "__main__":
+    main()
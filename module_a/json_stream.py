@@ -0,0 +1,118 @@
+"""
+Incremental parser for streamed shot-plan JSON.
+
+Feed text chunks as they arrive from the model; every element of the top-level
+"shots" array is returned as soon as its closing brace has been seen, and other
+top-level values (e.g. "visual_style") become available in `.top` once complete.
+Text before the first "{" (stray prose or a code fence) is ignored.
+
+    parser = ShotStreamParser()
+    for chunk in resp:
+        for shot in parser.feed(chunk.text):
+            handle(shot, parser.top.get("visual_style", []))
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+WHITESPACE = " \t\r\n"
+
+
+class ShotStreamParser:
+    def __init__(self, array_key: str = "shots"):
+        self.array_key = array_key
+        self.buf = ""
+        self.top: Dict[str, Any] = {}
+        self.shots: List[Dict[str, Any]] = []
+
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_str = False
+        self._esc = False
+        self._str_start = -1
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start = -1
+        self._elem_start = -1
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level object has been closed."""
+        return self._pos > 0 and not self._stack and "{" in self.buf
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a chunk; return the shots completed by it (in order)."""
+        self.buf += text
+        completed: List[Dict[str, Any]] = []
+        buf, stack = self.buf, self._stack
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+                    if len(stack) == 1 and self._expect_key:
+                        self._key = json.loads(buf[self._str_start:i + 1])
+                        self._expect_key = False
+                i += 1
+                continue
+
+            if not stack:
+                if c == "{":
+                    stack.append("{")
+                    self._expect_key = True
+                i += 1
+                continue
+
+            depth = len(stack)
+            if c == '"':
+                self._in_str = True
+                self._str_start = i
+                if depth == 1 and not self._expect_key and self._value_start < 0:
+                    self._value_start = i
+            elif c == ":" and depth == 1:
+                self._value_start = -1
+            elif c in "{[":
+                if depth == 1 and self._value_start < 0:
+                    self._value_start = i
+                if depth == 2 and stack[1] == "[" and self._key == self.array_key and c == "{":
+                    self._elem_start = i
+                stack.append(c)
+            elif c in "}]":
+                stack.pop()
+                depth = len(stack)
+                if depth == 2 and self._key == self.array_key and c == "}" and self._elem_start >= 0:
+                    shot = json.loads(buf[self._elem_start:i + 1])
+                    self.shots.append(shot)
+                    completed.append(shot)
+                    self._elem_start = -1
+                elif depth == 1:
+                    self._finish_value(buf[self._value_start:i + 1])
+                elif depth == 0:
+                    self._finish_value(buf[self._value_start:i].strip() if self._value_start >= 0 else "")
+            elif c == "," and depth == 1:
+                self._finish_value(buf[self._value_start:i].strip() if self._value_start >= 0 else "")
+                self._expect_key = True
+            elif depth == 1 and c not in WHITESPACE and self._value_start < 0 and not self._expect_key:
+                self._value_start = i  # number / true / false / null
+            i += 1
+        self._pos = i
+        return completed
+
+    def _finish_value(self, raw: str) -> None:
+        if self._key not in (None, self.array_key) and raw and self._key not in self.top:
+            try:
+                self.top[self._key] = json.loads(raw)
+            except ValueError:
+                pass
+        self._value_start = -1
+
+    def result(self) -> Dict[str, Any]:
+        """Best-effort plan from everything seen so far."""
+        plan = dict(self.top)
+        plan[self.array_key] = list(self.shots)
+        return plan
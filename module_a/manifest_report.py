@@ -0,0 +1,135 @@
+"""
+Summarize run manifests (run_manifest.py) across many runs.
+
+For every entry point, and every stage within it, reports run count and the
+p50 / p90 / p99 / max of wall time, CPU time and peak RSS, plus cache hit rates
+and summed counters. Stages with the same name under different parents (e.g.
+"encode" inside "shot_queries") are grouped by name only.
+
+Run from repo root:
+    python -m module_a.manifest_report                         # module_a/out/manifests
+    python -m module_a.manifest_report path/to/manifests --entry job --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from module_a.run_manifest import DEFAULT_MANIFEST_DIR
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    data = sorted(values)
+    idx = min(len(data) - 1, max(0, int(round(q / 100.0 * (len(data) - 1)))))
+    return data[idx]
+
+
+def describe(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    out = {f"p{q}": round(percentile(values, q), 4) for q in PERCENTILES}
+    out["max"] = round(max(values), 4)
+    return out
+
+
+def load_manifests(paths: Iterable[Path]) -> List[Dict[str, Any]]:
+    manifests = []
+    for path in paths:
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for f in files:
+            try:
+                manifests.append(json.loads(f.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                print(f"⚠️ unreadable manifest: {f}", file=sys.stderr)
+    return manifests
+
+
+def summarize(manifests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_entry: Dict[str, List[Dict[str, Any]]] = {}
+    for m in manifests:
+        by_entry.setdefault(m.get("entry_point", "?"), []).append(m)
+
+    report: Dict[str, Any] = {}
+    for entry, runs in sorted(by_entry.items()):
+        stages: Dict[str, Dict[str, List[float]]] = {}
+        caches: Dict[str, Dict[str, int]] = {}
+        counters: Dict[str, int] = {}
+        for m in runs:
+            for s in m.get("spans", []):
+                st = stages.setdefault(s["name"], {"wall_s": [], "cpu_s": [], "rss_growth_mb": [], "items": []})
+                for k in ("wall_s", "cpu_s", "rss_growth_mb", "items"):
+                    if isinstance(s.get(k), (int, float)):
+                        st[k].append(float(s[k]))
+            for name, c in (m.get("caches") or {}).items():
+                agg = caches.setdefault(name, {"hits": 0, "misses": 0})
+                agg["hits"] += c.get("hits", 0)
+                agg["misses"] += c.get("misses", 0)
+            for name, n in (m.get("counters") or {}).items():
+                counters[name] = counters.get(name, 0) + n
+
+        report[entry] = {
+            "runs": len(runs),
+            "errors": sum(1 for m in runs if m.get("status") != "ok"),
+            "wall_s": describe([m["wall_s"] for m in runs if "wall_s" in m]),
+            "cpu_s": describe([m["cpu_s"] for m in runs if "cpu_s" in m]),
+            "peak_rss_mb": describe([m["peak_rss_mb"] for m in runs if "peak_rss_mb" in m]),
+            "stages": {
+                name: {"count": len(v["wall_s"]), **{k: describe(vals) for k, vals in v.items() if vals}}
+                for name, v in stages.items()
+            },
+            "caches": {
+                name: {**c, "hit_rate": round(c["hits"] / (c["hits"] + c["misses"]), 3) if c["hits"] + c["misses"] else None}
+                for name, c in sorted(caches.items())
+            },
+            "counters": dict(sorted(counters.items())),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    cols = " ".join(f"{f'p{q}':>8}" for q in PERCENTILES) + f" {'max':>8}"
+    for entry, r in report.items():
+        print(f"\n=== {entry}: {r['runs']} runs, {r['errors']} errors ===")
+        print(f"{'':24} {cols}")
+        for label, key in (("wall_s", "wall_s"), ("cpu_s", "cpu_s"), ("peak_rss_mb", "peak_rss_mb")):
+            d = r[key]
+            if d:
+                print(f"{label:24} " + " ".join(f"{d[f'p{q}']:8.3f}" for q in PERCENTILES) + f" {d['max']:8.3f}")
+        if r["stages"]:
+            print(f"\n{'stage wall_s':24} {cols} {'n':>5}")
+            for name, s in sorted(r["stages"].items(), key=lambda kv: -kv[1].get("wall_s", {}).get("p50", 0)):
+                d = s.get("wall_s", {})
+                print(f"{name[:24]:24} " + " ".join(f"{d[f'p{q}']:8.3f}" for q in PERCENTILES) + f" {d['max']:8.3f} {s['count']:5d}")
+        for name, c in r["caches"].items():
+            print(f"🗄️ {name}: {c['hits']} hits / {c['misses']} misses (hit rate {c['hit_rate']})")
+        for name, n in r["counters"].items():
+            print(f"🔢 {name}: {n}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Percentile summary of run manifests.")
+    parser.add_argument("paths", nargs="*", default=[str(DEFAULT_MANIFEST_DIR)], help="manifest files or directories")
+    parser.add_argument("--entry", help="only this entry point")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    manifests = load_manifests(Path(p) for p in args.paths)
+    if args.entry:
+        manifests = [m for m in manifests if m.get("entry_point") == args.entry]
+    if not manifests:
+        raise SystemExit("No manifests found.")
+
+    report = summarize(manifests)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,63 @@
+import copy
 import json
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from module_a.profiling import profile_run, profile_section
+from module_a.run_manifest import RunManifest, span
+from module_a.stage_cache import StageCache, code_version, run_stage
+
 ADJSON_IN = Path("module_a/out/adJson.generated.json")
 B_OUT = Path("module_a/out/shot_assets.json")
 ADJSON_OUT = Path("module_a/out/adJson.with_assets.json")
 
-<<<<<<< HEAD
-=======
-
->>>>>>> origin/main
 # Only apply image assets to these element types (keeps visuals coherent).
 ASSET_TYPES = {
     "can-on-track",
     "solo-can",
     "ferris-wheel",
-<<<<<<< HEAD
     # Add more later if needed:
-=======
-    # You can add more later if you want:
->>>>>>> origin/main
     # "sign",
     # "tree",
 }
 
-<<<<<<< HEAD
 # When true, clears any asset fields for element types not in ASSET_TYPES.
 # This prevents random visuals from showing up on elements that are not meant to be "asset-driven".
 CLEAR_NON_ASSET_TYPES = True
 
+# On-screen size (longest side, CSS px) of each asset-driven element in module_c/index.html,
+# used to pick the smallest thumbnail bucket that still looks sharp.
+ELEMENT_DISPLAY_PX = {
+    "can-on-track": 40,
+    "solo-can": 70,
+    "ferris-wheel": 120,
+}
+DEVICE_PIXEL_RATIO = 2
+
 
-def pick_asset_url(asset: Dict[str, Any]) -> Optional[str]:
+def pick_thumbnail(thumbnails: Dict[str, str], display_px: int) -> Optional[str]:
+    """Smallest bucket covering display_px at DEVICE_PIXEL_RATIO, else the largest one."""
+    if not thumbnails:
+        return None
+    need = display_px * DEVICE_PIXEL_RATIO
+    sizes = sorted(int(s) for s in thumbnails)
+    for size in sizes:
+        if size >= need:
+            return thumbnails[str(size)]
+    return thumbnails[str(sizes[-1])]
+
+
+def pick_asset_url(asset: Dict[str, Any], display_px: Optional[int] = None) -> Optional[str]:
     """
-    Prefer online preview images for browser-based demos.
+    Prefer a right-sized WebP thumbnail (see module_b/build_thumbnails.py) when the
+    element's display size is known, then online preview images for browser-based demos.
     local_preview is usually a local filesystem path and may not load in the browser.
     """
+    if display_px:
+        thumb = pick_thumbnail(asset.get("thumbnails") or {}, display_px)
+        if thumb:
+            return thumb
     return asset.get("preview_url") or asset.get("local_preview") or asset.get("freepik_url")
 
 
@@ -50,6 +73,7 @@ def build_asset_meta(asset: Dict[str, Any]) -> Dict[str, Any]:
         "score": asset.get("score"),
         "preview_url": asset.get("preview_url"),
         "local_preview": asset.get("local_preview"),
+        "thumbnails": asset.get("thumbnails", {}),
         "freepik_url": asset.get("freepik_url"),
         "freepik_title": asset.get("freepik_title"),
         "licenses": asset.get("licenses", []),
@@ -59,43 +83,37 @@ def build_asset_meta(asset: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-=======
-
-def pick_asset_url(asset: Dict[str, Any]) -> Optional[str]:
-    # Prefer online preview images; local_preview may not exist on your machine.
-    return asset.get("preview_url") or asset.get("local_preview") or asset.get("freepik_url")
+def merge_assets(
+    adjson: Dict[str, Any], b_results: List[Dict[str, Any]], cache: Optional[StageCache] = None
+) -> Dict[str, Any]:
+    """
+    Return a copy of adjson with Module B results applied to its elements.
+    b_results should align with shots (one retrieval result per shot query).
+    """
+    inputs = {"adJson": adjson, "b_results": b_results}
+    return run_stage(cache, "merge", code_version(sys.modules[__name__]), inputs, lambda: _merge(adjson, b_results))
 
 
->>>>>>> origin/main
-def main() -> None:
-    if not ADJSON_IN.exists():
-        raise FileNotFoundError(f"Missing: {ADJSON_IN}")
-    if not B_OUT.exists():
-        raise FileNotFoundError(f"Missing: {B_OUT}")
+def _merge(adjson: Dict[str, Any], b_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    with profile_section("merge"):
+        return _merge_into(copy.deepcopy(adjson), b_results)
 
-    adjson = json.loads(ADJSON_IN.read_text(encoding="utf-8"))
-    b_results: List[Dict[str, Any]] = json.loads(B_OUT.read_text(encoding="utf-8"))
 
+def _merge_into(adjson: Dict[str, Any], b_results: List[Dict[str, Any]]) -> Dict[str, Any]:
     shots: List[Dict[str, Any]] = adjson.get("shots", [])
     if not shots:
         raise ValueError("adJson has no shots")
 
-    # b_results should align with shots (one retrieval result per shot query)
     for i, shot in enumerate(shots):
         elements: List[Dict[str, Any]] = shot.get("elements", [])
         if not elements:
             continue
 
-<<<<<<< HEAD
         matched_assets: List[Dict[str, Any]] = []
-=======
-        matched_assets = []
->>>>>>> origin/main
         if i < len(b_results):
             matched_assets = b_results[i].get("matched_assets", []) or []
 
         if not matched_assets:
-<<<<<<< HEAD
             # Still clear non-asset types if configured (keeps output deterministic)
             if CLEAR_NON_ASSET_TYPES:
                 for el in elements:
@@ -103,15 +121,12 @@ def main() -> None:
                     if el.get("type") not in ASSET_TYPES:
                         el.pop("asset_meta", None)
                         el.pop("asset_source", None)
-=======
->>>>>>> origin/main
             continue
 
         asset_idx = 0
         for el in elements:
             # Never override product visuals for now
             if el.get("id") == "product" or el.get("type") == "bottle":
-<<<<<<< HEAD
                 el.pop("asset_meta", None)
                 el.pop("asset_source", None)
                 continue
@@ -127,7 +142,7 @@ def main() -> None:
                 continue
 
             asset = matched_assets[asset_idx % len(matched_assets)]
-            chosen_url = pick_asset_url(asset)
+            chosen_url = pick_asset_url(asset, ELEMENT_DISPLAY_PX.get(el_type))
 
             el["asset"] = chosen_url
             el["asset_meta"] = build_asset_meta(asset)
@@ -135,22 +150,32 @@ def main() -> None:
             # Simple provenance label for the frontend/demo
             el["asset_source"] = "freepik" if asset.get("freepik_url") else ("local" if asset.get("local_preview") else "unknown")
 
-=======
-                continue
+            asset_idx += 1
 
-            # Only apply assets to chosen types
-            if el.get("type") not in ASSET_TYPES:
-                el["asset"] = None
-                continue
+    return adjson
 
-            asset = matched_assets[asset_idx % len(matched_assets)]
-            el["asset"] = pick_asset_url(asset)
->>>>>>> origin/main
-            asset_idx += 1
 
-    ADJSON_OUT.write_text(json.dumps(adjson, indent=2, ensure_ascii=False), encoding="utf-8")
-    print(f"Wrote: {ADJSON_OUT}")
+def main() -> None:
+    if not ADJSON_IN.exists():
+        raise FileNotFoundError(f"Missing: {ADJSON_IN}")
+    if not B_OUT.exists():
+        raise FileNotFoundError(f"Missing: {B_OUT}")
+
+    with profile_run("merge_assets_into_adjson"), RunManifest.track("merge_assets_into_adjson") as run:
+        with span("load"):
+            adjson = json.loads(ADJSON_IN.read_text(encoding="utf-8"))
+            b_results: List[Dict[str, Any]] = json.loads(B_OUT.read_text(encoding="utf-8"))
+
+        cache = StageCache.from_env()
+        with span("merge") as s:
+            merged = merge_assets(adjson, b_results, cache)
+            s["items"] = sum(len(shot.get("elements", [])) for shot in merged.get("shots", []))
+        if cache:
+            run.add_cache("stage", cache.stats)
+
+        ADJSON_OUT.write_text(json.dumps(merged, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Wrote: {ADJSON_OUT}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
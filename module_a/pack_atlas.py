@@ -0,0 +1,215 @@
+"""
+Pack the images an ad references into one sprite atlas.
+
+Reads adJson.with_assets.json, loads every distinct element `asset` URL (thumbnail
+paths relative to module_c/index.html, local files, or http(s) URLs), scales each to
+the largest on-screen size it is used at (x DEVICE_PIXEL_RATIO), shelf-packs them
+into a single WebP, and writes:
+
+- module_a/out/atlas/atlas_<content-hash>.webp   (immutable, cacheable as a unit)
+- module_a/out/atlas/atlas.json                  (sprite rects by asset URL)
+- module_a/out/adJson.with_atlas.json            (adds adJson["atlas"] and per-element "atlas" rects)
+
+Elements keep their `asset` URL, so renderers without atlas support still work.
+
+Run from repo root:
+    python -m module_a.pack_atlas [--max-width 1024] [--padding 2]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from PIL import Image
+
+from module_a.merge_assets_into_adjson import DEVICE_PIXEL_RATIO, ELEMENT_DISPLAY_PX
+
+ADJSON_IN = Path("module_a/out/adJson.with_assets.json")
+ADJSON_OUT = Path("module_a/out/adJson.with_atlas.json")
+ATLAS_DIR = Path("module_a/out/atlas")
+# Relative asset URLs are resolved against the renderer's directory.
+RENDERER_DIR = Path("module_c")
+# URL of ATLAS_DIR as seen from module_c/index.html.
+ATLAS_BASE_URL = "../module_a/out/atlas"
+
+DEFAULT_MAX_WIDTH = 1024
+DEFAULT_PADDING = 2  # transparent gutter so neighbouring sprites never bleed when scaled
+DEFAULT_DISPLAY_PX = 128  # element types without a known display size
+WEBP_QUALITY = 85
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+
+def collect_sprites(adjson: Dict[str, Any]) -> Dict[str, int]:
+    """Distinct asset URLs -> largest target size (device px) they are displayed at."""
+    targets: Dict[str, int] = {}
+    for shot in adjson.get("shots", []):
+        for el in shot.get("elements", []):
+            url = el.get("asset")
+            if not url:
+                continue
+            px = ELEMENT_DISPLAY_PX.get(el.get("type"), DEFAULT_DISPLAY_PX) * DEVICE_PIXEL_RATIO
+            targets[url] = max(targets.get(url, 0), px)
+    return targets
+
+
+def load_image(url: str) -> Image.Image:
+    scheme = urlparse(url).scheme
+    if scheme in ("http", "https"):
+        resp = requests.get(url, timeout=(5, 30))
+        resp.raise_for_status()
+        data = resp.content
+    else:
+        path = Path(url[len("file://"):] if scheme == "file" else url)
+        if not path.is_absolute() and not path.exists():
+            path = RENDERER_DIR / path
+        data = path.read_bytes()
+    im = Image.open(io.BytesIO(data))
+    im.load()
+    return im.convert("RGBA")
+
+
+def fit(im: Image.Image, target_px: int) -> Image.Image:
+    """Downscale so the longest side is at most target_px (never upscale)."""
+    if max(im.size) > target_px:
+        im = im.copy()
+        im.thumbnail((target_px, target_px), Image.LANCZOS)
+    return im
+
+
+# -----------------------------
+# Packing
+# -----------------------------
+
+def shelf_pack(sizes: Dict[str, Tuple[int, int]], max_width: int, padding: int) -> Tuple[Dict[str, Tuple[int, int]], int, int]:
+    """
+    Next-fit shelf packing, tallest first.
+    Returns ({key: (x, y)}, atlas_width, atlas_height); rects exclude the padding.
+    """
+    order = sorted(sizes, key=lambda k: (-sizes[k][1], -sizes[k][0], k))
+    positions: Dict[str, Tuple[int, int]] = {}
+    x = y = shelf_h = used_w = 0
+    for key in order:
+        w, h = sizes[key]
+        cell_w, cell_h = w + 2 * padding, h + 2 * padding
+        if x and x + cell_w > max_width:
+            y += shelf_h
+            x = shelf_h = 0
+        positions[key] = (x + padding, y + padding)
+        x += cell_w
+        shelf_h = max(shelf_h, cell_h)
+        used_w = max(used_w, x)
+    return positions, used_w, y + shelf_h
+
+
+def build_atlas(
+    adjson: Dict[str, Any],
+    atlas_dir: Path = ATLAS_DIR,
+    base_url: str = ATLAS_BASE_URL,
+    max_width: int = DEFAULT_MAX_WIDTH,
+    padding: int = DEFAULT_PADDING,
+) -> Optional[Dict[str, Any]]:
+    """
+    Pack adjson's assets into an atlas and annotate adjson in place.
+    Returns the manifest, or None when no asset could be loaded.
+    """
+    targets = collect_sprites(adjson)
+    if not targets:
+        return None
+
+    images: Dict[str, Image.Image] = {}
+    failed: Dict[str, str] = {}
+
+    def load(url: str) -> Tuple[str, Optional[Image.Image], Optional[str]]:
+        try:
+            return url, fit(load_image(url), targets[url]), None
+        except Exception as e:  # one missing image must not drop the rest of the atlas
+            return url, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for url, im, err in pool.map(load, sorted(targets)):
+            if im is not None:
+                images[url] = im
+            else:
+                failed[url] = err or "unknown error"
+    if not images:
+        return None
+
+    widest = max(im.width for im in images.values()) + 2 * padding
+    positions, width, height = shelf_pack({u: im.size for u, im in images.items()}, max(max_width, widest), padding)
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for url, (x, y) in positions.items():
+        atlas.paste(images[url], (x, y))
+
+    buf = io.BytesIO()
+    atlas.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+    data = buf.getvalue()
+    name = f"atlas_{hashlib.sha256(data).hexdigest()[:12]}.webp"
+    atlas_dir.mkdir(parents=True, exist_ok=True)
+    (atlas_dir / name).write_bytes(data)
+
+    sprites = {
+        url: {"x": x, "y": y, "w": images[url].width, "h": images[url].height}
+        for url, (x, y) in sorted(positions.items())
+    }
+    manifest = {
+        "image": name,
+        "url": f"{base_url.rstrip('/')}/{name}",
+        "width": width,
+        "height": height,
+        "bytes": len(data),
+        "sprites": sprites,
+        "failed": failed,
+    }
+    (atlas_dir / "atlas.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    adjson["atlas"] = {"url": manifest["url"], "width": width, "height": height}
+    for shot in adjson.get("shots", []):
+        for el in shot.get("elements", []):
+            rect = sprites.get(el.get("asset"))
+            if rect:
+                el["atlas"] = dict(rect)
+            else:
+                el.pop("atlas", None)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack an ad's assets into one sprite atlas.")
+    parser.add_argument("--in", dest="adjson_in", default=str(ADJSON_IN))
+    parser.add_argument("--out", default=str(ADJSON_OUT))
+    parser.add_argument("--atlas-dir", default=str(ATLAS_DIR))
+    parser.add_argument("--base-url", default=ATLAS_BASE_URL, help="atlas directory URL as seen by the renderer")
+    parser.add_argument("--max-width", type=int, default=DEFAULT_MAX_WIDTH)
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING)
+    args = parser.parse_args()
+
+    in_path = Path(args.adjson_in)
+    if not in_path.exists():
+        raise FileNotFoundError(f"Missing: {in_path}")
+    adjson = json.loads(in_path.read_text(encoding="utf-8"))
+
+    manifest = build_atlas(adjson, Path(args.atlas_dir), args.base_url, args.max_width, args.padding)
+    if manifest is None:
+        print("No loadable assets referenced; atlas not built.")
+        return
+
+    for url, err in manifest["failed"].items():
+        print(f"Skipped {url}: {err}")
+    Path(args.out).write_text(json.dumps(adjson, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Packed {len(manifest['sprites'])} sprites into {manifest['image']} "
+          f"({manifest['width']}x{manifest['height']}, {manifest['bytes'] / 1024:.0f} KB)")
+    print(f"Wrote: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+In-process ad pipeline: plan -> query build -> retrieval -> merge.
+
+Chains the same steps as
+    generate_adjson.py -> run_b_retrieval.py -> merge_assets_into_adjson.py
+but on in-memory objects, with one SentenceTransformer shared by query building
+and the retriever, and query embeddings reused for the Qdrant search instead of
+re-encoding. JSON files are optional artifacts, not the transport between stages.
+
+Library use (models load once, then each run is only Gemini + Qdrant):
+    from module_a.pipeline import AdPipeline
+    pipe = AdPipeline()
+    result = pipe.run("Brand: ...; Product: ...", shot_count=4)
+    result["final"]          # adJson.with_assets
+
+Run from repo root:
+    python -m module_a.pipeline --brief "..." --shot-count 4
+    python -m module_a.pipeline --artifacts          # also write intermediate JSON
+    python -m module_a.pipeline --out -              # final adJson to stdout only
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sentence_transformers import SentenceTransformer
+
+from module_a.generate_adjson import (
+    DEFAULT_BRIEF,
+    DEFAULT_SHOT_COUNT,
+    EMBED_MODEL,
+    OUT_DIR,
+    build_shot_queries,
+    clamp_shot_count,
+    plan_with_deadline,
+    shot_plan_to_adjson,
+)
+from module_a.merge_assets_into_adjson import merge_assets
+from module_a.profiling import MODES, enable as enable_profiling, profile_run
+from module_a.run_b_retrieval import TOP_K, retrieve_shot_assets
+from module_a.run_manifest import RunManifest, count, span
+from module_a.shot_plan_cache import ShotPlanCache
+from module_a.stage_cache import StageCache
+from module_b.retriever import AssetRetriever
+
+# Artifact name for each result key, matching the file-based scripts.
+ARTIFACTS = {
+    "adJson": "adJson.generated.json",
+    "shot_queries": "shot_queries.json",
+    "shot_assets": "shot_assets.json",
+    "final": "adJson.with_assets.json",
+}
+
+
+class AdPipeline:
+    """
+    Holds the warm models for repeated runs. encoder / retriever / caches can be
+    injected (e.g. to share them across pipelines); otherwise they load lazily.
+    With the stage cache (stage_cache.py), a rerun of an unchanged brief skips
+    query embedding, retrieval and merging; stage_cache.stats counts hits.
+    """
+
+    def __init__(
+        self,
+        encoder: Optional[SentenceTransformer] = None,
+        retriever: Optional[AssetRetriever] = None,
+        cache: Optional[ShotPlanCache] = None,
+        top_k: int = TOP_K,
+        collection_name: str = "assets",
+        stage_cache: Optional[StageCache] = None,
+    ):
+        self._encoder = encoder
+        self._retriever = retriever
+        self.cache = cache if cache is not None else ShotPlanCache.from_env()
+        self.stage_cache = stage_cache if stage_cache is not None else StageCache.from_env()
+        self.top_k = top_k
+        self.collection_name = collection_name
+
+    @property
+    def encoder(self) -> SentenceTransformer:
+        if self._encoder is None:
+            self._encoder = SentenceTransformer(EMBED_MODEL)
+        return self._encoder
+
+    @property
+    def retriever(self) -> AssetRetriever:
+        if self._retriever is None:
+            # The retriever only needs the encoder for queries without an embedding.
+            self._retriever = AssetRetriever(collection_name=self.collection_name, model=self._encoder)
+        return self._retriever
+
+    def warm_up(self) -> None:
+        """Load the encoder and connect the retriever now rather than on the first run."""
+        _ = self.encoder
+        _ = self.retriever
+
+    def run(self, brief: str, shot_count: int = DEFAULT_SHOT_COUNT) -> Dict[str, Any]:
+        """
+        Full pipeline for one brief. Returns every intermediate product:
+        shot_plan, adJson, shot_queries, shot_assets and final (adJson.with_assets),
+        plus the plan source (gemini / cache / similar / stub) and wall time.
+        """
+        t0 = time.perf_counter()
+        shot_count = clamp_shot_count(shot_count)
+
+        with span("plan") as s:
+            shot_plan, source = plan_with_deadline(brief, shot_count, self.cache)
+            s.update(source=source, items=len(shot_plan.get("shots", [])))
+        count(f"plan_source.{source}")
+        adjson = shot_plan_to_adjson(shot_plan)
+        with span("shot_queries"):
+            shot_queries = build_shot_queries(shot_plan, brief, self._encoder, self.stage_cache, lambda: self.encoder)
+        with span("retrieve"):
+            shot_assets = retrieve_shot_assets(shot_queries, self.retriever, self.top_k, self.stage_cache)
+        with span("merge"):
+            final = merge_assets(adjson, shot_assets, self.stage_cache)
+
+        return {
+            "brief": brief,
+            "shot_count": shot_count,
+            "source": source,
+            "shot_plan": shot_plan,
+            "adJson": adjson,
+            "shot_queries": shot_queries,
+            "shot_assets": shot_assets,
+            "final": final,
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+
+    def reset_cache_stats(self) -> None:
+        if self.cache:
+            self.cache.stats = {"hits": 0, "misses": 0}
+        if self.stage_cache:
+            self.stage_cache.stats = {}
+
+    def record_caches(self, run: RunManifest) -> None:
+        if self.cache:
+            run.add_cache("shot_plan", self.cache.stats)
+        if self.stage_cache:
+            run.add_cache("stage", self.stage_cache.stats)
+
+
+def write_artifacts(result: Dict[str, Any], out_dir: Path, intermediates: bool = False) -> List[Path]:
+    """Write the final adJson (and optionally the intermediate stages) under out_dir."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    keys = list(ARTIFACTS) if intermediates else ["final"]
+    written = []
+    for key in keys:
+        path = out_dir / ARTIFACTS[key]
+        path.write_text(json.dumps(result[key], indent=2, ensure_ascii=False), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run plan -> retrieval -> merge in one process.")
+    parser.add_argument("--brief", default=os.environ.get("BRIEF", "").strip() or DEFAULT_BRIEF)
+    parser.add_argument("--shot-count", type=int, default=int(os.environ.get("SHOT_COUNT", str(DEFAULT_SHOT_COUNT))))
+    parser.add_argument("--out", default=OUT_DIR, help="artifact directory, or '-' to print the final adJson")
+    parser.add_argument("--artifacts", action="store_true", help="also write adJson.generated / shot_queries / shot_assets")
+    parser.add_argument("--profile", choices=MODES, help="profile the run (same as AD_PROFILE=...)")
+    args = parser.parse_args()
+    enable_profiling(args.profile)
+
+    with profile_run("pipeline"), RunManifest.track("pipeline", shot_count=args.shot_count) as run:
+        pipe = AdPipeline()
+        result = pipe.run(args.brief, args.shot_count)
+        pipe.record_caches(run)
+
+        if args.out == "-":
+            json.dump(result["final"], sys.stdout, indent=2, ensure_ascii=False)
+            sys.stdout.write("\n")
+        else:
+            with span("write"):
+                paths = write_artifacts(result, Path(args.out), args.artifacts)
+            for path in paths:
+                print("✅ wrote:", path)
+    print(f"📊 {len(result['final']['shots'])} shots, plan source={result['source']}, {result['seconds']}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Opt-in profiling for pipeline entry points and hot sections.
+
+Off by default; when off, profile_run() / profile_section() cost one attribute
+check. Switch it on without code changes:
+
+    AD_PROFILE=cprofile python -m module_a.pipeline          # deterministic, whole run
+    AD_PROFILE=sample   python -m module_a.generate_adjson   # sampling, low overhead
+    AD_PROFILE=cprofile AD_PROFILE_SECTIONS=encode,query,merge python -m module_a.pipeline
+
+(argparse-based scripts also take --profile cprofile|sample.)
+
+Output goes to AD_PROFILE_DIR (default module_a/out/profiles):
+    <name>.<ts>.pstats      cProfile mode; open with `python -m pstats` or snakeviz
+    <name>.<ts>.collapsed   folded stacks ("a;b;c <value>") for flamegraph.pl / speedscope
+
+Whole-run mode profiles everything inside profile_run(). With AD_PROFILE_SECTIONS
+(AD_PROFILE still picks the mode; sections alone profile nothing), only the named
+sections are profiled (every call accumulates into one profile per
+section), and the files are written at process exit. Sampling mode walks the
+stacks of all threads every AD_PROFILE_INTERVAL_MS (default 5), so its overhead
+is bounded by the interval rather than the call count; it writes no pstats.
+
+Sections currently instrumented: encode (query embedding), query (Qdrant search
+in AssetRetriever), merge (asset merge loop).
+"""
+
+import atexit
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+DEFAULT_PROFILE_DIR = Path(__file__).parent / "out" / "profiles"
+MODES = ("cprofile", "sample")
+MAX_DEPTH = 128
+
+
+class _Settings:
+    def __init__(self) -> None:
+        self.reload()
+
+    def reload(self) -> None:
+        mode = os.environ.get("AD_PROFILE", "").strip().lower()
+        self.mode = mode if mode in MODES else ""
+        self.sections: Set[str] = {s.strip() for s in os.environ.get("AD_PROFILE_SECTIONS", "").split(",") if s.strip()}
+        self.interval_s = float(os.environ.get("AD_PROFILE_INTERVAL_MS", "5")) / 1000.0
+        self.out_dir = Path(os.environ.get("AD_PROFILE_DIR") or DEFAULT_PROFILE_DIR)
+
+
+settings = _Settings()
+
+
+def enable(mode: Optional[str]) -> None:
+    """CLI switch: same effect as AD_PROFILE=mode, and inherited by worker processes."""
+    if mode:
+        os.environ["AD_PROFILE"] = mode
+        settings.reload()
+
+
+def _out_path(name: str, suffix: str) -> Path:
+    settings.out_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return settings.out_dir / f"{name}.{ts}.{os.getpid()}{suffix}"
+
+
+# -----------------------------
+# Folded stacks
+# -----------------------------
+
+def _frame_label(code_filename: str, lineno: int, func: str) -> str:
+    return f"{func} ({Path(code_filename).name}:{lineno})"
+
+
+def collapse_pstats(stats: pstats.Stats) -> Counter:
+    """
+    Folded stacks from a cProfile call graph. cProfile keeps caller->callee edges,
+    not full stacks, so each edge's cumulative time is split down the tree in
+    proportion; values are microseconds of self time.
+
+    Every function is also a root for the part of its cumulative time that no
+    caller edge accounts for: calls made from frames entered before the profiler
+    was enabled (e.g. the code inside profile_section) have no recorded caller.
+    """
+    raw: Dict[Tuple, Tuple] = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    callees: Dict[Tuple, Dict[Tuple, float]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+    # Self-recursive edges repeat the function's own time, so they never account for an entry.
+    roots = {
+        f: ct - sum(edge[3] for caller, edge in callers.items() if caller != f)
+        for f, (_, _, _, ct, callers) in raw.items()
+    }
+    folded: Counter = Counter()
+
+    def walk(func: Tuple, share: float, path: Tuple[str, ...]) -> None:
+        _, _, tt, ct, _ = raw[func]
+        if ct <= 0 or share <= 0:
+            return
+        label = _frame_label(*func)
+        stack = path + (label,)
+        scale = min(1.0, share / ct)
+        self_us = int(tt * scale * 1e6)
+        if self_us:
+            folded[";".join(stack)] += self_us
+        if len(stack) >= MAX_DEPTH:
+            return
+        for child, edge_ct in callees.get(func, {}).items():
+            if _frame_label(*child) not in stack:  # recursion: stop at the cycle
+                walk(child, edge_ct * scale, stack)
+
+    for root, share in roots.items():
+        if share > 1e-6:  # below output resolution (and float noise from the subtraction)
+            walk(root, share, ())
+    return folded
+
+
+def write_collapsed(folded: Counter, path: Path) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for stack, value in folded.most_common():
+            f.write(f"{stack} {value}\n")
+
+
+# -----------------------------
+# Sampler
+# -----------------------------
+
+class StackSampler:
+    """Background thread sampling every other thread's stack; counts folded stacks."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = max(0.001, interval_s)
+        self.folded: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval_s):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                f: Optional[FrameType] = frame
+                while f is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_frame_label(f.f_code.co_filename, f.f_code.co_firstlineno, f.f_code.co_name))
+                    f = f.f_back
+                if tid not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(names.get(tid, str(tid)))
+                self.folded[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+# -----------------------------
+# Hooks
+# -----------------------------
+
+@contextmanager
+def profile_run(name: str) -> Iterator[None]:
+    """Profile the block as a whole, unless profiling is off or limited to sections."""
+    if not settings.mode or settings.sections:
+        yield
+        return
+
+    t0 = time.perf_counter()
+    if settings.mode == "cprofile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            _dump_cprofile(name, prof)
+    else:
+        sampler = StackSampler(settings.interval_s).start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            path = _out_path(name, ".collapsed")
+            write_collapsed(sampler.folded, path)
+            print(f"🔬 profile: {path} ({sampler.samples} samples)", file=sys.stderr)
+    print(f"🔬 profiled {name} for {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+
+def _dump_cprofile(name: str, prof: cProfile.Profile) -> None:
+    stats_path = _out_path(name, ".pstats")
+    prof.dump_stats(str(stats_path))
+    stats = pstats.Stats(prof)
+    collapsed_path = stats_path.with_suffix(".collapsed")
+    write_collapsed(collapse_pstats(stats), collapsed_path)
+    print(f"🔬 profile: {stats_path} + {collapsed_path.name}", file=sys.stderr)
+
+
+_section_profiles: Dict[str, cProfile.Profile] = {}
+_section_samplers: Dict[str, StackSampler] = {}
+_section_lock = threading.Lock()
+_section_depth = threading.local()
+
+
+@contextmanager
+def profile_section(name: str) -> Iterator[None]:
+    """Profile a hot section when AD_PROFILE is set and the section is listed in AD_PROFILE_SECTIONS."""
+    if not settings.mode or not settings.sections or name not in settings.sections:
+        yield
+        return
+    # cProfile can't be enabled twice on one thread; nested or concurrent sections run unprofiled.
+    if getattr(_section_depth, "n", 0) or not _section_lock.acquire(blocking=False):
+        yield
+        return
+    _section_depth.n = 1
+    try:
+        if not _section_profiles and not _section_samplers:
+            atexit.register(_dump_sections)
+        if settings.mode == "cprofile":
+            prof = _section_profiles.setdefault(name, cProfile.Profile())
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+        else:
+            sampler = StackSampler(settings.interval_s).start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                acc = _section_samplers.setdefault(name, StackSampler(settings.interval_s))
+                acc.folded.update(sampler.folded)
+                acc.samples += sampler.samples
+    finally:
+        _section_depth.n = 0
+        _section_lock.release()
+
+
+def _dump_sections() -> None:
+    for name, prof in _section_profiles.items():
+        _dump_cprofile(f"section_{name}", prof)
+    for name, sampler in _section_samplers.items():
+        path = _out_path(f"section_{name}", ".collapsed")
+        write_collapsed(sampler.folded, path)
+        print(f"🔬 profile: {path} ({sampler.samples} samples)", file=sys.stderr)
@@ -1,23 +1,66 @@
 import json
+import sys
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+from module_a.profiling import profile_run
+from module_a.run_manifest import RunManifest, span
+from module_a.stage_cache import StageCache, code_version, run_stage
 from module_b.retriever import AssetRetriever
 
 INPUT_PATH = Path("module_a/out/shot_queries.json")
 OUTPUT_PATH = Path("module_a/out/shot_assets.json")
+TOP_K = 3
 
 
-def main() -> None:
-    payload = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
-    shots = payload.get("shots", [])
-    shot_texts = [s.get("query_text", "") for s in shots if s.get("query_text")]
+def retrieve_shot_assets(
+    shot_queries: Dict[str, Any],
+    retriever: Optional[AssetRetriever] = None,
+    top_k: int = TOP_K,
+    cache: Optional[StageCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One retrieval result per shot query. Queries that already carry an embedding
+    (build_shot_queries) are searched with it instead of being re-encoded.
+    Cached results are keyed by the query texts and the collection version, so
+    re-indexing or rebuilding thumbnails invalidates them.
+    """
+    retriever = retriever or AssetRetriever(collection_name="assets")
+    queries = [s for s in shot_queries.get("shots", []) if s.get("query_text")]
+
+    def compute() -> List[Dict[str, Any]]:
+        with span("qdrant_search") as sp:
+            sp["items"] = len(queries)
+            return [retriever.search_shot(s["query_text"], top_k=top_k, query_vector=s.get("embedding")) for s in queries]
+
+    if cache is None:
+        return compute()
+    inputs = {
+        "queries": [s["query_text"] for s in queries],
+        "top_k": top_k,
+        "hnsw_ef": retriever.hnsw_ef,
+        "collection": retriever.collection_version(),
+        "thumbs_base_url": retriever.thumbs_base_url,
+    }
+    version = code_version(sys.modules[__name__], sys.modules[AssetRetriever.__module__])
+    return run_stage(cache, "shot_assets", version, inputs, compute)
 
-    retriever = AssetRetriever(collection_name="assets")
-    results = retriever.search_multiple_shots(shot_texts, top_k=3)
 
-    OUTPUT_PATH.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
-    print(f"Wrote: {OUTPUT_PATH}")
+def main() -> None:
+    with profile_run("run_b_retrieval"), RunManifest.track("run_b_retrieval") as run:
+        payload = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+        cache = StageCache.from_env()
+        with span("load_retriever"):
+            retriever = AssetRetriever(collection_name="assets")
+        with span("retrieve") as s:
+            results = retrieve_shot_assets(payload, retriever, cache=cache)
+            s["items"] = len(results)
+        if cache:
+            run.add_cache("stage", cache.stats)
+
+        OUTPUT_PATH.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Wrote: {OUTPUT_PATH}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
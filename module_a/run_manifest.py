@@ -0,0 +1,160 @@
+"""
+Structured run manifests for pipeline entry points.
+
+Each run records stage spans (wall time, CPU time, peak RSS), item counts, cache
+hit rates and a little environment context, and writes one JSON file per run:
+
+    with RunManifest.track("generate_adjson") as run:
+        with span("plan") as s:
+            plan = ...
+            s["items"] = len(plan["shots"])
+        run.add_cache("shot_plan", cache.stats)
+
+span() is a no-op outside an active run, so library code can be instrumented
+without caring who calls it. Spans nest; each records its parent's name.
+Summarize many manifests with manifest_report.py.
+
+Environment:
+    RUN_MANIFEST=0          don't write manifests
+    RUN_MANIFEST_DIR=...    output directory (default: module_a/out/manifests)
+"""
+
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_MANIFEST_DIR = Path(__file__).parent / "out" / "manifests"
+ENV_KEYS = ("GEMINI_MODEL", "GEMINI_STUB", "SHOT_COUNT", "QDRANT_INDEX_PROFILE", "STAGE_CACHE", "SHOT_PLAN_CACHE")
+
+_current: Optional["RunManifest"] = None
+_local = threading.local()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RunManifest:
+    def __init__(self, entry_point: str, **attrs: Any):
+        self.entry_point = entry_point
+        self.attrs = attrs
+        self.started_at = datetime.now()
+        self.t0 = time.perf_counter()
+        self.cpu0 = time.process_time()
+        self.spans: List[Dict[str, Any]] = []
+        self.counters: Dict[str, int] = {}
+        self.caches: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    @contextmanager
+    def track(cls, entry_point: str, **attrs: Any) -> Iterator["RunManifest"]:
+        """Make a manifest the active one for the block and write it on exit, even on error."""
+        global _current
+        run, previous = cls(entry_point, **attrs), _current
+        _current = run
+        status, error = "ok", None
+        try:
+            yield run
+        except BaseException as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current = previous
+            path = run.write(status, error)
+            if path:
+                print(f"🧾 run manifest: {path}", file=sys.stderr)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        record: Dict[str, Any] = {"name": name, "parent": stack[-1] if stack else None, **attrs}
+        t, cpu = time.perf_counter(), time.process_time()
+        rss_before = peak_rss_mb()
+        stack.append(name)
+        try:
+            yield record
+        finally:
+            stack.pop()
+            record["start_s"] = round(t - self.t0, 4)
+            record["wall_s"] = round(time.perf_counter() - t, 4)
+            # process_time is per process: with worker threads this is the whole process's CPU.
+            record["cpu_s"] = round(time.process_time() - cpu, 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            record["rss_growth_mb"] = round(record["peak_rss_mb"] - rss_before, 1)
+            with self._lock:
+                self.spans.append(record)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_cache(self, name: str, stats: Dict[str, Any]) -> None:
+        """Record hit/miss counts; stats is {"hits": n, "misses": n} or {stage: {...}}."""
+        if stats and all(isinstance(v, dict) for v in stats.values()):
+            for stage, s in stats.items():
+                self.add_cache(f"{name}.{stage}", s)
+            return
+        hits, misses = int(stats.get("hits", 0)), int(stats.get("misses", 0))
+        total = hits + misses
+        self.caches[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 3) if total else None}
+
+    def to_dict(self, status: str = "ok", error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "entry_point": self.entry_point,
+            "status": status,
+            "error": error,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_s": round(time.perf_counter() - self.t0, 4),
+            "cpu_s": round(time.process_time() - self.cpu0, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "attrs": self.attrs,
+            "spans": sorted(self.spans, key=lambda s: s["start_s"]),
+            "counters": self.counters,
+            "caches": self.caches,
+            "env": {k: os.environ[k] for k in ENV_KEYS if k in os.environ},
+            "python": platform.python_version(),
+            "pid": os.getpid(),
+            "argv": sys.argv,
+        }
+
+    def write(self, status: str = "ok", error: Optional[str] = None) -> Optional[Path]:
+        if os.environ.get("RUN_MANIFEST", "1").strip() == "0":
+            return None
+        out_dir = Path(os.environ.get("RUN_MANIFEST_DIR") or DEFAULT_MANIFEST_DIR)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        ts = self.started_at.strftime("%Y%m%d_%H%M%S_%f")
+        path = out_dir / f"{self.entry_point}.{ts}.{os.getpid()}.json"
+        path.write_text(json.dumps(self.to_dict(status, error), indent=2, ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+def current() -> Optional[RunManifest]:
+    return _current
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """A stage span on the active manifest, or a throwaway dict when there is none."""
+    if _current is None:
+        yield dict(attrs)
+        return
+    with _current.span(name, **attrs) as record:
+        yield record
+
+
+def count(name: str, n: int = 1) -> None:
+    if _current is not None:
+        _current.count(name, n)
@@ -0,0 +1,125 @@
+"""
+Persistent cache of parsed Gemini shot plans.
+
+Entries are keyed by sha256 of (brief, shot_count, model name, prompt hash), so
+editing SHOT_PLANNER_PROMPT or switching models never serves a stale plan.
+Each entry is one JSON file holding the plan plus the inputs that produced it.
+
+Environment:
+    SHOT_PLAN_CACHE=0            disable the cache
+    SHOT_PLAN_CACHE_DIR=...      cache location (default: module_a/.cache/shot_plans)
+    SHOT_PLAN_CACHE_TTL=s        entry lifetime in seconds (default: 7 days)
+    SHOT_PLAN_CACHE_BYPASS=1     ignore cached plans but still store fresh ones
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "shot_plans"
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+def prompt_hash(prompt_template: str) -> str:
+    return hashlib.sha256(prompt_template.encode("utf-8")).hexdigest()[:16]
+
+
+def brief_tokens(brief: str) -> Set[str]:
+    return set(re.findall(r"\w+", brief.lower()))
+
+
+class ShotPlanCache:
+    def __init__(self, cache_dir: Optional[Path] = None, ttl: float = DEFAULT_TTL, bypass: bool = False):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.ttl = ttl
+        self.bypass = bypass
+        self.stats = {"hits": 0, "misses": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["ShotPlanCache"]:
+        """Build the cache from environment variables; None when disabled."""
+        if os.environ.get("SHOT_PLAN_CACHE", "1").strip() == "0":
+            return None
+        cache_dir = os.environ.get("SHOT_PLAN_CACHE_DIR")
+        ttl = float(os.environ.get("SHOT_PLAN_CACHE_TTL", str(DEFAULT_TTL)))
+        bypass = os.environ.get("SHOT_PLAN_CACHE_BYPASS", "").strip() == "1"
+        return cls(Path(cache_dir) if cache_dir else None, ttl, bypass)
+
+    @staticmethod
+    def key(brief: str, shot_count: int, model_name: str, prompt_template: str) -> str:
+        raw = json.dumps(
+            {
+                "brief": brief.strip(),
+                "shot_count": shot_count,
+                "model": model_name,
+                "prompt": prompt_hash(prompt_template),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The cached plan, or None if missing, expired or bypassed."""
+        plan = None if self.bypass else self._load(key)
+        self.stats["hits" if plan is not None else "misses"] += 1
+        return plan
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("stored_at", 0) >= self.ttl:
+            return None
+        return entry.get("plan")
+
+    def put(self, key: str, plan: Dict[str, Any], **inputs: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"stored_at": time.time(), "inputs": inputs, "plan": plan}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def find_similar(
+        self, brief: str, shot_count: int, model_name: str, min_score: float = 0.5
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached plan whose brief is most similar (token Jaccard >= min_score) among
+        entries with the same shot count and model. Ignores TTL and bypass: this
+        is a last-resort fallback, and an old plan for a similar brief beats the stub.
+        """
+        want = brief_tokens(brief)
+        if not want or not self.cache_dir.is_dir():
+            return None
+        best, best_score = None, min_score
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                entry = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if not isinstance(entry, dict):
+                continue
+            inputs = entry.get("inputs", {})
+            if inputs.get("shot_count") != shot_count or inputs.get("model") != model_name:
+                continue
+            have = brief_tokens(inputs.get("brief", ""))
+            score = len(want & have) / len(want | have) if have else 0.0
+            if score >= best_score:
+                best, best_score = entry.get("plan"), score
+        return best
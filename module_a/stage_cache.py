@@ -0,0 +1,151 @@
+"""
+Content-addressed cache for pipeline stages.
+
+A stage result is stored under sha256(stage name, code version, inputs), where the
+code version is a hash of the source of the module(s) implementing the stage and
+inputs include anything external the result depends on (e.g. the Qdrant
+collection version for retrieval). Unchanged inputs + unchanged code = cache hit;
+anything else recomputes. Results must be JSON-serializable.
+
+The store is a directory of JSON files with a size cap: when it grows past
+max_bytes, least recently used entries (by mtime, refreshed on every hit) are
+removed until it is back under 90% of the cap.
+
+Environment:
+    STAGE_CACHE=0                disable
+    STAGE_CACHE_DIR=...          location (default: module_a/.cache/stages)
+    STAGE_CACHE_MAX_MB=256       size cap
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "stages"
+DEFAULT_MAX_MB = 256
+
+_code_versions: Dict[str, str] = {}
+
+
+def code_version(*modules: ModuleType) -> str:
+    """Short hash of the modules' source; changes whenever their code or constants do."""
+    h = hashlib.sha256()
+    for mod in modules:
+        if mod.__name__ not in _code_versions:
+            try:
+                src = inspect.getsource(mod)
+            except (OSError, TypeError):
+                src = mod.__name__
+            _code_versions[mod.__name__] = hashlib.sha256(src.encode("utf-8")).hexdigest()
+        h.update(_code_versions[mod.__name__].encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+class StageCache:
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["StageCache"]:
+        """Build the cache from environment variables; None when disabled."""
+        if os.environ.get("STAGE_CACHE", "1").strip() == "0":
+            return None
+        cache_dir = os.environ.get("STAGE_CACHE_DIR")
+        max_mb = float(os.environ.get("STAGE_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+        return cls(Path(cache_dir) if cache_dir else None, int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def key(stage: str, version: str, inputs: Any) -> str:
+        raw = json.dumps({"stage": stage, "version": version, "inputs": inputs}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))["value"]
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            os.utime(path)  # LRU: a hit makes the entry recent
+        except OSError:
+            pass
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = json.dumps({"stored_at": time.time(), "value": value}, ensure_ascii=False).encode("utf-8")
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with self._lock:
+            if self._size is None:
+                self._size = sum(f.stat().st_size for f in self._entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Path]:
+        return list(self.cache_dir.glob("*/*.json")) if self.cache_dir.is_dir() else []
+
+    def _evict(self) -> None:
+        entries = []
+        for f in self._entries():
+            try:
+                st = f.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, f))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, f in entries:
+            if total <= target:
+                break
+            try:
+                f.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+    def cached(self, stage: str, version: str, inputs: Any, compute: Callable[[], Any]) -> Any:
+        """compute() on a miss (and store it), the stored result on a hit."""
+        key = self.key(stage, version, inputs)
+        value = self.get(key)
+        stat = self.stats.setdefault(stage, {"hits": 0, "misses": 0})
+        if value is not None:
+            stat["hits"] += 1
+            return value
+        stat["misses"] += 1
+        value = compute()
+        self.put(key, value)
+        return value
+
+
+def run_stage(cache: Optional[StageCache], stage: str, version: str, inputs: Any, compute: Callable[[], Any]) -> Any:
+    """cache.cached(...) when a cache is configured, else just compute()."""
+    if cache is None:
+        return compute()
+    return cache.cached(stage, version, inputs, compute)
@@ -0,0 +1,120 @@
+"""
+Streamed planning: plan -> per-shot queries -> Module B retrieval, overlapped.
+
+The Gemini reply is streamed and parsed incrementally (json_stream.py); each shot
+is turned into a query and sent to the retriever on a worker thread as soon as
+its JSON object closes, while later shots are still being generated. Writes the
+same three files as generate_adjson.py + run_b_retrieval.py:
+    module_a/out/adJson.generated.json
+    module_a/out/shot_queries.json
+    module_a/out/shot_assets.json
+
+Run from repo root:
+    BRIEF="..." SHOT_COUNT=4 python -m module_a.stream_plan
+    GEMINI_STUB=1 GEMINI_STUB_LATENCY_S=4 python -m module_a.stream_plan   # offline
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from sentence_transformers import SentenceTransformer
+
+from module_a.generate_adjson import (
+    DEFAULT_BRIEF,
+    DEFAULT_SHOT_COUNT,
+    OUT_DIR,
+    build_shot_query,
+    clamp_shot_count,
+    ensure_out_dir,
+    generate_shot_plan_stub,
+    is_valid_shot_plan,
+    shot_plan_to_adjson,
+    stream_shot_plan,
+    write_json,
+)
+from module_a.profiling import profile_run
+from module_a.shot_plan_cache import ShotPlanCache
+from module_b.retriever import AssetRetriever
+
+TOP_K = 3
+RETRIEVAL_WORKERS = int(os.environ.get("RETRIEVAL_WORKERS", "4"))
+
+
+class ShotHandoff:
+    """Builds each shot's query on arrival and queues its retrieval."""
+
+    def __init__(self, brief: str, encoder: SentenceTransformer, retriever: AssetRetriever, pool: ThreadPoolExecutor):
+        self.brief = brief
+        self.encoder = encoder
+        self.retriever = retriever
+        self.pool = pool
+        self.t0 = time.perf_counter()
+        self.first_retrieval_s: float = 0.0
+        self.jobs: List[Tuple[Dict[str, Any], Future]] = []
+        self._lock = threading.Lock()
+
+    def _retrieve(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.retriever.search_shot(query["query_text"], top_k=TOP_K, query_vector=query["embedding"])
+        with self._lock:
+            if not self.first_retrieval_s:
+                self.first_retrieval_s = time.perf_counter() - self.t0
+        return result
+
+    def __call__(self, shot: Dict[str, Any], visual_style: List[str]) -> None:
+        query = build_shot_query(shot, self.brief, visual_style, self.encoder)
+        print(f"➡️  shot {query['shot_id']} ready after {time.perf_counter() - self.t0:.2f}s, retrieving")
+        self.jobs.append((query, self.pool.submit(self._retrieve, query)))
+
+    def results(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Queries and retrieval results, in shot order."""
+        queries = [q for q, _ in self.jobs]
+        return {"shots": queries}, [f.result() for _, f in self.jobs]
+
+
+def main() -> None:
+    with profile_run("stream_plan"):
+        _main()
+
+
+def _main() -> None:
+    ensure_out_dir()
+
+    brief = os.environ.get("BRIEF", "").strip() or DEFAULT_BRIEF
+
+    shot_count = clamp_shot_count(int(os.environ.get("SHOT_COUNT", str(DEFAULT_SHOT_COUNT))))
+
+    encoder = SentenceTransformer("all-MiniLM-L6-v2")
+    retriever = AssetRetriever(collection_name="assets", model=encoder)
+
+    with ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS) as pool:
+        handoff = ShotHandoff(brief, encoder, retriever, pool)
+        try:
+            shot_plan = stream_shot_plan(brief, shot_count, handoff, ShotPlanCache.from_env())
+            if not is_valid_shot_plan(shot_plan):
+                raise ValueError("Gemini returned JSON but missing 'shots'.")
+        except Exception as e:
+            print(f"⚠️ Gemini failed, falling back to stub. Reason: {e}")
+            shot_plan = generate_shot_plan_stub(brief, shot_count)
+            # Shots already handed off came from the failed reply; retrieve the stub's instead.
+            handoff.jobs.clear()
+            for s in shot_plan["shots"]:
+                handoff(s, shot_plan["visual_style"])
+        plan_s = time.perf_counter() - handoff.t0
+        shot_queries, shot_assets = handoff.results()
+    total_s = time.perf_counter() - handoff.t0
+
+    write_json(f"{OUT_DIR}/adJson.generated.json", shot_plan_to_adjson(shot_plan))
+    write_json(f"{OUT_DIR}/shot_queries.json", shot_queries)
+    write_json(f"{OUT_DIR}/shot_assets.json", shot_assets)
+
+    print(f"⏱️ first retrieval done: {handoff.first_retrieval_s:.2f}s | plan complete: {plan_s:.2f}s | total: {total_s:.2f}s")
+    print("✅ updated:", f"{OUT_DIR}/adJson.generated.json")
+    print("✅ updated:", f"{OUT_DIR}/shot_queries.json")
+    print("✅ updated:", f"{OUT_DIR}/shot_assets.json")
+
+
+if __name__ == "__main__":
+    main()
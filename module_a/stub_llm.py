@@ -0,0 +1,100 @@
+"""
+Offline stand-in for google.generativeai.GenerativeModel.
+
+Answers shot-planner prompts with a deterministic plan built from the brief and
+shot count found in the prompt, after an optional simulated latency. Set
+GEMINI_STUB=1 to make get_gemini_model() return it, so batch runs, benchmarks
+and tests need no API key or network.
+
+Environment:
+    GEMINI_STUB=1                 use this model instead of Gemini
+    GEMINI_STUB_LATENCY_S=1.5     mean simulated latency per call (default 0)
+    GEMINI_STUB_JITTER_S=0.5      +/- uniform jitter (default 0)
+    GEMINI_STUB_FAILURE_RATE=0.1  probability that a call raises (default 0)
+
+generate_content(..., stream=True) yields the reply in STREAM_CHUNKS pieces with
+the latency spread across them, like a streamed Gemini response.
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Union
+
+from module_a.generate_adjson import generate_shot_plan_stub
+
+STREAM_CHUNKS = 24
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    is_stub = True  # keeps its plans out of Gemini's cache keys and result labels
+
+    def __init__(
+        self,
+        model_name: str = "stub",
+        latency_s: Optional[float] = None,
+        jitter_s: Optional[float] = None,
+        failure_rate: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.model_name = model_name
+        self.latency_s = latency_s if latency_s is not None else float(os.environ.get("GEMINI_STUB_LATENCY_S", "0"))
+        self.jitter_s = jitter_s if jitter_s is not None else float(os.environ.get("GEMINI_STUB_JITTER_S", "0"))
+        self.failure_rate = (
+            failure_rate if failure_rate is not None else float(os.environ.get("GEMINI_STUB_FAILURE_RATE", "0"))
+        )
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _draw(self) -> float:
+        """Count the call, maybe fail, and return the latency to simulate."""
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+            delay = max(0.0, self.latency_s + self._rng.uniform(-self.jitter_s, self.jitter_s))
+        if fail:
+            raise RuntimeError("stub LLM: injected failure")
+        return delay
+
+    @staticmethod
+    def plan_for_prompt(prompt: str) -> Dict[str, Any]:
+        m = re.search(r"Provide exactly (\d+) shots", prompt)
+        shot_count = int(m.group(1)) if m else 3
+        brief = prompt.rsplit("Brief:", 1)[-1].strip()
+        plan = generate_shot_plan_stub(brief, shot_count)
+        for shot in plan["shots"]:
+            shot["shot_description"] = f"Shot {shot['id']} for: {brief[:80]}"
+        return plan
+
+    def generate_content(
+        self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False, **kwargs: Any
+    ) -> Union[StubResponse, Iterator[StubResponse]]:
+        delay = self._draw()
+        text = json.dumps(self.plan_for_prompt(prompt), ensure_ascii=False, indent=2)
+        if stream:
+            return self._stream(text, delay)
+        time.sleep(delay)
+        return StubResponse(text)
+
+    @staticmethod
+    def _stream(text: str, delay: float) -> Iterator[StubResponse]:
+        step = max(1, -(-len(text) // STREAM_CHUNKS))
+        for i in range(0, len(text), step):
+            time.sleep(delay * step / len(text))
+            yield StubResponse(text[i:i + step])
+
+    async def generate_content_async(
+        self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, **kwargs: Any
+    ) -> StubResponse:
+        await asyncio.sleep(self._draw())
+        return StubResponse(json.dumps(self.plan_for_prompt(prompt), ensure_ascii=False))
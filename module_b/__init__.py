@@ -2,6 +2,16 @@
 Module B: Asset Retrieval for Sketch & Search
 向量检索模块 - 根据镜头描述搜索匹配的 3D 资产
 """
-from .retriever import AssetRetriever
+from typing import Any
 
 __all__ = ["AssetRetriever"]
+
+
+def __getattr__(name: str) -> Any:
+    # Imported lazily: retriever pulls in sentence_transformers, which the light
+    # submodules (demo_qdrant, hashed_embedder, index_profiles, ...) don't need.
+    if name == "AssetRetriever":
+        from .retriever import AssetRetriever
+
+        return AssetRetriever
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,152 @@
+"""
+Repeatable ingestion throughput benchmark against the mock Freepik server.
+
+Starts mock_freepik_server.py in-process, then measures:
+  - sync:     sync_freepik_metadata.sync_assets over the synthetic catalog
+  - download: data/download_freepik_assets.py (resolve + download pipeline),
+              run as a subprocess in a scratch directory
+
+Prints a JSON report (and writes it with --out), so CI can track assets/s,
+429 counts and MB/s across changes without an API key or network.
+
+Usage (from module_b/):
+    python bench_freepik_ingest.py --catalog-size 300 --latency-ms 40 --throttle-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from freepik_api import FreepikClient
+from mock_freepik_server import MockConfig, assets_from_catalog, start_in_thread
+from rate_limit import TokenBucket
+from sync_freepik_metadata import SYNC_WORKERS, Checkpoint, sync_assets
+
+MODULE_DIR = Path(__file__).parent
+
+
+def route_delta(before: Dict[str, Any], after: Dict[str, Any], route: str) -> Dict[str, int]:
+    b = before["routes"].get(route, {})
+    a = after["routes"].get(route, {})
+    return {status: n - b.get(status, 0) for status, n in a.items() if n - b.get(status, 0)}
+
+
+def bench_sync(base_url: str, assets: list, workers: int, rps: float, workdir: Path) -> Dict[str, Any]:
+    client = FreepikClient(api_key="mock", base_url=f"{base_url}/v1", cache=None)
+    checkpoint = Checkpoint(str(workdir / "bench.checkpoint.jsonl"))
+    checkpoint.clear()
+    limiter = TokenBucket(rate=rps, capacity=max(1.0, rps))
+
+    t0 = time.perf_counter()
+    result = sync_assets(assets, client, checkpoint, workers=workers, limiter=limiter)
+    elapsed = time.perf_counter() - t0
+    client.close()
+
+    resolved = sum(1 for a in result["enriched"] if a.get("freepik_resolved"))
+    return {
+        "seconds": round(elapsed, 3),
+        "assets": len(assets),
+        "assets_per_s": round(len(assets) / elapsed, 2) if elapsed else None,
+        "resolved": resolved,
+        "failed": len(result["failed"]),
+        "throttle_events": limiter.throttle_events,
+        "limiter_wait_s": round(limiter.total_wait_s, 2),
+        "http": client.stats.summary(),
+    }
+
+
+def bench_download(base_url: str, assets: list, workdir: Path, env_overrides: Dict[str, str]) -> Dict[str, Any]:
+    (workdir / "assets.json").write_text(json.dumps(assets, ensure_ascii=False), encoding="utf-8")
+    env = dict(os.environ)
+    env.update({"FREEPIK_BASE_URL": f"{base_url}/v1", "FREEPIK_API_KEY": "mock", "FREEPIK_CACHE": "0"})
+    env.update(env_overrides)
+
+    script = MODULE_DIR / "data" / "download_freepik_assets.py"
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(script)], cwd=workdir, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        print(proc.stdout[-2000:], proc.stderr[-2000:], file=sys.stderr)
+        raise RuntimeError(f"download_freepik_assets.py exited with {proc.returncode}")
+
+    store = workdir / "assets" / ".store" / "sha256"
+    nbytes = sum(p.stat().st_size for p in store.rglob("*") if p.is_file())
+    return {
+        "seconds": round(elapsed, 3),
+        "bytes": nbytes,
+        "mb_per_s": round(nbytes / 1e6 / elapsed, 2) if elapsed else None,
+        "summary": [line for line in proc.stdout.splitlines() if line.strip().startswith(("✓ 成功", "⚠ 跳过", "❌ 失败", "→ 瓶颈"))],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Freepik ingestion against the local mock server.")
+    parser.add_argument("--catalog-size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="server-side API calls/s before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--file-size", type=int, default=MockConfig.file_size)
+    parser.add_argument("--sync-workers", type=int, default=SYNC_WORKERS)
+    parser.add_argument("--sync-rps", type=float, default=50.0)
+    parser.add_argument("--resolve-rps", type=float, default=50.0)
+    parser.add_argument("--skip-download", action="store_true")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        catalog_size=args.catalog_size,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        rate_limit_rps=args.rate_limit,
+        retry_after=0.2,
+        error_rate=args.error_rate,
+        file_size=args.file_size,
+    )
+    server, base_url = start_in_thread(config)
+    state = server.state  # type: ignore[attr-defined]
+    assets = assets_from_catalog(state.catalog, base_url)
+    print(f"🧪 mock Freepik API on {base_url} ({len(assets)} assets)")
+
+    report: Dict[str, Any] = {"config": vars(args)}
+    try:
+        with tempfile.TemporaryDirectory(prefix="freepik_bench_") as tmp:
+            workdir = Path(tmp)
+
+            before = state.stats()
+            print("→ sync ...")
+            report["sync"] = bench_sync(base_url, assets, args.sync_workers, args.sync_rps, workdir)
+            report["sync"]["server_statuses"] = route_delta(before, state.stats(), "search")
+
+            if not args.skip_download:
+                before = state.stats()
+                print("→ download ...")
+                report["download"] = bench_download(base_url, assets, workdir, {"RESOLVE_RPS": str(args.resolve_rps)})
+                after = state.stats()
+                report["download"]["server_statuses"] = {
+                    "download": route_delta(before, after, "download"),
+                    "file": route_delta(before, after, "file"),
+                }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+        print(f"✅ wrote: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Build size-bucketed WebP thumbnails for the preview images.
+
+Every image in data/assets/previews becomes <stem>_<size>.webp in
+data/assets/thumbs for each bucket in SIZES (longest side, never upscaled),
+with alpha preserved. Work is spread over a process pool; unchanged previews
+(same size + mtime as recorded in the manifest, outputs present) are skipped.
+
+data/assets/thumbs/manifest.json maps each preview stem to its buckets:
+
+    {"asset_001_sphere": {"source": "asset_001_sphere.png", "source_bytes": ..., "source_mtime": ...,
+                          "width": 1200, "height": 1200,
+                          "thumbs": {"128": {"file": "asset_001_sphere_128.webp", "width": 128, ...}, ...}}}
+
+AssetRetriever reads the manifest to add `thumbnails` / `thumbnail_url` to results.
+
+Usage (from module_b/):
+    python build_thumbnails.py [--workers 4] [--quality 80] [--force]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+MODULE_DIR = Path(__file__).parent
+PREVIEWS_DIR = MODULE_DIR / "data" / "assets" / "previews"
+THUMBS_DIR = MODULE_DIR / "data" / "assets" / "thumbs"
+MANIFEST_NAME = "manifest.json"
+
+SIZES = (128, 256, 512)
+DEFAULT_QUALITY = 80
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def load_manifest(thumbs_dir: Path = THUMBS_DIR) -> Dict[str, Dict[str, Any]]:
+    path = thumbs_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+
+def make_thumbnails(src: str, out_dir: str, sizes: Tuple[int, ...], quality: int) -> Dict[str, Any]:
+    """
+    Worker: decode one preview once and write every size bucket.
+    Module-level so it can be pickled into the process pool.
+    """
+    src_path = Path(src)
+    stat = src_path.stat()
+    entry: Dict[str, Any] = {
+        "source": src_path.name,
+        "source_bytes": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "thumbs": {},
+    }
+    with Image.open(src_path) as im:
+        im.load()
+        entry["width"], entry["height"] = im.size
+        has_alpha = im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info)
+        base = im.convert("RGBA" if has_alpha else "RGB")
+
+    longest = max(base.size)
+    # Never upscale: buckets above the source size collapse into one at source size.
+    targets = sorted({min(size, longest) for size in sizes})
+    for target in targets:
+        thumb = base.copy()
+        thumb.thumbnail((target, target), Image.LANCZOS)
+        name = f"{src_path.stem}_{target}.webp"
+        out_path = Path(out_dir) / name
+        tmp = out_path.with_suffix(".webp.tmp")
+        thumb.save(tmp, "WEBP", quality=quality, method=4)
+        os.replace(tmp, out_path)
+        info = {"file": name, "width": thumb.width, "height": thumb.height, "bytes": out_path.stat().st_size}
+        for size in sizes:
+            if min(size, longest) == target:
+                entry["thumbs"][str(size)] = info
+    return entry
+
+
+def is_current(entry: Optional[Dict[str, Any]], src: Path, thumbs_dir: Path, sizes: Tuple[int, ...]) -> bool:
+    if not entry:
+        return False
+    stat = src.stat()
+    if entry.get("source_bytes") != stat.st_size or entry.get("source_mtime") != stat.st_mtime:
+        return False
+    thumbs = entry.get("thumbs") or {}
+    return all(str(s) in thumbs and (thumbs_dir / thumbs[str(s)]["file"]).exists() for s in sizes)
+
+
+def build(
+    previews_dir: Path = PREVIEWS_DIR,
+    thumbs_dir: Path = THUMBS_DIR,
+    sizes: Tuple[int, ...] = SIZES,
+    quality: int = DEFAULT_QUALITY,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """Build missing/stale thumbnails and rewrite the manifest. Returns a summary dict."""
+    thumbs_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else load_manifest(thumbs_dir)
+
+    sources = sorted(p for p in previews_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    todo: List[Path] = [p for p in sources if force or not is_current(manifest.get(p.stem), p, thumbs_dir, sizes)]
+    failed: Dict[str, str] = {}
+
+    t0 = time.perf_counter()
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(make_thumbnails, str(p), str(thumbs_dir), tuple(sizes), quality): p for p in todo}
+            for fut in as_completed(futures):
+                src = futures[fut]
+                try:
+                    manifest[src.stem] = fut.result()
+                except Exception as e:  # a corrupt preview must not sink the whole batch
+                    failed[src.name] = str(e)
+    elapsed = time.perf_counter() - t0
+
+    # Drop entries whose preview is gone.
+    live = {p.stem for p in sources}
+    manifest = {stem: entry for stem, entry in sorted(manifest.items()) if stem in live}
+
+    tmp = thumbs_dir / (MANIFEST_NAME + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, thumbs_dir / MANIFEST_NAME)
+
+    source_bytes = sum(e["source_bytes"] for e in manifest.values())
+    thumb_bytes = {
+        str(s): sum(e["thumbs"][str(s)]["bytes"] for e in manifest.values() if str(s) in e["thumbs"])
+        for s in sizes
+    }
+    return {
+        "previews": len(sources),
+        "built": len(todo) - len(failed),
+        "skipped": len(sources) - len(todo),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "source_bytes": source_bytes,
+        "thumb_bytes": thumb_bytes,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build multi-size WebP thumbnails for preview images.")
+    parser.add_argument("--previews", default=str(PREVIEWS_DIR))
+    parser.add_argument("--out", default=str(THUMBS_DIR))
+    parser.add_argument("--sizes", nargs="*", type=int, default=list(SIZES))
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild everything, ignoring the manifest")
+    args = parser.parse_args()
+
+    summary = build(Path(args.previews), Path(args.out), tuple(sorted(set(args.sizes))), args.quality,
+                    args.workers, args.force)
+
+    print(f"🖼  previews: {summary['previews']}  built: {summary['built']}  "
+          f"skipped: {summary['skipped']}  ({summary['seconds']}s)")
+    src_kb = summary["source_bytes"] / 1024
+    for size, nbytes in summary["thumb_bytes"].items():
+        ratio = f" ({100 * nbytes / summary['source_bytes']:.1f}% of originals)" if summary["source_bytes"] else ""
+        print(f"   {size:>4}px: {nbytes / 1024:.0f} KB{ratio}")
+    print(f"   originals: {src_kb:.0f} KB")
+    for name, err in summary["failed"].items():
+        print(f"❌ {name}: {err}")
+    print(f"✅ wrote: {Path(args.out) / MANIFEST_NAME}")
+
+
+if __name__ == "__main__":
+    main()
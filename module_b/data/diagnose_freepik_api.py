@@ -3,11 +3,16 @@ Freepik API 诊断脚本
 检查下载失败的具体原因
 """
 
-import os
-import requests
+import sys
+from pathlib import Path
 
-API_KEY = os.environ.get("FREEPIK_API_KEY", "")
-BASE_URL = "https://api.freepik.com/v1"
+# 共享的 Freepik HTTP 客户端在 module_b/ 下
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from freepik_api import FreepikClient  # noqa: E402
+
+# 诊断必须直接访问 API：不走共享的响应缓存，否则可能报告已失效资源/密钥的旧 200
+client = FreepikClient(cache=None)
+API_KEY = client.api_key
 
 # 测试资源：一个 Premium 3D 模型 和 一个免费图片
 TEST_RESOURCES = [
@@ -32,16 +37,12 @@ def check_api_status():
 
 def get_resource_detail(resource_id):
     """获取资源详情"""
-    url = f"{BASE_URL}/resources/{resource_id}"
-    headers = {"x-freepik-api-key": API_KEY}
-    return requests.get(url, headers=headers)
+    return client.resource(resource_id)
 
 
 def get_download_url(resource_id):
     """获取下载链接"""
-    url = f"{BASE_URL}/resources/{resource_id}/download"
-    headers = {"x-freepik-api-key": API_KEY}
-    return requests.get(url, headers=headers)
+    return client.download_info(resource_id)
 
 
 def diagnose_resource(resource_id, name, resource_type):
@@ -118,6 +119,7 @@ def main():
     print("\n" + "=" * 50)
     print("诊断完成")
     print("=" * 50)
+    client.print_stats()
     print("""
 📋 常见错误解读:
 
@@ -12,19 +12,37 @@ API 文档: https://docs.freepik.com/api-reference/resources/download-a-resource
 """
 
 import os
+import sys
 import json
 import time
-import requests
+import queue
+import threading
+from datetime import datetime
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+# 共享的 Freepik HTTP 客户端 / 下载器在 module_b/ 下
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from freepik_api import get_client  # noqa: E402
+from downloader import DownloadTask, Downloader  # noqa: E402
+from rate_limit import TokenBucket, backoff_delay, parse_retry_after  # noqa: E402
 
 # ============ 配置 ============
-API_KEY = os.environ.get("FREEPIK_API_KEY", "")
+API_KEY = get_client().api_key
 ASSETS_FILE = "./assets.json"
 DOWNLOAD_DIR = "./assets"
-DELAY_BETWEEN_DOWNLOADS = 1  # 秒，避免频率限制
+STORE_DIR = "./assets/.store"
+MAX_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", "4"))
 
-# Freepik API endpoints
-BASE_URL = "https://api.freepik.com/v1"
+# 流水线：解析（获取签名下载链接）与下载并行进行
+RESOLVE_RPS = float(os.environ.get("RESOLVE_RPS", "1"))  # 获取下载链接的频率上限（次/秒），避免频率限制
+RESOLVER_WORKERS = int(os.environ.get("RESOLVER_WORKERS", "2"))
+QUEUE_SIZE = int(os.environ.get("RESOLVE_QUEUE_SIZE", "8"))  # 预先解析的链接数上限
+DEFAULT_URL_TTL = 300  # 秒，链接未声明过期时间时的假定有效期
+EXPIRY_MARGIN = 30  # 秒，距过期不足该时间的链接在下载前重新获取
+RESOLVE_ATTEMPTS = int(os.environ.get("RESOLVE_ATTEMPTS", "6"))  # 获取下载链接的最大尝试次数（429 / 5xx / 网络错误）
 
 
 def load_assets(filepath):
@@ -33,12 +51,9 @@ def load_assets(filepath):
         return json.load(f)
 
 
-def get_resource_detail(resource_id, api_key):
+def get_resource_detail(resource_id):
     """获取资源详情"""
-    url = f"{BASE_URL}/resources/{resource_id}"
-    headers = {"x-freepik-api-key": api_key}
-    
-    response = requests.get(url, headers=headers)
+    response = get_client().resource(resource_id)
     
     if response.status_code == 200:
         return response.json()
@@ -47,33 +62,103 @@ def get_resource_detail(resource_id, api_key):
         return None
 
 
-def get_download_url(resource_id, api_key):
-    """获取下载链接"""
-    url = f"{BASE_URL}/resources/{resource_id}/download"
-    headers = {"x-freepik-api-key": api_key}
-    
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()
-        return data.get("data", {})
-    else:
+def get_download_url(resource_id, limiter=None, max_attempts=RESOLVE_ATTEMPTS):
+    """
+    获取下载链接
+    - 429: 按 Retry-After 暂停所有解析线程并降速（limiter.penalize），然后重试
+    - 5xx / 网络错误: 指数退避 + 抖动后重试
+    """
+    last_error = None
+    for attempt in range(max_attempts):
+        if limiter:
+            limiter.acquire()
+        try:
+            response = get_client().download_info(resource_id)
+        except requests.RequestException as e:
+            last_error = str(e)
+            time.sleep(backoff_delay(attempt))
+            continue
+        
+        if response.status_code == 200:
+            if limiter:
+                limiter.reward()
+            data = response.json()
+            return data.get("data", {})
+        if response.status_code == 429:
+            last_error = "HTTP 429"
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if limiter:
+                limiter.penalize(retry_after)
+            else:
+                time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+            continue
+        if response.status_code >= 500:
+            last_error = f"HTTP {response.status_code}"
+            time.sleep(backoff_delay(attempt))
+            continue
         print(f"  ⚠ 获取下载链接失败: {response.status_code} - {response.text}")
         return None
+    
+    print(f"  ⚠ 获取下载链接失败: 重试 {max_attempts} 次后仍失败 ({last_error})")
+    return None
 
 
-def download_file(url, filepath):
-    """下载文件到本地"""
-    response = requests.get(url, stream=True)
-    
-    if response.status_code == 200:
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        return True
-    else:
-        print(f"  ⚠ 下载失败: {response.status_code}")
-        return False
+def parse_expiry(url, info):
+    """
+    估计签名下载链接的过期时间（epoch 秒）。
+    依次尝试：API 返回的 expires 字段、URL 中的 Expires / exp、X-Amz-Date + X-Amz-Expires。
+    """
+    for key in ("expires_at", "expires", "expiration"):
+        value = info.get(key)
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                try:
+                    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+                except ValueError:
+                    pass
+
+    qs = {k.lower(): v[0] for k, v in parse_qs(urlparse(url).query).items()}
+    for key in ("expires", "exp"):
+        if qs.get(key, "").isdigit():
+            return float(qs[key])
+    if "x-amz-date" in qs and qs.get("x-amz-expires", "").isdigit():
+        try:
+            signed = datetime.strptime(qs["x-amz-date"] + "+0000", "%Y%m%dT%H%M%SZ%z").timestamp()
+            return signed + float(qs["x-amz-expires"])
+        except ValueError:
+            pass
+
+    return time.time() + DEFAULT_URL_TTL
+
+
+class StageStats:
+    """单个流水线阶段的吞吐统计（线程安全）"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.busy_s = 0.0
+        self.wait_s = 0.0  # 阻塞在队列上的时间
+        self._lock = threading.Lock()
+
+    def add(self, busy_s=0.0, wait_s=0.0, items=0, nbytes=0):
+        with self._lock:
+            self.busy_s += busy_s
+            self.wait_s += wait_s
+            self.items += items
+            self.bytes += nbytes
+
+    def line(self, elapsed, workers):
+        rate = self.items / elapsed if elapsed else 0.0
+        util = self.busy_s / (elapsed * workers) if elapsed else 0.0
+        extra = f", {self.bytes / 1024 / 1024 / elapsed:.2f} MB/s" if self.bytes and elapsed else ""
+        return (f"  {self.name:<8} {self.items} 项, {rate:.2f} 项/秒{extra}, "
+                f"利用率 {util:.0%}, 队列等待 {self.wait_s:.1f}s")
 
 
 def main():
@@ -96,76 +181,132 @@ def main():
         print(f"❌ 找不到 {ASSETS_FILE}")
         return
     
-    # 统计
-    success_count = 0
-    fail_count = 0
-    skipped_count = 0
+    limiter = TokenBucket(rate=RESOLVE_RPS, capacity=1)
+    downloader = Downloader(Path(STORE_DIR), max_workers=MAX_WORKERS)
+    
+    todo = queue.Queue()
+    ready = queue.Queue(maxsize=QUEUE_SIZE)
+    resolve_stats = StageStats("resolve")
+    download_stats = StageStats("download")
+    counts = {}
+    counts_lock = threading.Lock()
+    
+    def count(key):
+        with counts_lock:
+            counts[key] = counts.get(key, 0) + 1
     
-    # 遍历下载
     for i, asset in enumerate(assets, 1):
-        asset_id = asset.get("id", f"unknown_{i}")
-        name = asset.get("name", "Unknown")
-        freepik_id = asset.get("freepik_id")
-        
-        print(f"[{i}/{len(assets)}] {name}")
-        
-        # 检查 freepik_id
-        if not freepik_id:
-            print("  ⚠ 无 freepik_id，跳过")
-            skipped_count += 1
+        if not asset.get("freepik_id"):
+            print(f"[{i}/{len(assets)}] {asset.get('name', 'Unknown')}: ⚠ 无 freepik_id，跳过")
+            count("skipped")
             continue
-        
-        # 检查是否已下载
-        # 由于不知道文件扩展名，先获取下载信息
-        
-        try:
-            # 1. 获取下载链接
-            print(f"  → 获取下载链接 (ID: {freepik_id})...")
-            download_info = get_download_url(freepik_id, API_KEY)
-            
-            if not download_info:
-                fail_count += 1
-                continue
-            
-            download_url = download_info.get("url")
-            filename = download_info.get("filename", f"{asset_id}.zip")
-            
-            if not download_url:
-                print("  ⚠ 无下载链接")
-                fail_count += 1
+        todo.put(asset)
+    
+    def resolve(asset):
+        """获取签名下载链接 -> DownloadTask + 过期时间"""
+        asset_id = asset.get("id", "unknown")
+        download_info = get_download_url(asset.get("freepik_id"), limiter)
+        if not download_info or not download_info.get("url"):
+            return None
+        url = download_info["url"]
+        filename = download_info.get("filename", f"{asset_id}.zip")
+        # 签名链接每次解析都不同：.part 文件按资源 ID 命名，重新获取链接后仍可续传
+        task = DownloadTask(url=url, dest=download_path / f"{asset_id}_{filename}", label=asset.get("name", ""),
+                            resume_key=f"freepik:{asset.get('freepik_id')}")
+        return task, parse_expiry(url, download_info)
+    
+    # 1. 解析阶段：提前获取下载链接，放入有界队列
+    def resolver():
+        while True:
+            try:
+                asset = todo.get_nowait()
+            except queue.Empty:
+                return
+            t0 = time.perf_counter()
+            try:
+                resolved = resolve(asset)
+            except Exception as e:
+                print(f"  ❌ {asset.get('name')}: {e}")
+                resolved = None
+            resolve_stats.add(busy_s=time.perf_counter() - t0, items=1)
+            if not resolved:
+                count("failed")
                 continue
-            
-            # 2. 构建本地文件路径
-            local_filepath = download_path / f"{asset_id}_{filename}"
-            
-            # 检查是否已存在
-            if local_filepath.exists():
-                print(f"  ✓ 已存在: {local_filepath.name}")
-                skipped_count += 1
+            t1 = time.perf_counter()
+            ready.put((asset, resolved))  # 队列满说明下载是瓶颈
+            resolve_stats.add(wait_s=time.perf_counter() - t1)
+    
+    # 2. 下载阶段：从队列取链接并下载，链接临近过期则重新获取
+    def download_worker():
+        while True:
+            t0 = time.perf_counter()
+            item = ready.get()  # 队列空说明解析是瓶颈
+            if item is None:
+                # 等待结束信号的时间不算作等待解析，否则瓶颈判断会偏向解析阶段
+                return
+            download_stats.add(wait_s=time.perf_counter() - t0)
+            asset, (task, expires_at) = item
+            t1 = time.perf_counter()
+            try:
+                if expires_at - time.time() < EXPIRY_MARGIN:
+                    print(f"  ↻ 链接即将过期，重新获取: {asset.get('name')}")
+                    resolved = resolve(asset)
+                    if resolved:
+                        task, expires_at = resolved
+                result = downloader.download(task)
+                if result.status == "failed" and result.error and ("HTTP 403" in result.error or "HTTP 410" in result.error):
+                    # 签名可能已失效：重新获取一次
+                    resolved = resolve(asset)
+                    if resolved:
+                        result = downloader.download(resolved[0])
+            except Exception as e:
+                print(f"  ❌ {asset.get('name')}: {e}")
+                count("failed")
+                download_stats.add(busy_s=time.perf_counter() - t1)
                 continue
             
-            # 3. 下载文件
-            print(f"  → 下载中: {filename}...")
-            if download_file(download_url, local_filepath):
-                print(f"  ✓ 已保存: {local_filepath.name}")
-                success_count += 1
+            download_stats.add(busy_s=time.perf_counter() - t1, items=1,
+                               nbytes=result.size if result.status != "skipped" else 0)
+            if result.status == "failed":
+                print(f"  ❌ {result.task.dest.name}: {result.error}")
+                count("failed")
+            elif result.status == "skipped":
+                print(f"  ✓ 已存在: {result.task.dest.name}")
+                count("skipped")
             else:
-                fail_count += 1
-            
-            # 延迟，避免频率限制
-            time.sleep(DELAY_BETWEEN_DOWNLOADS)
-            
-        except Exception as e:
-            print(f"  ❌ 错误: {e}")
-            fail_count += 1
+                print(f"  ✓ 已保存: {result.task.dest.name} ({result.status}, {result.size / 1024:.0f} KB)")
+                count("success")
+    
+    print(f"→ 流水线下载: resolvers={RESOLVER_WORKERS}, downloaders={MAX_WORKERS}, 队列={QUEUE_SIZE}")
+    started = time.perf_counter()
+    resolvers = [threading.Thread(target=resolver, daemon=True) for _ in range(max(1, RESOLVER_WORKERS))]
+    workers = [threading.Thread(target=download_worker, daemon=True) for _ in range(max(1, MAX_WORKERS))]
+    for t in resolvers + workers:
+        t.start()
+    for t in resolvers:
+        t.join()
+    for _ in workers:
+        ready.put(None)
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
     
     # 汇总
     print("\n" + "=" * 50)
     print("下载完成!")
-    print(f"  ✓ 成功: {success_count}")
-    print(f"  ⚠ 跳过: {skipped_count}")
-    print(f"  ❌ 失败: {fail_count}")
+    print(f"  ✓ 成功: {counts.get('success', 0)}")
+    print(f"  ⚠ 跳过: {counts.get('skipped', 0)}")
+    print(f"  ❌ 失败: {counts.get('failed', 0)}")
     print(f"  📁 保存目录: {download_path.absolute()}")
+    
+    print(f"\n⏱ 流水线统计 ({elapsed:.1f}s)")
+    print(resolve_stats.line(elapsed, max(1, RESOLVER_WORKERS)))
+    print(download_stats.line(elapsed, max(1, MAX_WORKERS)))
+    if download_stats.wait_s > resolve_stats.wait_s:
+        print("  → 瓶颈: 解析阶段（下载线程在等链接），可提高 RESOLVE_RPS / RESOLVER_WORKERS")
+    else:
+        print("  → 瓶颈: 下载阶段（解析线程在等队列空位），可提高 DOWNLOAD_WORKERS")
+    get_client().print_stats()
 
 
 if __name__ == "__main__":
@@ -1,39 +1,32 @@
 """
 下载 Freepik 3D 模型预览图
 预览图是公开的，不需要 API Key
+
+并发下载（DOWNLOAD_WORKERS 控制并发数），支持断点续传，
+文件按内容哈希存储在 ./assets/.store，重复的预览图只存一份。
 """
 
 import os
+import sys
 import json
-import requests
 from pathlib import Path
 
+# 共享的 Freepik HTTP 客户端 / 下载器在 module_b/ 下
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from freepik_api import get_client  # noqa: E402
+from downloader import DownloadTask, Downloader  # noqa: E402
+
 ASSETS_FILE = "./assets.json"
 DOWNLOAD_DIR = "./assets/previews"
-
-
-def download_preview(url, filepath):
-    """下载预览图"""
-    try:
-        response = requests.get(url, stream=True, timeout=30)
-        if response.status_code == 200:
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return True
-        else:
-            print(f"    ⚠ HTTP {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"    ⚠ 错误: {e}")
-        return False
+STORE_DIR = "./assets/.store"
+MAX_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", "6"))
 
 
 def main():
     # 创建下载目录
     download_path = Path(DOWNLOAD_DIR)
     download_path.mkdir(parents=True, exist_ok=True)
-    
+
     # 加载素材列表
     print("正在加载 assets.json...")
     try:
@@ -43,48 +36,51 @@ def main():
     except FileNotFoundError:
         print(f"❌ 找不到 {ASSETS_FILE}")
         return
-    
-    success = 0
-    failed = 0
-    skipped = 0
-    
+
+    tasks = []
+    no_url = 0
+
     for i, asset in enumerate(assets, 1):
         asset_id = asset.get("id", f"unknown_{i}")
         name = asset.get("name", "Unknown")
         preview_url = asset.get("preview_url")
-        
-        print(f"[{i}/{len(assets)}] {name}")
-        
+
         if not preview_url:
+            print(f"[{i}/{len(assets)}] {name}")
             print("    ⚠ 无 preview_url，跳过")
-            skipped += 1
+            no_url += 1
             continue
-        
+
         # 确定文件名
         filename = f"{asset_id}_{name.lower().replace(' ', '_')}.png"
-        filepath = download_path / filename
-        
-        # 检查是否已存在
-        if filepath.exists():
-            print(f"    ✓ 已存在: {filename}")
-            skipped += 1
-            continue
-        
-        # 下载
-        print(f"    → 下载中...")
-        if download_preview(preview_url, filepath):
-            print(f"    ✓ 已保存: {filename}")
-            success += 1
+        tasks.append(DownloadTask(url=preview_url, dest=download_path / filename, label=name))
+
+    counts = {}
+
+    def report(result):
+        counts[result.status] = counts.get(result.status, 0) + 1
+        name = result.task.dest.name
+        if result.status == "failed":
+            print(f"    ❌ {name}: {result.error}")
+        elif result.status == "skipped":
+            print(f"    ✓ 已存在: {name}")
         else:
-            failed += 1
-    
+            print(f"    ✓ 已保存: {name} ({result.status}, {result.size / 1024:.0f} KB, {result.seconds:.2f}s)")
+
+    # 下载
+    print(f"→ 并发下载 {len(tasks)} 个预览图 (workers={MAX_WORKERS})...")
+    downloader = Downloader(Path(STORE_DIR), max_workers=MAX_WORKERS)
+    downloader.download_all(tasks, on_result=report)
+
     # 汇总
+    success = counts.get("downloaded", 0) + counts.get("resumed", 0) + counts.get("deduped", 0)
     print("\n" + "=" * 50)
     print("下载完成!")
-    print(f"  ✓ 成功: {success}")
-    print(f"  ⚠ 跳过: {skipped}")
-    print(f"  ❌ 失败: {failed}")
+    print(f"  ✓ 成功: {success} (续传 {counts.get('resumed', 0)}, 重复内容 {counts.get('deduped', 0)})")
+    print(f"  ⚠ 跳过: {counts.get('skipped', 0) + no_url}")
+    print(f"  ❌ 失败: {counts.get('failed', 0)}")
     print(f"  📁 保存目录: {download_path.absolute()}")
+    get_client().print_stats()
 
 
 if __name__ == "__main__":
@@ -1,45 +1,113 @@
 """
 获取 Freepik 3D 模型预览图 URL
 运行此脚本会访问每个 freepik_url 并提取预览图链接
+
+页面以流式分块读取，预编译的正则在滑动窗口上匹配，找到预览图后立即断开连接，
+不再下载整页 HTML。多个素材在限速（PREVIEW_RPS）下并发处理（PREVIEW_WORKERS）。
 """
 
+import codecs
 import json
+import os
 import re
-import time
-import requests
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# 共享的 Freepik HTTP 客户端在 module_b/ 下
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from freepik_api import get_client  # noqa: E402
+from rate_limit import TokenBucket  # noqa: E402
+
 ASSETS_FILE = "./assets.json"
 OUTPUT_FILE = "./assets_with_previews.json"
 
+PREVIEW_WORKERS = int(os.environ.get("PREVIEW_WORKERS", "4"))
+PREVIEW_RPS = float(os.environ.get("PREVIEW_RPS", "1"))  # 页面请求频率上限，避免被封（缓存命中不计）
 
-def get_preview_url(freepik_url):
-    """从 Freepik 页面获取预览图 URL"""
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-        }
-        response = requests.get(freepik_url, headers=headers, timeout=15)
-        
-        if response.status_code == 200:
-            # 查找预览图 URL 模式
-            # 3D 模型: https://img.freepik.com/3d-models/v2/.../xxx-poster-1.png
-            pattern_3d = r'https://img\.freepik\.com/3d-models/v2/[^"\']+poster-1\.png'
-            # 普通图片: https://img.freepik.com/free-photo/...
-            pattern_photo = r'https://img\.freepik\.com/free-photo/[^"\']+\.jpg'
-            
-            match_3d = re.search(pattern_3d, response.text)
-            if match_3d:
+CHUNK_SIZE = 16 * 1024
+WINDOW_OVERLAP = 4096  # 跨块边界的 URL 也能匹配到
+FALLBACK_LOOKAHEAD = 256 * 1024  # 只找到普通图片时，再多读这么多字节寻找 3D 预览图
+
+# 查找预览图 URL 模式（按优先级）
+PREVIEW_PATTERNS = [
+    # 3D 模型: https://img.freepik.com/3d-models/v2/.../xxx-poster-1.png
+    re.compile(r'https://img\.freepik\.com/3d-models/v2/[^"\'\s<>]+poster-1\.png'),
+    # 普通图片: https://img.freepik.com/free-photo/...
+    re.compile(r'https://img\.freepik\.com/free-photo/[^"\'\s<>]+\.jpg'),
+]
+
+_bytes_lock = threading.Lock()
+bytes_read = 0
+
+
+def scan_for_preview(chunks):
+    """
+    在分块到达时用滑动窗口匹配预览图 URL。
+    最高优先级的模式一旦命中立即返回；低优先级命中后最多再读 FALLBACK_LOOKAHEAD 字节。
+
+    Returns:
+        (preview_url 或 None, 已读取的原始字节)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    consumed = bytearray()
+    window = ""
+    best = None  # (优先级, url)
+    best_at = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        consumed.extend(chunk)
+        window = window[-WINDOW_OVERLAP:] + decoder.decode(chunk)
+
+        for priority, pattern in enumerate(PREVIEW_PATTERNS):
+            if best is not None and priority >= best[0]:
+                break
+            m = pattern.search(window)
+            if m:
                 # 清理 URL（移除查询参数）
-                url = match_3d.group(0).split('?')[0]
-                return url
-            
-            match_photo = re.search(pattern_photo, response.text)
-            if match_photo:
-                url = match_photo.group(0).split('?')[0]
-                return url
-                
-        return None
+                best = (priority, m.group(0).split('?')[0])
+                best_at = len(consumed)
+                break
+
+        if best is not None:
+            if best[0] == 0:
+                break
+            if len(consumed) - best_at >= FALLBACK_LOOKAHEAD:
+                break
+
+    return (best[1] if best else None), bytes(consumed)
+
+
+def get_preview_url(freepik_url, limiter=None):
+    """从 Freepik 页面获取预览图 URL（流式读取，命中即断开）"""
+    global bytes_read
+    client = get_client()
+    try:
+        # 完整页面（例如其他脚本缓存的）或本脚本缓存的前缀都可以扫描
+        cached = client.peek(freepik_url, "page") or client.peek(freepik_url, "page", partial=True)
+        if cached is not None:
+            return scan_for_preview(cached.iter_content(CHUNK_SIZE))[0]
+        if client.cache is not None and client.cache.offline:
+            print(f"    离线模式，未缓存: {freepik_url}")
+            return None
+
+        # 限速避免被封
+        if limiter:
+            limiter.acquire()
+
+        with client.fetch_page(freepik_url, timeout=15, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            url, consumed = scan_for_preview(response.iter_content(CHUNK_SIZE))
+
+        with _bytes_lock:
+            bytes_read += len(consumed)
+        # 缓存已读取的前缀（单独的 partial 键）：重新扫描它会得到同样的结果
+        client.remember_partial(freepik_url, "page", response, consumed)
+        return url
     except Exception as e:
         print(f"    错误: {e}")
         return None
@@ -50,44 +118,41 @@ def main():
     print("加载 assets.json...")
     with open(ASSETS_FILE, 'r', encoding='utf-8') as f:
         assets = json.load(f)
-    
+
     print(f"共 {len(assets)} 个素材\n")
-    
-    # 遍历获取预览图
+
+    # 如果已有预览图，跳过
+    todo = []
     for i, asset in enumerate(assets, 1):
         name = asset.get("name", "Unknown")
-        freepik_url = asset.get("freepik_url", "")
-        current_preview = asset.get("preview_url", "")
-        
-        print(f"[{i}/{len(assets)}] {name}")
-        
-        # 如果已有预览图，跳过
-        if current_preview:
-            print(f"    ✓ 已有预览图")
-            continue
-        
-        if not freepik_url:
-            print(f"    ⚠ 无 freepik_url")
-            continue
-        
-        # 获取预览图
-        print(f"    → 获取预览图...")
-        preview_url = get_preview_url(freepik_url)
-        
-        if preview_url:
-            asset["preview_url"] = preview_url
-            print(f"    ✓ {preview_url[:60]}...")
+        if asset.get("preview_url"):
+            print(f"[{i}/{len(assets)}] {name}: ✓ 已有预览图")
+        elif not asset.get("freepik_url"):
+            print(f"[{i}/{len(assets)}] {name}: ⚠ 无 freepik_url")
         else:
-            print(f"    ⚠ 未找到预览图")
-        
-        # 延迟避免被封
-        time.sleep(1)
-    
+            todo.append(asset)
+
+    # 并发获取预览图
+    print(f"\n→ 获取 {len(todo)} 个预览图 (workers={PREVIEW_WORKERS}, {PREVIEW_RPS} 次/秒)...")
+    limiter = TokenBucket(rate=PREVIEW_RPS, capacity=1)
+    with ThreadPoolExecutor(max_workers=max(1, PREVIEW_WORKERS)) as pool:
+        futures = {pool.submit(get_preview_url, a["freepik_url"], limiter): a for a in todo}
+        for fut in as_completed(futures):
+            asset = futures[fut]
+            preview_url = fut.result()
+            if preview_url:
+                asset["preview_url"] = preview_url
+                print(f"    ✓ {asset.get('name')}: {preview_url[:60]}...")
+            else:
+                print(f"    ⚠ {asset.get('name')}: 未找到预览图")
+
     # 保存结果
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(assets, f, indent=2, ensure_ascii=False)
-    
+
     print(f"\n✓ 已保存到 {OUTPUT_FILE}")
+    print(f"  页面读取: {bytes_read / 1024:.0f} KB")
+    get_client().print_stats()
 
 
 if __name__ == "__main__":
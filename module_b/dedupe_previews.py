@@ -0,0 +1,299 @@
+"""
+Near-duplicate detection over preview images.
+
+1. Perceptual hashes (64-bit pHash + dHash) for every preview, computed in a process pool.
+2. Hashes are np.packbits'ed to 8 bytes each; all-pairs Hamming distances are
+   computed vectorized (XOR + popcount lookup table) in row blocks.
+3. Visually close pairs are confirmed with the cosine similarity of their text
+   embeddings (assets_embeddings.json), so two different assets that merely share
+   a look (e.g. two plain gradient backgrounds) are not merged unless their
+   descriptions agree too.
+4. Confirmed pairs are grouped (union-find); each group keeps one asset.
+
+Outputs:
+    data/dedupe_report.json    every candidate pair with distances, plus the clusters
+    data/assets.deduped.json   the catalog minus dropped duplicates; keepers list
+                               their `duplicates`. setup_db.py / upload_to_qdrant.py
+                               only index ids present here when the file exists.
+
+Usage (from module_b/):
+    python dedupe_previews.py [--phash 8] [--dhash 10] [--cosine 0.85] [--no-embedding-check]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+MODULE_DIR = Path(__file__).parent
+ASSETS_FILE = MODULE_DIR / "data" / "assets.json"
+EMBEDDINGS_FILE = MODULE_DIR / "data" / "assets_embeddings.json"
+PREVIEWS_DIR = MODULE_DIR / "data" / "assets" / "previews"
+REPORT_FILE = MODULE_DIR / "data" / "dedupe_report.json"
+DEDUPED_FILE = MODULE_DIR / "data" / "assets.deduped.json"
+
+PHASH_THRESHOLD = 8  # max differing bits out of 64
+DHASH_THRESHOLD = 10
+COSINE_THRESHOLD = 0.85
+BLOCK_ROWS = 1024  # rows per Hamming block; bounds memory at BLOCK_ROWS * N * 8 bytes
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+# -----------------------------
+# Hashing (runs in worker processes)
+# -----------------------------
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def _grayscale(path: str) -> Image.Image:
+    """Flatten transparency onto white so cut-out previews compare by shape, not by alpha junk."""
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        bg = Image.new("RGBA", im.size, (255, 255, 255, 255))
+        return Image.alpha_composite(bg, im).convert("L")
+
+
+def image_hashes(path: str) -> Tuple[str, bytes, bytes, Tuple[int, int]]:
+    """Return (path, packed pHash, packed dHash, (width, height))."""
+    gray = _grayscale(path)
+
+    # dHash: is each pixel brighter than its right neighbour, on a 9x8 thumbnail.
+    d = np.asarray(gray.resize((9, 8), Image.LANCZOS), dtype=np.float32)
+    dbits = (d[:, 1:] > d[:, :-1]).ravel()
+
+    # pHash: low-frequency 8x8 block of the 32x32 DCT, thresholded at its median (DC term excluded).
+    p = np.asarray(gray.resize((32, 32), Image.LANCZOS), dtype=np.float64)
+    low = (_DCT32 @ p @ _DCT32.T)[:8, :8].ravel()
+    pbits = low > np.median(low[1:])
+
+    return path, np.packbits(pbits).tobytes(), np.packbits(dbits).tobytes(), gray.size
+
+
+# -----------------------------
+# Vectorized comparisons
+# -----------------------------
+
+def hamming_pairs(packed: np.ndarray, threshold: int) -> List[Tuple[int, int, int]]:
+    """
+    All (i, j, distance) with i < j and Hamming distance <= threshold.
+    packed: (N, 8) uint8 from np.packbits.
+    """
+    n = packed.shape[0]
+    out: List[Tuple[int, int, int]] = []
+    for start in range(0, n, BLOCK_ROWS):
+        block = packed[start:start + BLOCK_ROWS]
+        dist = POPCOUNT[np.bitwise_xor(block[:, None, :], packed[None, :, :])].sum(axis=2, dtype=np.int32)
+        rows, cols = np.nonzero(dist <= threshold)
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            i = start + r
+            if i < c:
+                out.append((i, c, int(dist[r, c])))
+    return out
+
+
+def hamming(a: np.ndarray, b: np.ndarray) -> int:
+    return int(POPCOUNT[np.bitwise_xor(a, b)].sum())
+
+
+def cosine_matrix(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+    return unit @ unit.T
+
+
+# -----------------------------
+# Catalog helpers
+# -----------------------------
+
+def preview_for(asset: Dict[str, Any], previews_dir: Path) -> Optional[Path]:
+    """Same naming convention as download_previews.py / AssetRetriever: asset_001_sphere.png."""
+    name = (asset.get("name") or "Unknown").lower().replace(" ", "_")
+    path = previews_dir / f"{asset.get('id')}_{name}.png"
+    if path.exists():
+        return path
+    matches = sorted(previews_dir.glob(f"{asset.get('id')}_*"))
+    return matches[0] if matches else None
+
+
+def keeper_rank(asset: Dict[str, Any], size: Tuple[int, int]) -> Tuple[int, int, int, str]:
+    """Lower sorts first: prefer assets with provenance, then richer tags, then larger previews, then id."""
+    has_provenance = bool(asset.get("freepik_url") or asset.get("freepik_id"))
+    return (0 if has_provenance else 1, -len(asset.get("tags") or []), -(size[0] * size[1]), str(asset.get("id")))
+
+
+class UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def dedupe(
+    assets: List[Dict[str, Any]],
+    embeddings: Dict[str, List[float]],
+    previews_dir: Path = PREVIEWS_DIR,
+    phash_threshold: int = PHASH_THRESHOLD,
+    dhash_threshold: int = DHASH_THRESHOLD,
+    cosine_threshold: Optional[float] = COSINE_THRESHOLD,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Find near-duplicate assets. cosine_threshold=None skips the embedding check
+    (visual similarity alone confirms a pair). Returns the report dict.
+    """
+    indexed = [(a, preview_for(a, previews_dir)) for a in assets]
+    hashed = [(a, p) for a, p in indexed if p is not None]
+    missing = [a.get("id") for a, p in indexed if p is None]
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(image_hashes, [str(p) for _, p in hashed], chunksize=8))
+    hash_s = time.perf_counter() - t0
+
+    phashes = np.frombuffer(b"".join(r[1] for r in results), dtype=np.uint8).reshape(-1, 8)
+    dhashes = np.frombuffer(b"".join(r[2] for r in results), dtype=np.uint8).reshape(-1, 8)
+    sizes = [r[3] for r in results]
+    ids = [a.get("id") for a, _ in hashed]
+
+    # Candidates: close on either hash.
+    candidates: Dict[Tuple[int, int], Dict[str, int]] = {}
+    for i, j, dist in hamming_pairs(phashes, phash_threshold):
+        candidates[(i, j)] = {"phash": dist}
+    for i, j, dist in hamming_pairs(dhashes, dhash_threshold):
+        candidates.setdefault((i, j), {})["dhash"] = dist
+
+    have_vec = [ids[k] in embeddings for k in range(len(ids))]
+    cos: Optional[np.ndarray] = None
+    if cosine_threshold is not None and any(have_vec):
+        dim = len(next(iter(embeddings.values())))
+        vectors = np.array([embeddings.get(i) or [0.0] * dim for i in ids], dtype=np.float32)
+        cos = cosine_matrix(vectors)
+
+    uf = UnionFind(len(ids))
+    pairs: List[Dict[str, Any]] = []
+    for (i, j), dists in sorted(candidates.items()):
+        pair: Dict[str, Any] = {
+            "a": ids[i],
+            "b": ids[j],
+            "phash": dists.get("phash", hamming(phashes[i], phashes[j])),
+            "dhash": dists.get("dhash", hamming(dhashes[i], dhashes[j])),
+        }
+        if cosine_threshold is None:
+            pair["confirmed"] = True
+        elif cos is not None and have_vec[i] and have_vec[j]:
+            pair["cosine"] = round(float(cos[i, j]), 4)
+            pair["confirmed"] = pair["cosine"] >= cosine_threshold
+        else:
+            pair["confirmed"] = False  # no embedding to confirm with; report only
+        if pair["confirmed"]:
+            uf.union(i, j)
+        pairs.append(pair)
+
+    groups: Dict[int, List[int]] = {}
+    for k in range(len(ids)):
+        groups.setdefault(uf.find(k), []).append(k)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda k: keeper_rank(hashed[k][0], sizes[k]))
+        clusters.append({"keep": ids[members[0]], "drop": [ids[k] for k in members[1:]]})
+    clusters.sort(key=lambda c: str(c["keep"]))
+
+    return {
+        "thresholds": {"phash": phash_threshold, "dhash": dhash_threshold, "cosine": cosine_threshold},
+        "hashed": len(ids),
+        "missing_previews": missing,
+        "hash_seconds": round(hash_s, 2),
+        "pairs": pairs,
+        "clusters": clusters,
+        "dropped": sum(len(c["drop"]) for c in clusters),
+    }
+
+
+def prune(assets: List[Dict[str, Any]], report: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Catalog without dropped duplicates; keepers record what they absorbed."""
+    drop = {d for c in report["clusters"] for d in c["drop"]}
+    absorbed = {c["keep"]: c["drop"] for c in report["clusters"]}
+    out = []
+    for a in assets:
+        if a.get("id") in drop:
+            continue
+        if a.get("id") in absorbed:
+            a = dict(a, duplicates=absorbed[a["id"]])
+        out.append(a)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find near-duplicate previews and write a pruned catalog.")
+    parser.add_argument("--assets", default=str(ASSETS_FILE))
+    parser.add_argument("--embeddings", default=str(EMBEDDINGS_FILE))
+    parser.add_argument("--previews", default=str(PREVIEWS_DIR))
+    parser.add_argument("--phash", type=int, default=PHASH_THRESHOLD, help="max pHash Hamming distance")
+    parser.add_argument("--dhash", type=int, default=DHASH_THRESHOLD, help="max dHash Hamming distance")
+    parser.add_argument("--cosine", type=float, default=COSINE_THRESHOLD, help="min embedding cosine to confirm")
+    parser.add_argument("--no-embedding-check", action="store_true", help="confirm pairs on visual similarity alone")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", default=str(REPORT_FILE))
+    parser.add_argument("--out", default=str(DEDUPED_FILE))
+    args = parser.parse_args()
+
+    assets: List[Dict[str, Any]] = json.loads(Path(args.assets).read_text(encoding="utf-8"))
+    embeddings: Dict[str, List[float]] = {}
+    emb_path = Path(args.embeddings)
+    if emb_path.exists():
+        embeddings = {e["id"]: e["embedding"] for e in json.loads(emb_path.read_text(encoding="utf-8"))}
+    elif not args.no_embedding_check:
+        print(f"⚠️ {emb_path} not found; pairs will be reported but not pruned")
+
+    report = dedupe(
+        assets,
+        embeddings,
+        Path(args.previews),
+        args.phash,
+        args.dhash,
+        None if args.no_embedding_check else args.cosine,
+        args.workers,
+    )
+    deduped = prune(assets, report)
+
+    Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    Path(args.out).write_text(json.dumps(deduped, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    confirmed = sum(1 for p in report["pairs"] if p["confirmed"])
+    print(f"🔎 hashed {report['hashed']} previews in {report['hash_seconds']}s "
+          f"({len(report['missing_previews'])} assets without a preview)")
+    print(f"   candidate pairs: {len(report['pairs'])}, confirmed: {confirmed}")
+    for c in report["clusters"]:
+        print(f"   keep {c['keep']}  drop {', '.join(c['drop'])}")
+    print(f"✅ wrote: {args.report}")
+    print(f"✅ wrote: {args.out} ({len(deduped)}/{len(assets)} assets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Demo Qdrant helpers for run_pipeline.py: model-free top-k scoring plus client setup.
+
+(Not named qdrant_client.py: scripts run from module_b/ would import it instead of
+the qdrant-client package.)
+"""
+import os
+from typing import List, Dict, Any, Tuple
+
+try:
+    from qdrant_client import QdrantClient
+    from qdrant_client.http import models as rest
+except Exception:
+    QdrantClient = None
+    rest = None
+
+try:
+    from module_b.hashed_embedder import HashedNgramEmbedder, asset_text
+except ImportError:  # run from inside module_b/
+    from hashed_embedder import HashedNgramEmbedder, asset_text
+
+# Deterministic, model-free embedding so the demo runs without external model calls
+EMBED_DIM = int(os.getenv("DEMO_EMBED_DIM", "512"))
+_embedder = HashedNgramEmbedder(dim=EMBED_DIM)
+
+
+def qdrant_topk_fallback(query: str, candidates: List[Dict[str, Any]], k: int = 5) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Rank candidates by cosine similarity of hashed n-gram embeddings of the query and
+    each candidate's name / tags / description (or just its asset_id), scored as one
+    candidate matrix.
+    """
+    matrix = _embedder.embed_many(asset_text(c) for c in candidates)
+    idx, scores = _embedder.top_k(query, matrix, k)
+    topk = [
+        {"asset_id": candidates[i]["asset_id"], "score": round(float(s), 4), "source": candidates[i].get("source", "unknown")}
+        for i, s in zip(idx, scores)
+    ]
+    selected = topk[0] if topk else {"asset_id": None, "score": 0.0}
+    return topk, selected
+
+
+def qdrant_client() -> Any:
+    url = os.getenv("QDRANT_URL", "http://localhost:6333")
+    api_key = os.getenv("QDRANT_API_KEY", "")
+    if QdrantClient is None:
+        return None
+    return QdrantClient(url=url, api_key=api_key if api_key else None)
+
+
+def ensure_collection(client: Any, name: str = "assets", dim: int = EMBED_DIM) -> None:
+    if client is None or rest is None:
+        return
+    try:
+        client.get_collection(name)
+    except Exception:
+        client.create_collection(
+            collection_name=name,
+            vectors_config=rest.VectorParams(size=dim, distance=rest.Distance.COSINE),
+        )
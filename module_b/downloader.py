@@ -0,0 +1,293 @@
+"""
+Parallel, resumable, content-addressed file downloader.
+
+- Bounded parallelism (thread pool over the shared pooled Freepik client).
+- Partial downloads live in <store>/partial/*.part and are resumed with HTTP Range.
+- Finished files are hashed (SHA-256), verified against an
+  expected checksum when one is given, and moved atomically into
+  <store>/sha256/ab/<digest>. Identical content is stored once.
+- The requested destination path (e.g. previews/asset_001_sphere.png) is a hard
+  link to the blob (copy if links are unsupported), swapped in atomically.
+- <store>/manifest.json maps destination -> digest/size/url, so reruns skip
+  verified files instead of trusting mere filename existence.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+from freepik_api import FreepikClient, get_client
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_WORKERS = int(os.environ.get("DOWNLOAD_WORKERS", "6"))
+MAX_ATTEMPTS = 4
+# 4xx statuses that can succeed on a retry; any other 4xx fails the task at once.
+RETRYABLE_4XX = (408, 429)
+
+
+class PermanentHTTPError(RuntimeError):
+    """A 4xx (other than 408/429) that retrying will not fix, e.g. 404 or 410."""
+
+
+@dataclass
+class DownloadTask:
+    url: str
+    dest: Path
+    expected_sha256: Optional[str] = None
+    label: str = ""
+    # Stable identity for the .part file when the URL is not (e.g. signed, expiring links).
+    resume_key: Optional[str] = None
+
+
+@dataclass
+class DownloadResult:
+    task: DownloadTask
+    status: str  # downloaded | resumed | deduped | skipped | failed
+    sha256: Optional[str] = None
+    size: int = 0
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+
+def iter_body(resp: requests.Response) -> Iterable[bytes]:
+    """
+    Yield body chunks as soon as they arrive (read1), so bytes received before a
+    dropped connection reach the .part file instead of dying in a read buffer.
+    Bytes are yielded exactly as sent (no gzip decoding), so their count matches
+    Content-Length and Range offsets.
+    """
+    read1 = getattr(resp.raw, "read1", None)
+    if read1 is None:
+        yield from resp.iter_content(chunk_size=CHUNK_SIZE)
+        return
+    while True:
+        chunk = read1(CHUNK_SIZE, decode_content=False)
+        if not chunk:
+            return
+        yield chunk
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Downloader:
+    def __init__(
+        self,
+        store_dir: Path,
+        client: Optional[FreepikClient] = None,
+        max_workers: int = DEFAULT_WORKERS,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.store_dir = Path(store_dir)
+        self.blob_dir = self.store_dir / "sha256"
+        self.partial_dir = self.store_dir / "partial"
+        self.manifest_path = self.store_dir / "manifest.json"
+        self.client = client or get_client()
+        self.max_workers = max(1, max_workers)
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    # -----------------------------
+    # Manifest
+    # -----------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except ValueError:
+            return {}
+
+    def _record(self, dest: Path, digest: str, size: int, url: str) -> None:
+        with self._lock:
+            self.manifest[str(dest.resolve())] = {"sha256": digest, "size": size, "url": url}
+            tmp = self.manifest_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+
+    # -----------------------------
+    # Content-addressed storage
+    # -----------------------------
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def _ingest(self, src: Path, digest: str) -> bool:
+        """Move src into the store. Returns False when the blob already existed (duplicate)."""
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if blob.exists():
+            src.unlink()
+            return False
+        os.replace(src, blob)
+        return True
+
+    def _link(self, digest: str, dest: Path) -> None:
+        """Atomically point dest at the blob (hard link, or copy across devices)."""
+        blob = self.blob_path(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(f".{dest.name}.{threading.get_ident()}.tmp")
+        if tmp.exists():
+            tmp.unlink()
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            shutil.copy2(blob, tmp)
+        os.replace(tmp, dest)
+
+    def _verified(self, task: DownloadTask) -> Optional[Dict[str, Any]]:
+        """Manifest entry for dest if the file on disk still matches it."""
+        entry = self.manifest.get(str(task.dest.resolve()))
+        if not entry or not task.dest.exists():
+            return None
+        if task.expected_sha256 and entry["sha256"] != task.expected_sha256:
+            return None
+        if task.dest.stat().st_size != entry["size"]:
+            return None
+        return entry
+
+    # -----------------------------
+    # Download
+    # -----------------------------
+
+    def _part_path(self, task: DownloadTask) -> Path:
+        key = f"{task.resume_key or task.url}\0{task.dest.resolve()}"
+        return self.partial_dir / (hashlib.sha1(key.encode("utf-8")).hexdigest() + ".part")
+
+    def _remote_size(self, url: str) -> Optional[int]:
+        """Content-Length from a HEAD request, or None if the server won't say."""
+        try:
+            resp = self.client.request("HEAD", url, endpoint="file", headers={"Accept-Encoding": "identity"},
+                                       allow_redirects=True)
+        except (requests.RequestException, Urllib3HTTPError):
+            return None
+        length = resp.headers.get("Content-Length")
+        return int(length) if resp.status_code == 200 and length and length.isdigit() else None
+
+    def _complete(self, task: DownloadTask, digest: str, size: int) -> bool:
+        """Whether an untracked file at dest is the whole download (by checksum, else by server size)."""
+        if task.expected_sha256:
+            return digest == task.expected_sha256
+        return size > 0 and self._remote_size(task.url) == size
+
+    def _fetch(self, task: DownloadTask, part: Path) -> str:
+        """Stream url into part, resuming from its current size. Returns 'downloaded' or 'resumed'."""
+        offset = part.stat().st_size if part.exists() else 0
+        # identity: Range offsets and Content-Length must refer to the stored bytes.
+        headers = {"Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        with self.client.fetch_file(task.url, headers=headers) as resp:
+            if resp.status_code == 416 and offset:
+                # Part already holds the whole file.
+                return "resumed"
+            if resp.status_code == 206 and offset:
+                mode, status = "ab", "resumed"
+            elif resp.status_code == 200:
+                mode, status = "wb", "downloaded"
+            elif 400 <= resp.status_code < 500 and resp.status_code not in RETRYABLE_4XX:
+                raise PermanentHTTPError(f"HTTP {resp.status_code}")
+            else:
+                raise RuntimeError(f"HTTP {resp.status_code}")
+
+            expected_len = resp.headers.get("Content-Length")
+            written = 0
+            with part.open(mode) as f:
+                for chunk in iter_body(resp):
+                    if chunk:
+                        f.write(chunk)
+                        written += len(chunk)
+            if expected_len is not None and written != int(expected_len):
+                raise RuntimeError(f"truncated transfer ({written}/{expected_len} bytes)")
+        return status
+
+    def download(self, task: DownloadTask) -> DownloadResult:
+        t0 = time.perf_counter()
+
+        entry = self._verified(task)
+        if entry:
+            return DownloadResult(task, "skipped", entry["sha256"], entry["size"], seconds=time.perf_counter() - t0)
+
+        part = self._part_path(task)
+
+        # A file from before the store existed: adopt it only once it is known to be
+        # complete; otherwise treat its bytes as a partial download and resume from them.
+        if task.dest.exists():
+            digest = sha256_file(task.dest)
+            size = task.dest.stat().st_size
+            if self._complete(task, digest, size):
+                adopted = task.dest.with_name(f".{task.dest.name}.adopt")
+                shutil.copy2(task.dest, adopted)
+                self._ingest(adopted, digest)
+                self._link(digest, task.dest)
+                self._record(task.dest, digest, size, task.url)
+                return DownloadResult(task, "skipped", digest, size, seconds=time.perf_counter() - t0)
+            if not task.expected_sha256 and size > (part.stat().st_size if part.exists() else 0):
+                shutil.copyfile(task.dest, part)
+        last_error: Optional[str] = None
+        for attempt in range(self.max_attempts):
+            try:
+                status = self._fetch(task, part)
+                break
+            except PermanentHTTPError as e:
+                return DownloadResult(task, "failed", error=str(e), seconds=time.perf_counter() - t0)
+            except (requests.RequestException, Urllib3HTTPError, RuntimeError) as e:
+                # Keep the partial file; the next attempt resumes from it.
+                last_error = str(e)
+                time.sleep(min(10.0, 0.5 * (2 ** attempt)))
+        else:
+            return DownloadResult(task, "failed", error=last_error, seconds=time.perf_counter() - t0)
+
+        digest = sha256_file(part)
+        size = part.stat().st_size
+        if task.expected_sha256 and digest != task.expected_sha256:
+            part.unlink()
+            return DownloadResult(task, "failed", digest, size, error="checksum mismatch",
+                                  seconds=time.perf_counter() - t0)
+
+        if not self._ingest(part, digest):
+            status = "deduped"
+        self._link(digest, task.dest)
+        self._record(task.dest, digest, size, task.url)
+        return DownloadResult(task, status, digest, size, seconds=time.perf_counter() - t0)
+
+    def download_all(
+        self,
+        tasks: Iterable[DownloadTask],
+        on_result: Optional[Callable[[DownloadResult], None]] = None,
+    ) -> List[DownloadResult]:
+        """Download tasks concurrently; on_result is called as each one finishes."""
+        results: List[DownloadResult] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(self.download, t) for t in tasks]
+            for fut in as_completed(futures):
+                result = fut.result()
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
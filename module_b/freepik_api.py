@@ -0,0 +1,283 @@
+"""
+Shared HTTP client for all Freepik tooling.
+
+One pooled requests.Session (keep-alive, sized connection pool) with default
+timeouts, urllib3 retry/backoff for connection errors and 5xx, and per-endpoint
+latency stats. The API key is only attached to Freepik API calls, never to CDN
+or signed download URLs. Search, resource-detail and page lookups go through
+the on-disk response cache (see http_cache.py) when one is configured.
+
+Usage:
+    from freepik_api import get_client
+
+    client = get_client()
+    resp = client.search("metallic sphere", limit=5)
+    ...
+    client.print_stats()
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import CachedResponse, OfflineCacheMiss, ResponseCache
+
+FREEPIK_BASE_URL = os.environ.get("FREEPIK_BASE_URL", "https://api.freepik.com/v1").rstrip("/")
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 30.0)  # (connect, read)
+DEFAULT_POOL_SIZE = int(os.environ.get("FREEPIK_POOL_SIZE", "16"))
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+
+class LatencyStats:
+    """Thread-safe per-endpoint request counters and latency samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._statuses: Dict[str, Dict[int, int]] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        with self._lock:
+            self._samples.setdefault(endpoint, []).append(seconds)
+            if status is None or status >= 400:
+                self._errors[endpoint] = self._errors.get(endpoint, 0) + 1
+            if status is not None:
+                by_status = self._statuses.setdefault(endpoint, {})
+                by_status[status] = by_status.get(status, 0) + 1
+
+    def record_cache(self, endpoint: str, outcome: str) -> None:
+        """outcome: hit | revalidated | miss | offline_miss"""
+        with self._lock:
+            by_outcome = self._cache.setdefault(endpoint, {})
+            by_outcome[outcome] = by_outcome.get(outcome, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out: Dict[str, Dict[str, Any]] = {}
+            for endpoint, outcomes in self._cache.items():
+                out[endpoint] = {"count": 0, "errors": 0, "statuses": {}, "cache": dict(outcomes)}
+            for endpoint, samples in self._samples.items():
+                s = sorted(samples)
+                n = len(s)
+                out[endpoint] = {
+                    "cache": dict(self._cache.get(endpoint, {})),
+                    "count": n,
+                    "errors": self._errors.get(endpoint, 0),
+                    "statuses": dict(self._statuses.get(endpoint, {})),
+                    "mean_ms": round(1000 * sum(s) / n, 1),
+                    "p50_ms": round(1000 * s[n // 2], 1),
+                    "p95_ms": round(1000 * s[min(n - 1, int(0.95 * n))], 1),
+                    "max_ms": round(1000 * s[-1], 1),
+                }
+            return out
+
+
+class FreepikClient:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.api_key = api_key if api_key is not None else os.environ.get("FREEPIK_API_KEY", "").strip()
+        self.base_url = (base_url or FREEPIK_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = LatencyStats()
+
+        # 429 is deliberately not retried here: callers (sync's token bucket) need to see it.
+        # urllib3 would otherwise retry any 429/503 carrying Retry-After, forcelist or not.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # -----------------------------
+    # Core request
+    # -----------------------------
+
+    def request(
+        self,
+        method: str,
+        path_or_url: str,
+        endpoint: str = "other",
+        use_api_key: bool = False,
+        **kwargs: Any,
+    ) -> Union[requests.Response, CachedResponse]:
+        """
+        Send a request through the pooled session and record its latency under `endpoint`.
+
+        Relative paths ("/resources") are resolved against the API base URL.
+        Pass stream=True for downloads and close the response when done.
+        Cacheable endpoints may return a CachedResponse instead of hitting the network.
+        """
+        url = path_or_url if "://" in path_or_url else f"{self.base_url}/{path_or_url.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if use_api_key and self.api_key:
+            headers["x-freepik-api-key"] = self.api_key
+
+        cache = self.cache
+        cacheable = self._cacheable(method, endpoint) and not kwargs.get("stream")
+        entry: Optional[Dict[str, Any]] = None
+        if cacheable:
+            key = cache.key(method, url, kwargs.get("params"))
+            entry = cache.load(key)
+            if entry is not None and (cache.offline or cache.is_fresh(entry, endpoint)):
+                self.stats.record_cache(endpoint, "hit")
+                return cache.to_response(entry)
+            if cache.offline:
+                self.stats.record_cache(endpoint, "offline_miss")
+                raise OfflineCacheMiss(f"{method} {url} is not cached (FREEPIK_OFFLINE=1)")
+            if entry is not None:
+                headers.update(cache.validators(entry))
+
+        t0 = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            resp = self.session.request(method, url, headers=headers, **kwargs)
+            status = resp.status_code
+        finally:
+            self.stats.record(endpoint, time.perf_counter() - t0, status)
+
+        if cacheable:
+            if resp.status_code == 304 and entry is not None:
+                cache.touch(key, entry)
+                self.stats.record_cache(endpoint, "revalidated")
+                return cache.to_response(entry)
+            if resp.status_code == 200:
+                cache.store(key, endpoint, url, resp.status_code, resp.headers, resp.content)
+                self.stats.record_cache(endpoint, "miss")
+
+        return resp
+
+    def _cacheable(self, method: str, endpoint: str) -> bool:
+        return self.cache is not None and method.upper() == "GET" and self.cache.handles(endpoint)
+
+    def peek(
+        self, path_or_url: str, endpoint: str, params: Optional[Dict[str, Any]] = None, partial: bool = False
+    ) -> Optional[CachedResponse]:
+        """
+        Return a fresh (or, offline, any) cached GET response without touching the network.
+        Lets rate-limited callers skip spending a token on requests the cache can answer.
+        partial=True looks up a prefix stored by remember_partial() instead of a full body.
+        """
+        if not self._cacheable("GET", endpoint):
+            return None
+        url = path_or_url if "://" in path_or_url else f"{self.base_url}/{path_or_url.lstrip('/')}"
+        entry = self.cache.load(self.cache.key("GET", url, params, partial=partial))
+        if entry is None or not (self.cache.offline or self.cache.is_fresh(entry, endpoint)):
+            return None
+        self.stats.record_cache(endpoint, "hit")
+        return self.cache.to_response(entry)
+
+    def remember_partial(self, url: str, endpoint: str, resp: Any, body: bytes) -> None:
+        """
+        Cache the prefix of a streamed page that was closed early once it had what
+        it needed. It is stored under its own key and marked partial, so a normal
+        GET of url never gets the truncated body; read it back with peek(partial=True).
+        """
+        if not self._cacheable("GET", endpoint) or resp.status_code != 200:
+            return
+        self.cache.store(self.cache.key("GET", url, None, partial=True), endpoint, url, resp.status_code, resp.headers,
+                         body, partial=True)
+        self.stats.record_cache(endpoint, "miss")
+
+    def get(
+        self, path_or_url: str, endpoint: str = "other", use_api_key: bool = False, **kwargs: Any
+    ) -> Union[requests.Response, CachedResponse]:
+        return self.request("GET", path_or_url, endpoint=endpoint, use_api_key=use_api_key, **kwargs)
+
+    # -----------------------------
+    # Freepik API endpoints
+    # -----------------------------
+
+    def search(self, term: str, limit: int = 5, content_type: Optional[str] = None) -> Union[requests.Response, CachedResponse]:
+        return self.get("/resources", endpoint="search", use_api_key=True, params=self.search_params(term, limit, content_type))
+
+    @staticmethod
+    def search_params(term: str, limit: int = 5, content_type: Optional[str] = None) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"term": term, "limit": limit}
+        if content_type:
+            params["type"] = content_type
+        return params
+
+    def resource(self, resource_id: Union[str, int]) -> Union[requests.Response, CachedResponse]:
+        return self.get(f"/resources/{resource_id}", endpoint="resource", use_api_key=True)
+
+    def download_info(self, resource_id: Union[str, int]) -> requests.Response:
+        return self.get(f"/resources/{resource_id}/download", endpoint="download", use_api_key=True)
+
+    # -----------------------------
+    # Public URLs (pages, previews, signed downloads)
+    # -----------------------------
+
+    def fetch_page(self, url: str, **kwargs: Any) -> Union[requests.Response, CachedResponse]:
+        headers = {"User-Agent": BROWSER_USER_AGENT}
+        headers.update(kwargs.pop("headers", None) or {})
+        return self.get(url, endpoint="page", headers=headers, **kwargs)
+
+    def fetch_file(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("stream", True)
+        return self.get(url, endpoint="file", **kwargs)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+
+    def print_stats(self) -> None:
+        summary = self.stats.summary()
+        if not summary:
+            return
+        print("\n📊 Freepik HTTP stats")
+        for endpoint, s in sorted(summary.items()):
+            line = f"  {endpoint:<9} n={s['count']:<4} err={s['errors']:<3}"
+            if s["count"]:
+                line += f" p50={s['p50_ms']}ms p95={s['p95_ms']}ms max={s['max_ms']}ms statuses={s['statuses']}"
+            if s["cache"]:
+                line += f" cache={s['cache']}"
+            print(line)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_default_client: Optional[FreepikClient] = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> FreepikClient:
+    """Process-wide shared client (and response cache) configured from the environment."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = FreepikClient(cache=ResponseCache.from_env())
+        return _default_client
@@ -0,0 +1,102 @@
+"""
+Model-free text embedder: hashed character and word n-grams.
+
+No torch, no download, starts instantly; used by the demo pipeline
+(run_pipeline.py -> demo_qdrant.qdrant_topk_fallback) when Qdrant or MiniLM
+aren't available. Similar wording gives similar vectors, so rankings are
+meaningful for short asset metadata ("ring / ferris wheel" finds ring_basic),
+though it knows nothing about synonyms.
+
+Features are hashed with crc32 (stable across processes, unlike hash()) into
+`dim` buckets with a sign bit, weighted by 1 + log(count), and L2-normalized, so
+a dot product is a cosine similarity. Candidates are embedded into one matrix
+and scored with a single matrix-vector product.
+"""
+
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_DIM = 512
+CHAR_NGRAMS = (3, 4, 5)
+WORD_NGRAMS = (1, 2)
+WORD_WEIGHT = 2.0  # whole-word matches count more than shared character runs
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def asset_text(asset: Dict[str, Any]) -> str:
+    """The text an asset is embedded from: name, tags, description, category, style, id."""
+    parts: List[str] = []
+    for key in ("name", "description", "category", "style"):
+        if asset.get(key):
+            parts.append(str(asset[key]))
+    parts.extend(str(t) for t in asset.get("tags") or [])
+    for key in ("asset_id", "id"):
+        if asset.get(key):
+            parts.append(str(asset[key]).replace("_", " ").replace("-", " "))
+    return " ".join(parts)
+
+
+class HashedNgramEmbedder:
+    def __init__(
+        self,
+        dim: int = DEFAULT_DIM,
+        char_ngrams: Sequence[int] = CHAR_NGRAMS,
+        word_ngrams: Sequence[int] = WORD_NGRAMS,
+        word_weight: float = WORD_WEIGHT,
+    ):
+        self.dim = dim
+        self.char_ngrams = tuple(char_ngrams)
+        self.word_ngrams = tuple(word_ngrams)
+        self.word_weight = word_weight
+
+    def features(self, text: str) -> List[Tuple[str, float]]:
+        """(feature, weight) pairs for one text; prefixes keep char and word grams apart."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        feats: List[Tuple[str, float]] = []
+        for token in tokens:
+            padded = f" {token} "
+            for n in self.char_ngrams:
+                feats.extend((f"c{padded[i:i + n]}", 1.0) for i in range(max(1, len(padded) - n + 1)))
+        for n in self.word_ngrams:
+            feats.extend((f"w{' '.join(tokens[i:i + n])}", self.word_weight) for i in range(len(tokens) - n + 1))
+        return feats
+
+    def embed_many(self, texts: Iterable[str]) -> np.ndarray:
+        """(n, dim) float32 matrix of L2-normalized embeddings."""
+        rows: List[int] = []
+        cols: List[int] = []
+        vals: List[float] = []
+        n = 0
+        for row, text in enumerate(texts):
+            n = row + 1
+            for feat, weight in self.features(text):
+                h = zlib.crc32(feat.encode("utf-8"))
+                rows.append(row)
+                cols.append(h % self.dim)
+                vals.append(weight if (h >> 31) & 1 else -weight)
+
+        counts = np.zeros((n, self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(counts, (np.asarray(rows), np.asarray(cols)), np.asarray(vals, dtype=np.float32))
+        # Sublinear term frequency keeps repeated tags from dominating.
+        mat = np.sign(counts) * np.log1p(np.abs(counts))
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (mat / norms).astype(np.float32)
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def top_k(self, query: str, matrix: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, scores) of the k rows of an embedded matrix most similar to query."""
+        if matrix.shape[0] == 0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = matrix @ self.embed(query)
+        k = min(k, len(scores))
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        return idx, scores[idx]
@@ -0,0 +1,185 @@
+"""
+Persistent on-disk HTTP response cache for Freepik lookups.
+
+Entries are keyed by (method, URL, sorted params) and stored as a small JSON
+metadata file plus the raw body. Each endpoint has its own TTL; once an entry
+is stale it is revalidated with If-None-Match / If-Modified-Since, and a 304
+refreshes it without re-downloading. In offline mode only the cache is used.
+
+Environment:
+    FREEPIK_CACHE=0                  disable the cache
+    FREEPIK_CACHE_DIR=...            cache location (default: module_b/.cache/freepik_http)
+    FREEPIK_OFFLINE=1                serve from cache only; misses raise OfflineCacheMiss
+    FREEPIK_CACHE_TTL_<ENDPOINT>=s   per-endpoint TTL override, e.g. FREEPIK_CACHE_TTL_SEARCH=3600
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlencode
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache" / "freepik_http"
+
+DAY = 24 * 3600
+DEFAULT_TTLS: Dict[str, float] = {
+    "search": 7 * DAY,
+    "resource": 30 * DAY,
+    "page": 30 * DAY,
+}
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a request is not in the cache."""
+
+
+class CachedResponse:
+    """
+    The subset of requests.Response the Freepik scripts use, backed by a cache entry.
+    """
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes, url: str, partial: bool = False):
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.url = url
+        self.from_cache = True
+        self.partial = partial  # content is only a prefix of the body
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 8192, decode_unicode: bool = False) -> Iterator[Any]:
+        for i in range(0, len(self.content), chunk_size):
+            chunk = self.content[i:i + chunk_size]
+            yield chunk.decode("utf-8", errors="replace") if decode_unicode else chunk
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "CachedResponse":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        offline: bool = False,
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.offline = offline
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build the cache from environment variables; None when disabled."""
+        if os.environ.get("FREEPIK_CACHE", "1").strip() == "0":
+            return None
+        ttls: Dict[str, float] = {}
+        for endpoint in DEFAULT_TTLS:
+            raw = os.environ.get(f"FREEPIK_CACHE_TTL_{endpoint.upper()}")
+            if raw:
+                ttls[endpoint] = float(raw)
+        cache_dir = os.environ.get("FREEPIK_CACHE_DIR")
+        offline = os.environ.get("FREEPIK_OFFLINE", "").strip() == "1"
+        return cls(Path(cache_dir) if cache_dir else None, ttls, offline)
+
+    def handles(self, endpoint: str) -> bool:
+        return endpoint in self.ttls
+
+    @staticmethod
+    def key(method: str, url: str, params: Optional[Mapping[str, Any]] = None, partial: bool = False) -> str:
+        """Partial (prefix-only) bodies get their own key so they never answer a full request."""
+        query = urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        raw = f"{method.upper()} {url}?{query}"
+        if partial:
+            raw += " #partial"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple:
+        base = self.cache_dir / key[:2] / key
+        return base.with_suffix(".json"), base.with_suffix(".body")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["content"] = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return meta
+
+    def is_fresh(self, entry: Dict[str, Any], endpoint: str) -> bool:
+        return time.time() - entry.get("stored_at", 0) < self.ttls.get(endpoint, 0)
+
+    def store(
+        self, key: str, endpoint: str, url: str, status_code: int, headers: Mapping[str, str], content: bytes,
+        partial: bool = False,
+    ) -> None:
+        meta_path, body_path = self._paths(key)
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified", "cache-control")}
+        meta = {
+            "endpoint": endpoint,
+            "url": url,
+            "status_code": status_code,
+            "headers": keep,
+            "stored_at": time.time(),
+        }
+        if partial:
+            meta["partial"] = True
+        # Body first so a crash never leaves metadata pointing at a missing body.
+        _atomic_write(body_path, content)
+        _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def touch(self, key: str, entry: Dict[str, Any]) -> None:
+        """Mark a revalidated (304) entry fresh again."""
+        meta_path, _ = self._paths(key)
+        meta = {k: v for k, v in entry.items() if k != "content"}
+        meta["stored_at"] = time.time()
+        _atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    @staticmethod
+    def validators(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Conditional request headers for revalidating a stale entry."""
+        headers = {k.lower(): v for k, v in (entry.get("headers") or {}).items()}
+        out: Dict[str, str] = {}
+        if headers.get("etag"):
+            out["If-None-Match"] = headers["etag"]
+        if headers.get("last-modified"):
+            out["If-Modified-Since"] = headers["last-modified"]
+        return out
+
+    @staticmethod
+    def to_response(entry: Dict[str, Any]) -> CachedResponse:
+        return CachedResponse(entry["status_code"], entry.get("headers") or {}, entry["content"], entry.get("url", ""),
+                              partial=bool(entry.get("partial")))
@@ -0,0 +1,219 @@
+"""
+Named Qdrant index profiles for the assets collection.
+
+A profile bundles the collection-level knobs (HNSW graph, on-disk storage,
+optimizer / segment layout) plus the default search-time `hnsw_ef`, so that
+`setup_db.py`, `upload_to_qdrant.py` and `tune_index.py` all build the
+collection the same way.
+
+Writers also stamp the collection with a content version (a `<name>@v<hash>`
+alias), which the retriever reads to key its result cache without scanning points.
+
+Select a profile with the QDRANT_INDEX_PROFILE environment variable:
+    low-latency  - everything in RAM, moderate graph (default)
+    memory-lean  - vectors, HNSW graph and payload on disk, sparse graph
+    high-recall  - dense graph, large ef_construct / search ef
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from qdrant_client.http import models as rest
+
+
+@dataclass(frozen=True)
+class IndexProfile:
+    name: str
+    description: str
+
+    # HNSW graph
+    m: int
+    ef_construct: int
+    hnsw_on_disk: bool
+
+    # Storage
+    vectors_on_disk: bool
+    payload_on_disk: bool
+
+    # Optimizer / segments
+    default_segment_number: int
+    indexing_threshold: int
+    memmap_threshold: Optional[int]
+
+    # Search-time default
+    search_hnsw_ef: int
+
+    # Relative resource cost (RAM + build time); lower is cheaper.
+    cost_rank: int
+
+
+PROFILES: Dict[str, IndexProfile] = {
+    "memory-lean": IndexProfile(
+        name="memory-lean",
+        description="On-disk vectors, graph and payload; smallest RAM footprint",
+        m=8,
+        ef_construct=64,
+        hnsw_on_disk=True,
+        vectors_on_disk=True,
+        payload_on_disk=True,
+        default_segment_number=2,
+        indexing_threshold=10000,
+        memmap_threshold=10000,
+        search_hnsw_ef=64,
+        cost_rank=0,
+    ),
+    "low-latency": IndexProfile(
+        name="low-latency",
+        description="In-RAM vectors and graph, one segment per core for parallel search",
+        m=16,
+        ef_construct=128,
+        hnsw_on_disk=False,
+        vectors_on_disk=False,
+        payload_on_disk=False,
+        default_segment_number=max(2, os.cpu_count() or 2),
+        indexing_threshold=20000,
+        memmap_threshold=None,
+        search_hnsw_ef=64,
+        cost_rank=1,
+    ),
+    "high-recall": IndexProfile(
+        name="high-recall",
+        description="Dense in-RAM graph with large construction / search ef",
+        m=32,
+        ef_construct=256,
+        hnsw_on_disk=False,
+        vectors_on_disk=False,
+        payload_on_disk=False,
+        default_segment_number=2,
+        indexing_threshold=20000,
+        memmap_threshold=None,
+        search_hnsw_ef=256,
+        cost_rank=2,
+    ),
+}
+
+DEFAULT_PROFILE = "low-latency"
+
+# Qdrant only builds HNSW for segments above indexing_threshold (KB) and treats 0 as
+# "never index", so scratch collections for tuning use the smallest positive value.
+FORCE_INDEX_THRESHOLD_KB = 1
+
+# Alias separator for the collection's content version: assets@v1a2b3c4d5e6f7a8b.
+VERSION_ALIAS_SEP = "@v"
+
+
+def get_profile(name: Optional[str] = None) -> IndexProfile:
+    """
+    Resolve a profile by name, falling back to QDRANT_INDEX_PROFILE and then DEFAULT_PROFILE.
+    """
+    name = (name or os.environ.get("QDRANT_INDEX_PROFILE", "") or DEFAULT_PROFILE).strip()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown index profile '{name}'. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+def collection_config(profile: IndexProfile, dim: int, force_index: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments for `QdrantClient.create_collection` under the given profile.
+
+    force_index builds the HNSW graph however small the collection is (and keeps
+    search on it), so tuning on a small golden set measures the graph, not a full scan.
+    """
+    indexing_threshold = FORCE_INDEX_THRESHOLD_KB if force_index else profile.indexing_threshold
+    return {
+        "vectors_config": rest.VectorParams(
+            size=dim,
+            distance=rest.Distance.COSINE,
+            on_disk=profile.vectors_on_disk,
+        ),
+        "hnsw_config": rest.HnswConfigDiff(
+            m=profile.m,
+            ef_construct=profile.ef_construct,
+            on_disk=profile.hnsw_on_disk,
+            full_scan_threshold=FORCE_INDEX_THRESHOLD_KB if force_index else None,
+        ),
+        "optimizers_config": rest.OptimizersConfigDiff(
+            default_segment_number=profile.default_segment_number,
+            indexing_threshold=indexing_threshold,
+            memmap_threshold=profile.memmap_threshold,
+        ),
+        "on_disk_payload": profile.payload_on_disk,
+    }
+
+
+def create_assets_collection(
+    client: Any,
+    collection_name: str,
+    dim: int,
+    profile: Optional[IndexProfile] = None,
+    recreate: bool = False,
+    force_index: bool = False,
+) -> IndexProfile:
+    """
+    Create (or recreate) the assets collection with the given profile.
+
+    When recreate is False and the collection already exists, it is left untouched.
+    force_index: see collection_config (used by tune_index.py).
+    Returns the profile that was applied.
+    """
+    profile = profile or get_profile()
+
+    if client.collection_exists(collection_name=collection_name):
+        if not recreate:
+            return profile
+        client.delete_collection(collection_name=collection_name)
+
+    client.create_collection(collection_name=collection_name, **collection_config(profile, dim, force_index))
+    return profile
+
+
+def points_version(points: Iterable[Any]) -> str:
+    """Content hash of the points a writer is storing (id, payload and vector of each)."""
+    h = hashlib.sha256()
+    for p in points:
+        h.update(json.dumps([p.id, p.payload, p.vector], sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def stamp_collection_version(client: Any, collection_name: str, version: str) -> None:
+    """
+    Record version as the collection's `<name>@v<version>` alias, replacing any older one.
+
+    Call after every write that changes what search can return.
+    """
+    prefix = f"{collection_name}{VERSION_ALIAS_SEP}"
+    alias_name = prefix + version
+    existing = [a.alias_name for a in client.get_collection_aliases(collection_name=collection_name).aliases]
+
+    ops: List[Any] = [
+        rest.DeleteAliasOperation(delete_alias=rest.DeleteAlias(alias_name=name))
+        for name in existing
+        if name.startswith(prefix) and name != alias_name
+    ]
+    if alias_name not in existing:
+        ops.append(rest.CreateAliasOperation(
+            create_alias=rest.CreateAlias(collection_name=collection_name, alias_name=alias_name)
+        ))
+    if ops:
+        client.update_collection_aliases(change_aliases_operations=ops)
+
+
+def read_collection_version(client: Any, collection_name: str) -> Optional[str]:
+    """The version stamped by the last writer, or None for collections written before stamping existed."""
+    prefix = f"{collection_name}{VERSION_ALIAS_SEP}"
+    for alias in client.get_collection_aliases(collection_name=collection_name).aliases:
+        if alias.alias_name.startswith(prefix):
+            return alias.alias_name[len(prefix):]
+    return None
+
+
+def search_params(hnsw_ef: Optional[int] = None, exact: bool = False) -> Optional[rest.SearchParams]:
+    """
+    Build search-time params; returns None when nothing overrides the server defaults.
+    """
+    if hnsw_ef is None and not exact:
+        return None
+    return rest.SearchParams(hnsw_ef=hnsw_ef, exact=exact)
@@ -0,0 +1,208 @@
+"""
+Fast bootstrap of the assets index without re-running the embedding model.
+
+Two formats:
+- dump (default): a portable .npz with float32 vectors, point ids and JSON payloads.
+  Restores into any Qdrant version; the collection is created with the selected
+  index profile (QDRANT_INDEX_PROFILE, see index_profiles.py).
+- snapshot: a native Qdrant collection snapshot (same Qdrant version required),
+  downloaded from / uploaded to the server's snapshot API.
+
+Usage (from module_b/):
+    python index_snapshot.py export                       # -> data/assets_index.npz
+    python index_snapshot.py import                       # restore into an empty instance
+    python index_snapshot.py export --format snapshot --out data/assets.snapshot
+    python index_snapshot.py import --format snapshot --path data/assets.snapshot
+(or from repo root: python -m module_b.index_snapshot export)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+
+try:
+    from module_b.index_profiles import create_assets_collection, get_profile, points_version, stamp_collection_version
+except ImportError:  # run from inside module_b/
+    from index_profiles import create_assets_collection, get_profile, points_version, stamp_collection_version
+
+MODULE_DIR = Path(__file__).parent
+DEFAULT_DUMP = MODULE_DIR / "data" / "assets_index.npz"
+COLLECTION_NAME = "assets"
+SCROLL_BATCH = 256
+UPSERT_BATCH = 256
+
+
+def qdrant_settings() -> Tuple[str, str]:
+    url = os.getenv("QDRANT_URL", "http://localhost:6333").rstrip("/")
+    api_key = os.getenv("QDRANT_API_KEY", "")
+    return url, api_key
+
+
+def connect() -> QdrantClient:
+    url, api_key = qdrant_settings()
+    return QdrantClient(url=url, api_key=api_key if api_key else None)
+
+
+def api_headers() -> Dict[str, str]:
+    _, api_key = qdrant_settings()
+    return {"api-key": api_key} if api_key else {}
+
+
+# -----------------------------
+# Portable dump
+# -----------------------------
+
+def export_dump(client: QdrantClient, collection_name: str, out_path: Path) -> int:
+    """Scroll every point (vector + payload) into a compact .npz file."""
+    ids: List[Any] = []
+    vectors: List[List[float]] = []
+    payloads: List[Dict[str, Any]] = []
+
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            limit=SCROLL_BATCH,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for r in records:
+            ids.append(r.id)
+            vectors.append(r.vector)
+            payloads.append(r.payload or {})
+        if offset is None:
+            break
+
+    if not vectors:
+        raise RuntimeError(f"Collection '{collection_name}' is empty; nothing to export.")
+
+    meta = {
+        "collection_name": collection_name,
+        "dim": len(vectors[0]),
+        "count": len(vectors),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # ids may be ints or UUID strings; store them as strings and restore ints where possible.
+    np.savez_compressed(
+        out_path,
+        vectors=np.asarray(vectors, dtype=np.float32),
+        ids=np.asarray([str(i) for i in ids]),
+        payloads=np.frombuffer(json.dumps(payloads, ensure_ascii=False).encode("utf-8"), dtype=np.uint8),
+        meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+    )
+    return len(vectors)
+
+
+def import_dump(client: QdrantClient, collection_name: str, dump_path: Path) -> int:
+    """Recreate the collection from a .npz dump (no model inference)."""
+    with np.load(dump_path) as data:
+        vectors = data["vectors"]
+        ids = [int(i) if i.isdigit() else i for i in data["ids"].tolist()]
+        payloads = json.loads(data["payloads"].tobytes().decode("utf-8"))
+
+    profile = get_profile()
+    create_assets_collection(client, collection_name, int(vectors.shape[1]), profile, recreate=True)
+
+    points = [
+        PointStruct(id=pid, vector=vec.tolist(), payload=payload)
+        for pid, vec, payload in zip(ids, vectors, payloads)
+    ]
+    for start in range(0, len(points), UPSERT_BATCH):
+        client.upsert(collection_name=collection_name, points=points[start:start + UPSERT_BATCH], wait=True)
+
+    stamp_collection_version(client, collection_name, points_version(points))
+    return len(ids)
+
+
+# -----------------------------
+# Native Qdrant snapshot
+# -----------------------------
+
+def export_snapshot(client: QdrantClient, collection_name: str, out_path: Path) -> int:
+    """Create a server-side snapshot and download it."""
+    snap = client.create_snapshot(collection_name=collection_name, wait=True)
+    url, _ = qdrant_settings()
+    snap_url = f"{url}/collections/{collection_name}/snapshots/{snap.name}"
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with httpx.stream("GET", snap_url, headers=api_headers(), timeout=None) as resp:
+        resp.raise_for_status()
+        with out_path.open("wb") as f:
+            for chunk in resp.iter_bytes():
+                f.write(chunk)
+
+    return client.count(collection_name=collection_name, exact=True).count
+
+
+def import_snapshot(client: QdrantClient, collection_name: str, snapshot_path: Path) -> int:
+    """Upload a snapshot file and recover the collection from it."""
+    url, _ = qdrant_settings()
+    upload_url = f"{url}/collections/{collection_name}/snapshots/upload?priority=snapshot&wait=true"
+
+    with snapshot_path.open("rb") as f:
+        resp = httpx.post(
+            upload_url,
+            headers=api_headers(),
+            files={"snapshot": (snapshot_path.name, f, "application/octet-stream")},
+            timeout=None,
+        )
+    resp.raise_for_status()
+
+    # Aliases are not part of a snapshot: stamp the restored content by the snapshot file's hash.
+    h = hashlib.sha256()
+    with snapshot_path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    stamp_collection_version(client, collection_name, h.hexdigest()[:16])
+
+    return client.count(collection_name=collection_name, exact=True).count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export / restore the assets index without model inference.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--format", choices=["dump", "snapshot"], default="dump")
+    parser.add_argument("--collection", default=COLLECTION_NAME)
+    parser.add_argument("--path", "--out", dest="path", default=None,
+                        help="Dump / snapshot file (default: data/assets_index.npz or data/<collection>.snapshot)")
+    args = parser.parse_args()
+
+    if args.path:
+        path = Path(args.path)
+    elif args.format == "dump":
+        path = DEFAULT_DUMP
+    else:
+        path = MODULE_DIR / "data" / f"{args.collection}.snapshot"
+
+    client = connect()
+    t0 = time.perf_counter()
+
+    if args.command == "export":
+        fn = export_dump if args.format == "dump" else export_snapshot
+        count = fn(client, args.collection, path)
+        size_kb = path.stat().st_size / 1024
+        print(f"✅ Exported {count} points from '{args.collection}' -> {path} ({size_kb:.1f} KB)")
+    else:
+        if not path.exists():
+            raise FileNotFoundError(f"Missing {path}. Run: python index_snapshot.py export --format {args.format}")
+        fn = import_dump if args.format == "dump" else import_snapshot
+        count = fn(client, args.collection, path)
+        print(f"✅ Restored {count} points into '{args.collection}' from {path}")
+
+    print(f"   took {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""
+Local stand-in for the Freepik API, for offline benchmarks and regression runs.
+
+Serves a deterministic synthetic catalog (size and seed configurable):
+
+    GET /v1/resources?term=&limit=&type=   search (title word match)
+    GET /v1/resources/{id}                 resource detail (404 for unknown ids)
+    GET /v1/resources/{id}/download        signed file URL (403 for premium items)
+    GET /files/{id}.zip?exp=&sig=          file body, Range-aware; 410 once exp has passed
+    GET /previews/{id}.png                 preview image body
+    GET /pages/{slug}_{id}.htm             HTML page embedding a preview URL
+    GET /__stats                           request counters (JSON)
+
+/v1 calls require an x-freepik-api-key header (any value). Latency/jitter,
+injected 429s (random or from a server-side rate limit, with Retry-After) and
+injected 5xx are configurable, so retry/backoff paths get exercised too.
+
+Point the tooling at it with the base-URL override:
+
+    python mock_freepik_server.py --catalog-size 500 --write-assets /tmp/mock/assets.json
+    FREEPIK_BASE_URL=http://127.0.0.1:8808/v1 FREEPIK_API_KEY=mock FREEPIK_CACHE=0 \\
+        python data/download_freepik_assets.py
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8808
+SIGNING_KEY = b"mock-freepik"
+
+NOUNS = [
+    "sphere", "cube", "cylinder", "cone", "torus", "pyramid", "podium", "ring",
+    "bottle", "can", "phone", "laptop", "headphones", "sneaker", "watch", "lamp",
+    "chair", "plant", "cloud", "star", "heart", "coin", "gift", "rocket",
+]
+ADJECTIVES = [
+    "metallic", "glossy", "matte", "pastel", "neon", "glass", "golden", "wooden",
+    "minimal", "abstract", "floating", "cartoon", "realistic", "holographic",
+]
+CATEGORIES = ["shape", "product", "icon", "decoration", "nature", "tech"]
+STYLES = ["minimal", "realistic", "cartoon", "clay", "glass"]
+
+
+@dataclass
+class MockConfig:
+    catalog_size: int = 200
+    seed: int = 7
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    throttle_rate: float = 0.0  # random 429 probability on /v1 calls
+    rate_limit_rps: float = 0.0  # server-side limit on /v1 calls; 0 = unlimited
+    retry_after: float = 1.0
+    error_rate: float = 0.0  # random 503 probability on /v1 calls
+    premium_ratio: float = 0.1
+    file_size: int = 256 * 1024
+    url_ttl: float = 300.0
+    require_key: bool = True
+
+
+# -----------------------------
+# Synthetic catalog
+# -----------------------------
+
+def build_catalog(size: int, seed: int, premium_ratio: float = 0.1) -> List[Dict[str, Any]]:
+    """Deterministic list of fake Freepik resources; same (size, seed) -> same catalog."""
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(size):
+        noun = NOUNS[i % len(NOUNS)]
+        adjective = rng.choice(ADJECTIVES)
+        resource_id = str(10000 + i)
+        slug = f"{adjective}-{noun}-{i}"
+        catalog.append({
+            "id": resource_id,
+            "title": f"{adjective.title()} {noun.title()} 3D model",
+            "name": f"{adjective.title()} {noun.title()}",
+            "type": "3d",
+            "premium": rng.random() < premium_ratio,
+            "slug": slug,
+            "tags": [noun, adjective, "3D"],
+            "category": rng.choice(CATEGORIES),
+            "style": rng.choice(STYLES),
+            "licenses": [{"type": "freemium", "url": "https://www.freepik.com/legal/terms-of-use"}],
+        })
+    return catalog
+
+
+def assets_from_catalog(catalog: List[Dict[str, Any]], base_url: str) -> List[Dict[str, Any]]:
+    """The catalog in assets.json form, so the scripts can run against the mock as-is."""
+    assets = []
+    for i, r in enumerate(catalog, 1):
+        assets.append({
+            "id": f"asset_{i:03d}",
+            "name": r["name"],
+            "description": r["title"],
+            "tags": r["tags"],
+            "category": r["category"],
+            "style": r["style"],
+            "freepik_id": r["id"],
+            "freepik_url": f"{base_url}/pages/{r['slug']}_{r['id']}.htm",
+            "preview_url": f"{base_url}/previews/{r['id']}.png",
+        })
+    return assets
+
+
+def file_body(resource_id: str, size: int) -> bytes:
+    """Deterministic pseudo-random bytes so downloads can be checksummed across runs."""
+    out = bytearray()
+    block = hashlib.sha256(resource_id.encode("utf-8")).digest()
+    while len(out) < size:
+        block = hashlib.sha256(block).digest()
+        out.extend(block)
+    return bytes(out[:size])
+
+
+def sign(resource_id: str, exp: int) -> str:
+    return hmac.new(SIGNING_KEY, f"{resource_id}:{exp}".encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+
+# -----------------------------
+# Server
+# -----------------------------
+
+class MockState:
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.catalog = build_catalog(config.catalog_size, config.seed, config.premium_ratio)
+        self.by_id = {r["id"]: r for r in self.catalog}
+        self.rng = random.Random(config.seed)
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.bytes_sent = 0
+
+    def body(self, resource_id: str, size: int) -> bytes:
+        with self._lock:
+            if resource_id not in self._bodies:
+                self._bodies[resource_id] = file_body(resource_id, size)
+            return self._bodies[resource_id]
+
+    def count(self, route: str, status: int, nbytes: int = 0) -> None:
+        with self._lock:
+            by_status = self.counters.setdefault(route, {})
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+            self.bytes_sent += nbytes
+
+    def roll(self, probability: float) -> bool:
+        with self._lock:
+            return probability > 0 and self.rng.random() < probability
+
+    def over_limit(self) -> bool:
+        """Fixed one-second window limiter for /v1 calls."""
+        rps = self.config.rate_limit_rps
+        if rps <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            return self._window_count > rps
+
+    def delay(self) -> None:
+        c = self.config
+        if c.latency_ms or c.jitter_ms:
+            with self._lock:
+                jitter = self.rng.uniform(-c.jitter_ms, c.jitter_ms)
+            time.sleep(max(0.0, c.latency_ms + jitter) / 1000.0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"routes": {k: dict(v) for k, v in self.counters.items()}, "bytes_sent": self.bytes_sent}
+
+
+class MockFreepikHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockFreepik/1.0"
+    state: MockState  # set on the subclass built by make_server()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    # -- helpers --
+
+    def _send(self, status: int, body: bytes, route: str, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.state.count(route, status, len(body))
+
+    def _json(self, status: int, payload: Any, route: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), route, headers=headers)
+
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+
+    def _hit(self, r: Dict[str, Any]) -> Dict[str, Any]:
+        base = self._base_url()
+        return {
+            "id": r["id"],
+            "title": r["title"],
+            "url": f"{base}/pages/{r['slug']}_{r['id']}.htm",
+            "preview_url": f"{base}/previews/{r['id']}.png",
+            "image": {"source": {"url": f"{base}/previews/{r['id']}.png"}},
+            "licenses": r["licenses"],
+            "premium": r["premium"],
+        }
+
+    # -- routing --
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        state = self.state
+        state.delay()
+
+        if path == "/__stats":
+            return self._json(200, state.stats(), "stats")
+
+        if path.startswith("/v1/"):
+            route = self._api_route(path)
+            if state.config.require_key and not self.headers.get("x-freepik-api-key"):
+                return self._json(401, {"message": "Unauthorized: missing API key"}, route)
+            if state.over_limit() or state.roll(state.config.throttle_rate):
+                return self._json(429, {"message": "Rate limit exceeded"}, route,
+                                  headers={"Retry-After": f"{state.config.retry_after:g}"})
+            if state.roll(state.config.error_rate):
+                return self._json(503, {"message": "Service temporarily unavailable"}, route)
+            return self._api(path, query, route)
+
+        m = re.fullmatch(r"/files/(\w+)\.zip", path)
+        if m:
+            return self._file(m.group(1), query)
+        m = re.fullmatch(r"/pages/[\w-]+_(\w+)\.htm", path)
+        if m and m.group(1) in state.by_id:
+            return self._page(state.by_id[m.group(1)])
+        m = re.fullmatch(r"/previews/(\w+)\.png", path)
+        if m and m.group(1) in state.by_id:
+            return self._ranged(state.body("preview-" + m.group(1), 8 * 1024), "preview", "image/png")
+        return self._json(404, {"message": "Not found"}, "other")
+
+    @staticmethod
+    def _api_route(path: str) -> str:
+        if path.rstrip("/") == "/v1/resources":
+            return "search"
+        return "download" if path.endswith("/download") else "resource"
+
+    def _api(self, path: str, query: Dict[str, str], route: str) -> None:
+        state = self.state
+        if route == "search":
+            words = [w for w in re.split(r"\W+", query.get("term", "").lower()) if w]
+            limit = max(1, min(100, int(query.get("limit", "10") or 10)))
+            scored: List[Tuple[int, Dict[str, Any]]] = []
+            for r in state.catalog:
+                title = r["title"].lower()
+                score = sum(1 for w in words if w in title)
+                if score:
+                    scored.append((score, r))
+            scored.sort(key=lambda sr: -sr[0])
+            hits = [self._hit(r) for _, r in scored[:limit]]
+            return self._json(200, {"data": hits, "meta": {"total": len(scored), "per_page": limit}}, route)
+
+        m = re.fullmatch(r"/v1/resources/(\w+)(/download)?", path)
+        r = state.by_id.get(m.group(1)) if m else None
+        if r is None:
+            return self._json(404, {"message": "Resource not found"}, route)
+
+        if route == "resource":
+            detail = dict(self._hit(r), name=r["title"], type=r["type"])
+            return self._json(200, {"data": detail}, route)
+
+        if r["premium"]:
+            return self._json(403, {"message": "This resource requires a Premium subscription"}, route)
+        exp = int(time.time() + state.config.url_ttl)
+        url = f"{self._base_url()}/files/{r['id']}.zip?exp={exp}&sig={sign(r['id'], exp)}"
+        return self._json(200, {"data": {"filename": f"{r['slug']}.zip", "url": url}}, route)
+
+    def _page(self, r: Dict[str, Any]) -> None:
+        """Large page with the 3D poster URL part-way through, like the real model pages."""
+        filler = b"<div class=\"related\">" + b"x" * 200 + b"</div>\n"
+        poster = f'<img src="https://img.freepik.com/3d-models/v2/mock/{r["id"]}/{r["slug"]}-poster-1.png">'
+        body = filler * 200 + poster.encode("utf-8") + filler * 2000
+        self._send(200, b"<html><body>" + body + b"</body></html>", "page", "text/html; charset=utf-8")
+
+    def _file(self, resource_id: str, query: Dict[str, str]) -> None:
+        exp = query.get("exp", "")
+        if resource_id not in self.state.by_id or not exp.isdigit() or query.get("sig") != sign(resource_id, int(exp)):
+            return self._json(403, {"message": "Invalid signature"}, "file")
+        if int(exp) < time.time():
+            return self._json(410, {"message": "Link expired"}, "file")
+        self._ranged(self.state.body(resource_id, self.state.config.file_size), "file", "application/zip")
+
+    def _ranged(self, body: bytes, route: str, content_type: str) -> None:
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        m = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", "").strip())
+        if not m:
+            return self._send(200, body, route, content_type, {"ETag": etag, "Accept-Ranges": "bytes"})
+        start = int(m.group(1))
+        end = min(int(m.group(2)) if m.group(2) else len(body) - 1, len(body) - 1)
+        if start >= len(body):
+            return self._send(416, b"", route, content_type, {"Content-Range": f"bytes */{len(body)}"})
+        self._send(206, body[start:end + 1], route, content_type, {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{len(body)}",
+        })
+
+
+def make_server(config: MockConfig, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Build (not start) a server; port=0 picks a free port."""
+    state = MockState(config)
+    handler = type("BoundMockFreepikHandler", (MockFreepikHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state  # type: ignore[attr-defined]
+    return server
+
+
+def start_in_thread(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start a server on a background thread. Returns (server, base_url); call server.shutdown() when done."""
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Freepik API for offline testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--catalog-size", type=int, default=MockConfig.catalog_size)
+    parser.add_argument("--seed", type=int, default=MockConfig.seed)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability of a 429 per API call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="API calls per second before 429s (0 = off)")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 per API call")
+    parser.add_argument("--premium-ratio", type=float, default=MockConfig.premium_ratio)
+    parser.add_argument("--file-size", type=int, default=MockConfig.file_size, help="bytes per downloadable file")
+    parser.add_argument("--url-ttl", type=float, default=MockConfig.url_ttl, help="signed URL lifetime in seconds")
+    parser.add_argument("--no-auth", action="store_true", help="accept API calls without x-freepik-api-key")
+    parser.add_argument("--write-assets", help="also write the catalog as an assets.json to this path")
+    args = parser.parse_args()
+
+    config = MockConfig(
+        catalog_size=args.catalog_size,
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        throttle_rate=args.throttle_rate,
+        rate_limit_rps=args.rate_limit,
+        retry_after=args.retry_after,
+        error_rate=args.error_rate,
+        premium_ratio=args.premium_ratio,
+        file_size=args.file_size,
+        url_ttl=args.url_ttl,
+        require_key=not args.no_auth,
+    )
+    server = make_server(config, args.host, args.port)
+    base_url = f"http://{args.host}:{server.server_address[1]}"
+
+    if args.write_assets:
+        out = Path(args.write_assets)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(assets_from_catalog(server.state.catalog, base_url), indent=2, ensure_ascii=False),
+                       encoding="utf-8")
+        print(f"📝 wrote {config.catalog_size} assets -> {out}")
+
+    print(f"🧪 mock Freepik API on {base_url}/v1 (catalog={config.catalog_size}, seed={config.seed})")
+    print(f"   export FREEPIK_BASE_URL={base_url}/v1 FREEPIK_API_KEY=mock FREEPIK_CACHE=0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.state.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Thread-safe token-bucket rate limiter that adapts to HTTP 429 responses.
+
+- acquire() blocks until a token is available (tokens refill at `rate` per second,
+  up to `capacity` for short bursts).
+- penalize(retry_after) is called on 429: all callers pause until Retry-After has
+  elapsed and the refill rate is halved (never below `min_rate`).
+- reward() is called on success: the rate creeps back up towards `max_rate`.
+- backoff_delay(attempt) is the jittered exponential sleep for network / 5xx retries.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        recovery_step: Optional[float] = None,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, float(rate))
+        self.min_rate = float(min_rate) if min_rate else self.max_rate / 16
+        self.recovery_step = float(recovery_step) if recovery_step else self.max_rate / 20
+
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.throttle_events = 0
+        self.total_wait_s = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        self.total_wait_s += waited
+                        return waited
+                    delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, retry_after: Optional[float] = None) -> None:
+        """Back off after a 429: honor Retry-After and halve the refill rate."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttle_events += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self._blocked_until = max(self._blocked_until, now + pause)
+            # Drain the burst so callers don't stampede when the pause ends.
+            self._tokens = 0.0
+            self._last = now + pause
+
+    def reward(self) -> None:
+        """Additive increase after a successful call."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with jitter for retry number `attempt` (0-based), in seconds.
+    """
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.5)
@@ -6,15 +6,37 @@ This module wraps Qdrant vector search and returns enriched asset metadata.
 Returned fields include:
 - preview_url: Online preview image URL (from Freepik if available)
 - local_preview: Local preview image path (if present)
+- thumbnails / thumbnail_url: WebP thumbnail URLs by size bucket (see build_thumbnails.py)
 - freepik_url / freepik_title / licenses: Provenance fields for guardrails scoring
 """
 
+import hashlib
+import json
+import os
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
 from sentence_transformers import SentenceTransformer
 
+try:
+    from module_b.index_profiles import get_profile, read_collection_version
+except ImportError:  # run from inside module_b/
+    from index_profiles import get_profile, read_collection_version
+
+try:
+    from module_a.profiling import profile_section
+except ImportError:  # run from inside module_b/: profiling hooks unavailable
+    from contextlib import nullcontext as _nullcontext
+
+    def profile_section(name: str) -> Any:
+        return _nullcontext()
+
+# Thumbnail URLs are relative to module_c/index.html by default.
+THUMBS_BASE_URL = os.environ.get("THUMBS_BASE_URL", "../module_b/data/assets/thumbs").rstrip("/")
+DEFAULT_THUMB_SIZE = 256
+
 
 class AssetRetriever:
     """
@@ -38,6 +60,10 @@ class AssetRetriever:
         port: int = 6333,
         collection_name: str = "assets",
         previews_dir: str = None,
+        hnsw_ef: Optional[int] = None,
+        thumbs_dir: Optional[str] = None,
+        thumbs_base_url: Optional[str] = None,
+        model: Optional[SentenceTransformer] = None,
     ):
         """
         Initialize retriever.
@@ -47,10 +73,17 @@ class AssetRetriever:
             port: Qdrant port
             collection_name: Qdrant collection name
             previews_dir: Optional local previews directory
+            hnsw_ef: Default search-time HNSW ef (None = search_hnsw_ef of the index
+                     profile named by QDRANT_INDEX_PROFILE, see index_profiles.py)
+            thumbs_dir: Thumbnail directory holding manifest.json (default: data/assets/thumbs)
+            thumbs_base_url: URL prefix for thumbnail files (default: THUMBS_BASE_URL)
+            model: Already-loaded SentenceTransformer to share with the caller
+                   (default: load all-MiniLM-L6-v2 on first use)
         """
         self.client = QdrantClient(host=host, port=port)
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self._model = model
         self.collection_name = collection_name
+        self.hnsw_ef = hnsw_ef if hnsw_ef is not None else get_profile().search_hnsw_ef
 
         # Local preview directory (default: module_b/data/assets/previews)
         if previews_dir:
@@ -58,6 +91,40 @@ class AssetRetriever:
         else:
             self.previews_dir = Path(__file__).parent / "data" / "assets" / "previews"
 
+        self.thumbs_dir = Path(thumbs_dir) if thumbs_dir else Path(__file__).parent / "data" / "assets" / "thumbs"
+        self.thumbs_base_url = (thumbs_base_url or THUMBS_BASE_URL).rstrip("/")
+        self._thumbs_manifest: Optional[Dict[str, Any]] = None
+        self._collection_version: Optional[str] = None
+
+    @property
+    def model(self) -> SentenceTransformer:
+        """Embedding model, loaded on first use (cached pipeline runs may never need it)."""
+        if self._model is None:
+            self._model = SentenceTransformer("all-MiniLM-L6-v2")
+        return self._model
+
+    def collection_version(self) -> str:
+        """
+        Fingerprint of what search() can return: the content version stamped by the
+        last writer (upload_to_qdrant.py, setup_db.py, index_snapshot.py import),
+        the collection config and the thumbnail manifest. Collections written before
+        stamping fall back to the point count. Used to key cached retrieval results;
+        computed once per retriever without scanning points.
+        ASSET_COLLECTION_VERSION overrides it (e.g. a release tag).
+        """
+        if self._collection_version is None:
+            override = os.environ.get("ASSET_COLLECTION_VERSION", "").strip()
+            if override:
+                self._collection_version = override
+            else:
+                info = self.client.get_collection(self.collection_name)
+                content = read_collection_version(self.client, self.collection_name) or f"count:{info.points_count}"
+                manifest = self.thumbs_dir / "manifest.json"
+                manifest_mtime = manifest.stat().st_mtime if manifest.exists() else 0
+                key = f"{self.collection_name}|{content}|{info.config.params}|{manifest_mtime}"
+                self._collection_version = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return self._collection_version
+
     def _get_local_preview(self, asset_id: str, asset_name: str) -> str:
         """
         Return local preview path if it exists.
@@ -69,26 +136,53 @@ class AssetRetriever:
         filepath = self.previews_dir / filename
         return str(filepath) if filepath.exists() else ""
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+    def _get_thumbnails(self, asset_id: str, asset_name: str) -> Dict[str, str]:
+        """
+        Return {size: url} for the asset's WebP thumbnails, or {} if none were built.
+        The manifest is keyed by preview filename stem (asset_001_sphere).
+        """
+        if self._thumbs_manifest is None:
+            try:
+                self._thumbs_manifest = json.loads((self.thumbs_dir / "manifest.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._thumbs_manifest = {}
+        stem = f"{asset_id}_{asset_name.lower().replace(' ', '_')}"
+        entry = self._thumbs_manifest.get(stem) or {}
+        return {size: f"{self.thumbs_base_url}/{t['file']}" for size, t in (entry.get("thumbs") or {}).items()}
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        hnsw_ef: Optional[int] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Search matching assets.
 
         Args:
             query: Text description such as "metallic sphere on dark background"
             top_k: Number of results to return
+            hnsw_ef: Per-call override of the search-time HNSW ef (higher = better recall, slower)
+            query_vector: Precomputed embedding of query (same model), skips encoding
 
         Returns:
             List of matched asset dicts including score and preview URLs.
         """
         # Encode query into a vector
-        query_vector = self.model.encode(query).tolist()
+        if query_vector is None:
+            with profile_section("encode"):
+                query_vector = self.model.encode(query).tolist()
 
         # Search in Qdrant
-        results = self.client.query_points(
-            collection_name=self.collection_name,
-            query=query_vector,
-            limit=top_k,
-        )
+        ef = hnsw_ef if hnsw_ef is not None else self.hnsw_ef
+        with profile_section("query"):
+            results = self.client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                limit=top_k,
+                search_params=rest.SearchParams(hnsw_ef=ef),
+            )
 
         matched_assets: List[Dict[str, Any]] = []
 
@@ -101,6 +195,7 @@ class AssetRetriever:
             # Prefer local preview if available, otherwise fall back to online preview URL
             local_preview = self._get_local_preview(asset_id, asset_name)
             preview_url = payload.get("preview_url", "")
+            thumbnails = self._get_thumbnails(asset_id, asset_name)
 
             asset: Dict[str, Any] = {
                 "id": asset_id,
@@ -123,6 +218,8 @@ class AssetRetriever:
                 # Previews
                 "preview_url": preview_url,
                 "local_preview": local_preview,
+                "thumbnails": thumbnails,
+                "thumbnail_url": thumbnails.get(str(DEFAULT_THUMB_SIZE), ""),
 
                 # Similarity score (cosine)
                 "score": round(float(result.score), 4),
@@ -132,7 +229,9 @@ class AssetRetriever:
 
         return matched_assets
 
-    def search_shot(self, shot_description: str, top_k: int = 3) -> Dict[str, Any]:
+    def search_shot(
+        self, shot_description: str, top_k: int = 3, query_vector: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
         """
         Search assets for a single shot (for Module A).
 
@@ -142,7 +241,7 @@ class AssetRetriever:
               "matched_assets": [...]
             }
         """
-        assets = self.search(shot_description, top_k)
+        assets = self.search(shot_description, top_k, query_vector=query_vector)
         return {
             "shot_description": shot_description,
             "matched_assets": assets,
@@ -1,17 +1,46 @@
 import json
 from pathlib import Path
+from typing import Any, Dict, List
 
+from module_a.profiling import profile_run
+from module_a.run_manifest import RunManifest, span
 from module_a.scene_planner import SceneInput, plan_scene
 from module_b.freepik_client import freepik_search_stub
-from module_b.qdrant_client import qdrant_topk_fallback
+from module_b.demo_qdrant import EMBED_DIM, qdrant_topk_fallback
 
-ROOT = Path(__file__).resolve().parent
+ROOT = Path(__file__).resolve().parent  # module_b/
+REPO_ROOT = ROOT.parent
+CATALOG_PATH = ROOT / "asset_catalog.json"
+METADATA_PATH = ROOT / "assets.json"
+
+# Fields copied from assets.json onto a candidate so scoring sees more than its asset_id.
+METADATA_FIELDS = ("name", "description", "tags", "category", "style")
+
+
+def enrich_candidates(
+    candidates: List[Dict[str, Any]],
+    asset_catalog: Dict[str, Any],
+    metadata: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Attach name / tags / description from assets.json to each candidate, found via the
+    catalog entry's "metadata_id". Candidates without a link keep just their asset_id.
+    """
+    enriched = []
+    for c in candidates:
+        meta = metadata.get((asset_catalog.get(c["asset_id"]) or {}).get("metadata_id"), {})
+        enriched.append({**{k: meta[k] for k in METADATA_FIELDS if k in meta}, **c})
+    return enriched
 
 
 def main() -> None:
-    inp_path = ROOT / "demo_input.json"
-    out_path = ROOT / "demo_output.json"
-    catalog_path = ROOT / "module_b" / "asset_catalog.json"
+    with profile_run("run_pipeline"), RunManifest.track("run_pipeline"):
+        _main()
+
+
+def _main() -> None:
+    inp_path = REPO_ROOT / "demo_input.json"
+    out_path = REPO_ROOT / "module_c" / "demo_output.json"  # loaded by module_c/index.html
 
     inp_raw = json.loads(inp_path.read_text(encoding="utf-8"))
     scene_inp = SceneInput(
@@ -22,7 +51,8 @@ def main() -> None:
     )
 
     # Module A: scene plan (Gemini-ready)
-    adjson = plan_scene(scene_inp)
+    with span("plan_scene"):
+        adjson = plan_scene(scene_inp)
 
     # Module B: Freepik candidates + Qdrant-style top-k scoring
     # We score two queries for transparency in the demo.
@@ -31,17 +61,22 @@ def main() -> None:
         "floating fruit accent, warm yellow"
     ]
 
-    scoring_queries = []
-    for q in queries:
-        candidates = freepik_search_stub(q)
-        topk, selected = qdrant_topk_fallback(q, candidates, k=5)
-        scoring_queries.append({
-            "query": q,
-            "top_k": topk,
-            "selected": selected
-        })
+    with span("load_catalog"):
+        asset_catalog = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+        metadata = {}
+        if METADATA_PATH.exists():
+            metadata = {a["id"]: a for a in json.loads(METADATA_PATH.read_text(encoding="utf-8")) if a.get("id")}
 
-    asset_catalog = json.loads(catalog_path.read_text(encoding="utf-8"))
+    scoring_queries = []
+    with span("score", items=len(queries)):
+        for q in queries:
+            candidates = enrich_candidates(freepik_search_stub(q), asset_catalog, metadata)
+            topk, selected = qdrant_topk_fallback(q, candidates, k=5)
+            scoring_queries.append({
+                "query": q,
+                "top_k": topk,
+                "selected": selected
+            })
 
     output = {
         "input": {
@@ -55,6 +90,7 @@ def main() -> None:
         "adJson": adjson,
         "scoring": {
             "method": "qdrant_style_topk_demo",
+            "embedder": {"type": "hashed_char_word_ngrams", "dim": EMBED_DIM},
             "queries": scoring_queries
         }
     }
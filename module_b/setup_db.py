@@ -3,8 +3,11 @@
 包含 preview_url 字段
 """
 import json
+import os
 from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
+from qdrant_client.models import PointStruct
+
+from index_profiles import create_assets_collection, get_profile, points_version, stamp_collection_version
 
 # 配置
 QDRANT_HOST = "localhost"
@@ -14,6 +17,7 @@ VECTOR_SIZE = 384  # all-MiniLM-L6-v2 的向量维度
 
 ASSETS_FILE = "./data/assets.json"
 EMBEDDINGS_FILE = "./data/assets_embeddings.json"
+DEDUPED_FILE = "./data/assets.deduped.json"  # dedupe_previews.py 的输出，存在时只导入保留的素材
 
 
 def main():
@@ -28,16 +32,21 @@ def main():
     
     with open(EMBEDDINGS_FILE, 'r', encoding='utf-8') as f:
         embeddings_data = json.load(f)
+
+    # 去重后的素材表（若已运行 dedupe_previews.py）
+    if os.path.exists(DEDUPED_FILE):
+        with open(DEDUPED_FILE, 'r', encoding='utf-8') as f:
+            kept_ids = {a['id'] for a in json.load(f)}
+        print(f"使用去重结果: {len(kept_ids)}/{len(assets)} 个素材 ({DEDUPED_FILE})")
+        assets = [a for a in assets if a['id'] in kept_ids]
     
     # 创建 embedding 字典 (id -> embedding)
     embeddings_dict = {item['id']: item['embedding'] for item in embeddings_data}
     
-    # 重新创建 collection
-    print(f"创建 collection: {COLLECTION_NAME}")
-    client.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE)
-    )
+    # 重新创建 collection（索引参数来自 QDRANT_INDEX_PROFILE，见 index_profiles.py）
+    profile = get_profile()
+    print(f"创建 collection: {COLLECTION_NAME} (profile: {profile.name})")
+    create_assets_collection(client, COLLECTION_NAME, VECTOR_SIZE, profile, recreate=True)
     
     # 准备数据点
     points = []
@@ -72,6 +81,8 @@ def main():
     # 写入 Qdrant
     print(f"写入 {len(points)} 条数据...")
     client.upsert(collection_name=COLLECTION_NAME, points=points)
+    # 内容版本标记（alias），retriever 用它作为检索缓存的 key，无需扫描全部数据点
+    stamp_collection_version(client, COLLECTION_NAME, points_version(points))
     
     print(f"\n✅ 完成！共导入 {len(points)} 个素材")
     print(f"   Collection: {COLLECTION_NAME}")
@@ -1,11 +1,37 @@
 import json
 import os
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set
 
 import requests
 
-FREEPIK_BASE_URL = "https://api.freepik.com/v1"
+from freepik_api import FreepikClient, get_client
+from http_cache import OfflineCacheMiss
+from rate_limit import TokenBucket, backoff_delay, parse_retry_after
+
+# Concurrency / rate limiting
+SYNC_WORKERS = int(os.environ.get("FREEPIK_SYNC_WORKERS", "4"))
+REQUESTS_PER_SECOND = float(os.environ.get("FREEPIK_RPS", "4"))
+BURST = float(os.environ.get("FREEPIK_BURST", "4"))
+MAX_ATTEMPTS = int(os.environ.get("FREEPIK_MAX_ATTEMPTS", "6"))
+
+
+class FreepikThrottled(Exception):
+    """HTTP 429 from Freepik. Carries the server's Retry-After (seconds), if any."""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__(f"Freepik rate limit hit (retry_after={retry_after})")
+        self.retry_after = retry_after
+
+
+class FreepikTransientError(Exception):
+    """Network failure or 5xx; safe to retry with backoff."""
+
+
+class FreepikAuthError(RuntimeError):
+    """HTTP 401/403: the API key is invalid or lacks permission; no asset can succeed."""
 
 
 def load_json(path: str) -> Any:
@@ -18,38 +44,75 @@ def save_json(data: Any, path: str) -> None:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
-def freepik_search(query: str, api_key: str, content_type: str = "3d", limit: int = 5) -> List[Dict[str, Any]]:
+def freepik_search(client: FreepikClient, query: str, content_type: str = "3d", limit: int = 5) -> List[Dict[str, Any]]:
     """
     Search Freepik assets by text query.
 
     Notes:
     - content_type may vary by API account/features.
     - If your API doesn't support a filter, we still get results by query.
+    - An empty list means Freepik genuinely had no hits; throttling and
+      transient failures raise instead so callers can retry.
     """
-    url = f"{FREEPIK_BASE_URL}/resources"
-    headers = {"x-freepik-api-key": api_key}
-
-    params = {
-        "term": query,
-        "limit": limit,
-    }
-
     # Try to pass a type filter (some Freepik configs support it; if not, Freepik may ignore it)
     # Common values people use: "vector", "photo", "psd", "3d"
-    params["type"] = content_type
-
-    resp = requests.get(url, headers=headers, params=params, timeout=25)
+    try:
+        resp = client.search(query, limit=limit, content_type=content_type)
+    except requests.RequestException as e:
+        raise FreepikTransientError(str(e)) from e
 
     if resp.status_code == 200:
         payload = resp.json()
         return payload.get("data", []) or []
     if resp.status_code in (401, 403):
-        raise RuntimeError("Freepik API key is invalid or lacks permission.")
+        raise FreepikAuthError(f"Freepik API key is invalid or lacks permission (HTTP {resp.status_code}).")
     if resp.status_code == 429:
-        return []
+        raise FreepikThrottled(parse_retry_after(resp.headers.get("Retry-After")))
+    if resp.status_code >= 500:
+        raise FreepikTransientError(f"HTTP {resp.status_code}")
     return []
 
 
+def search_with_retry(
+    client: FreepikClient,
+    query: str,
+    limiter: TokenBucket,
+    content_type: str = "3d",
+    limit: int = 5,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> List[Dict[str, Any]]:
+    """
+    Rate-limited search with retries.
+
+    - 429: the shared limiter pauses everyone for Retry-After and slows down.
+    - network / 5xx: exponential backoff with jitter.
+    Raises the last error once attempts are exhausted.
+    """
+    # Cached answers don't cost a rate-limit token.
+    cached = client.peek("/resources", "search", client.search_params(query, limit, content_type))
+    if cached is not None and cached.status_code == 200:
+        return cached.json().get("data", []) or []
+
+    last_error: Optional[Exception] = None
+    for attempt in range(max_attempts):
+        limiter.acquire()
+        try:
+            hits = freepik_search(client, query=query, content_type=content_type, limit=limit)
+        except FreepikThrottled as e:
+            limiter.penalize(e.retry_after)
+            last_error = e
+            continue
+        except FreepikTransientError as e:
+            last_error = e
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        limiter.reward()
+        return hits
+
+    raise last_error if last_error else RuntimeError("search_with_retry: no attempts made")
+
+
 def build_query(asset: Dict[str, Any]) -> str:
     """
     Build a robust search query from your asset metadata.
@@ -94,58 +157,162 @@ def pick_best_hit(asset: Dict[str, Any], hits: List[Dict[str, Any]]) -> Optional
     return hits[0]
 
 
-def main() -> None:
-    api_key = os.environ.get("FREEPIK_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("Missing FREEPIK_API_KEY. Set it via: export FREEPIK_API_KEY='...'")
+def enrich_asset(asset: Dict[str, Any], query: str, hits: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Return a copy of the asset with Freepik fields normalized into our schema.
+    """
+    a = dict(asset)
+    a["freepik_search_query"] = query
 
-    module_dir = os.path.dirname(__file__)
-    assets_path = os.path.join(module_dir, "assets.json")
-    assets: List[Dict[str, Any]] = load_json(assets_path)
+    best = pick_best_hit(a, hits)
+    if not best:
+        a["freepik_resolved"] = False
+        return a
 
-    enriched: List[Dict[str, Any]] = []
-    unresolved_count = 0
+    a["freepik_resolved"] = True
+    a["freepik_resource_id"] = best.get("id")
+    a["freepik_title"] = best.get("title")
+    a["freepik_url"] = best.get("url") or a.get("freepik_url")
+    a["preview_url"] = best.get("preview_url") or a.get("preview_url")
+    a["licenses"] = best.get("licenses", [])
+    return a
 
-    for a in assets:
-        query = build_query(a)
-        hits = freepik_search(query=query, api_key=api_key, content_type="3d", limit=6)
 
-        # Backoff if rate limited / empty
-        if not hits:
-            time.sleep(0.8)
-            hits = freepik_search(query=query, api_key=api_key, content_type="3d", limit=6)
+class Checkpoint:
+    """
+    Append-only JSONL log of finished assets so an interrupted sync can resume.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return done
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    a = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash; the asset will simply be redone.
+                    continue
+                if a.get("id"):
+                    done[a["id"]] = a
+        return done
+
+    def append(self, asset: Dict[str, Any]) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asset, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def sync_assets(
+    assets: List[Dict[str, Any]],
+    client: FreepikClient,
+    checkpoint: Checkpoint,
+    workers: int = SYNC_WORKERS,
+    limiter: Optional[TokenBucket] = None,
+) -> Dict[str, Any]:
+    """
+    Enrich assets concurrently. Returns {"enriched": [...], "failed": [ids], "resumed": n,
+    "auth_error": message or None}. Output order matches the input order.
+
+    A 401/403 stops the run: queued assets are cancelled and, like everything
+    unfinished, reported as failed so a rerun with a valid key resumes them.
+    """
+    limiter = limiter or TokenBucket(rate=REQUESTS_PER_SECOND, capacity=BURST)
 
-        best = pick_best_hit(a, hits)
+    done = checkpoint.load()
+    todo = [a for a in assets if a.get("id") not in done]
+    failed: Set[str] = set()
+    results: Dict[str, Dict[str, Any]] = dict(done)
+    auth_error: Optional[str] = None
 
-        if not best:
-            a["freepik_resolved"] = False
-            a["freepik_search_query"] = query
-            unresolved_count += 1
-            enriched.append(a)
-            continue
+    def work(a: Dict[str, Any]) -> Dict[str, Any]:
+        query = build_query(a)
+        hits = search_with_retry(client, query=query, limiter=limiter, content_type="3d", limit=6)
+        return enrich_asset(a, query, hits)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(work, a): a for a in todo}
+        for fut in as_completed(futures):
+            a = futures[fut]
+            if fut.cancelled():
+                failed.add(a.get("id"))
+                continue
+            try:
+                enriched = fut.result()
+            except FreepikAuthError as e:
+                failed.add(a.get("id"))
+                if auth_error is None:
+                    auth_error = str(e)
+                    print(f"❌ {e} Stopping the sync; finished assets are checkpointed.")
+                    for other in futures:
+                        other.cancel()
+                continue
+            except (FreepikThrottled, FreepikTransientError, OfflineCacheMiss) as e:
+                print(f"⚠️ {a.get('id')}: giving up for now ({e})")
+                failed.add(a.get("id"))
+                continue
+            results[a.get("id")] = enriched
+            checkpoint.append(enriched)
+
+    enriched_list: List[Dict[str, Any]] = []
+    for a in assets:
+        if a.get("id") in results:
+            enriched_list.append(results[a.get("id")])
+        else:
+            # Not resolved this run (throttled / transient); keep the original so output stays complete.
+            enriched_list.append(dict(a, freepik_resolved=False, freepik_search_query=build_query(a)))
 
-        # Normalize fields into your asset schema
-        a["freepik_resolved"] = True
-        a["freepik_search_query"] = query
+    print(f"   throttle events: {limiter.throttle_events}, limiter wait: {limiter.total_wait_s:.1f}s")
+    return {"enriched": enriched_list, "failed": sorted(failed), "resumed": len(done), "auth_error": auth_error}
 
-        a["freepik_resource_id"] = best.get("id")
-        a["freepik_title"] = best.get("title")
-        a["freepik_url"] = best.get("url") or a.get("freepik_url")
-        a["preview_url"] = best.get("preview_url") or a.get("preview_url")
-        a["licenses"] = best.get("licenses", [])
 
-        enriched.append(a)
+def main() -> None:
+    client = get_client()
+    if not client.api_key:
+        raise RuntimeError("Missing FREEPIK_API_KEY. Set it via: export FREEPIK_API_KEY='...'")
 
-        # Small pause to reduce rate limit risk
-        time.sleep(0.25)
+    module_dir = os.path.dirname(__file__)
+    assets_path = os.path.join(module_dir, "assets.json")
+    assets: List[Dict[str, Any]] = load_json(assets_path)
 
     out_path = os.path.join(module_dir, "assets.enriched.json")
+    checkpoint = Checkpoint(out_path + ".checkpoint.jsonl")
+
+    t0 = time.perf_counter()
+    result = sync_assets(assets, client, checkpoint)
+    elapsed = time.perf_counter() - t0
+    if result["auth_error"]:
+        raise SystemExit(f"❌ {result['auth_error']} Check FREEPIK_API_KEY; rerun to resume.")
+
+    enriched = result["enriched"]
     save_json(enriched, out_path)
 
-    print(f"✅ wrote: {out_path}")
+    unresolved_count = sum(1 for a in enriched if not a.get("freepik_resolved"))
+    print(f"✅ wrote: {out_path} ({len(assets)} assets in {elapsed:.1f}s, resumed {result['resumed']})")
     if unresolved_count:
         print(f"⚠️ assets unresolved from Freepik Search API: {unresolved_count}")
 
+    if result["failed"]:
+        print(f"⚠️ {len(result['failed'])} assets failed after retries; rerun to resume: {', '.join(result['failed'])}")
+    else:
+        checkpoint.clear()
+
+    client.print_stats()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,185 @@
+"""
+Index profile auto-tuner.
+
+Builds a scratch collection per index profile (see index_profiles.py), runs the
+golden query set at several search-time hnsw_ef values, and recommends the
+cheapest (profile, hnsw_ef) whose recall@k against exact search meets a target.
+
+The golden set is far below Qdrant's default indexing_threshold, so scratch
+collections are created with force_index and measured only once every vector is
+in the HNSW graph; otherwise "ANN" search would be an exact scan with recall 1.0.
+A profile whose graph isn't built in time is skipped, not measured.
+
+Usage (from module_b/):
+    python tune_index.py --target-recall 0.95 --top-k 5
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import PointStruct
+from sentence_transformers import SentenceTransformer
+
+try:
+    from module_b.index_profiles import PROFILES, create_assets_collection, search_params
+except ImportError:  # run from inside module_b/
+    from index_profiles import PROFILES, create_assets_collection, search_params
+
+MODULE_DIR = Path(__file__).parent
+EMBEDDINGS_FILE = MODULE_DIR / "data" / "assets_embeddings.json"
+GOLDEN_FILE = MODULE_DIR / "data" / "golden_queries.json"
+REPORT_FILE = MODULE_DIR / "data" / "index_tuning_report.json"
+
+EF_GRID = [16, 32, 64, 128, 256]
+
+
+def load_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def wait_for_index(client: QdrantClient, collection_name: str, num_points: int, timeout: float = 60.0) -> bool:
+    """
+    Block until the collection is green and every point is in the HNSW graph.
+    Returns False on timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = client.get_collection(collection_name)
+        indexed = info.indexed_vectors_count or 0
+        if str(info.status).lower().endswith("green") and indexed >= num_points:
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def top_ids(client: QdrantClient, collection_name: str, vector: List[float], k: int, **kwargs) -> List[str]:
+    res = client.query_points(collection_name=collection_name, query=vector, limit=k, **kwargs)
+    return [(p.payload or {}).get("id", str(p.id)) for p in res.points]
+
+
+def evaluate(
+    client: QdrantClient,
+    collection_name: str,
+    query_vectors: List[List[float]],
+    golden: List[Dict[str, Any]],
+    ef: int,
+    k: int,
+) -> Dict[str, Any]:
+    """Measure ANN recall vs exact search, golden hit rate and latency for one ef."""
+    ann_recalls: List[float] = []
+    golden_hits: List[float] = []
+    latencies_ms: List[float] = []
+
+    for vec, item in zip(query_vectors, golden):
+        exact = top_ids(client, collection_name, vec, k, search_params=search_params(exact=True))
+
+        t0 = time.perf_counter()
+        approx = top_ids(client, collection_name, vec, k, search_params=search_params(hnsw_ef=ef))
+        latencies_ms.append((time.perf_counter() - t0) * 1000)
+
+        ann_recalls.append(len(set(approx) & set(exact)) / max(1, len(exact)))
+
+        expected = item.get("expected") or []
+        if expected:
+            golden_hits.append(len(set(approx) & set(expected)) / len(expected))
+
+    latencies_ms.sort()
+    p95_idx = min(len(latencies_ms) - 1, int(round(0.95 * (len(latencies_ms) - 1))))
+    return {
+        "hnsw_ef": ef,
+        "recall_at_k": round(statistics.mean(ann_recalls), 4),
+        "golden_hit_rate": round(statistics.mean(golden_hits), 4) if golden_hits else None,
+        "latency_p50_ms": round(statistics.median(latencies_ms), 3),
+        "latency_p95_ms": round(latencies_ms[p95_idx], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep Qdrant index profiles against a golden query set.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--golden", default=str(GOLDEN_FILE))
+    parser.add_argument("--embeddings", default=str(EMBEDDINGS_FILE))
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--profiles", nargs="*", default=list(PROFILES))
+    parser.add_argument("--ef", nargs="*", type=int, default=EF_GRID)
+    parser.add_argument("--keep", action="store_true", help="Keep scratch collections after tuning")
+    parser.add_argument("--index-timeout", type=float, default=60.0, help="Seconds to wait for each HNSW build")
+    args = parser.parse_args()
+
+    client = QdrantClient(host=args.host, port=args.port)
+
+    embeddings: List[Dict[str, Any]] = load_json(Path(args.embeddings))
+    golden: List[Dict[str, Any]] = load_json(Path(args.golden))
+    dim = len(embeddings[0]["embedding"])
+
+    print(f"Encoding {len(golden)} golden queries...")
+    model = SentenceTransformer("all-MiniLM-L6-v2")
+    query_vectors = [v.tolist() for v in model.encode([g["query"] for g in golden])]
+
+    points = [
+        PointStruct(id=i + 1, vector=e["embedding"], payload={"id": e["id"], "name": e.get("name")})
+        for i, e in enumerate(embeddings)
+    ]
+
+    rows: List[Dict[str, Any]] = []
+    for name in args.profiles:
+        profile = PROFILES[name]
+        collection_name = f"assets__tune_{name.replace('-', '_')}"
+        print(f"\n[{name}] m={profile.m} ef_construct={profile.ef_construct} "
+              f"vectors_on_disk={profile.vectors_on_disk} payload_on_disk={profile.payload_on_disk}")
+
+        t0 = time.perf_counter()
+        create_assets_collection(client, collection_name, dim, profile, recreate=True, force_index=True)
+        client.upsert(collection_name=collection_name, points=points, wait=True)
+        if not wait_for_index(client, collection_name, len(points), args.index_timeout):
+            print(f"  ⚠ HNSW graph not built within {args.index_timeout:.0f}s; skipping {name} "
+                  f"(an unindexed collection only measures exact search)")
+            if not args.keep:
+                client.delete_collection(collection_name=collection_name)
+            continue
+        build_s = time.perf_counter() - t0
+
+        for ef in sorted(args.ef):
+            row = evaluate(client, collection_name, query_vectors, golden, ef, args.top_k)
+            row.update({"profile": name, "cost_rank": profile.cost_rank, "build_s": round(build_s, 3)})
+            rows.append(row)
+            print(f"  ef={ef:<4} recall@{args.top_k}={row['recall_at_k']:.3f} "
+                  f"golden={row['golden_hit_rate']} p50={row['latency_p50_ms']}ms p95={row['latency_p95_ms']}ms")
+
+        if not args.keep:
+            client.delete_collection(collection_name=collection_name)
+
+    # Cheapest = lowest resource cost, then smallest ef, then fastest.
+    passing = [r for r in rows if r["recall_at_k"] >= args.target_recall]
+    passing.sort(key=lambda r: (r["cost_rank"], r["hnsw_ef"], r["latency_p50_ms"]))
+    recommendation = passing[0] if passing else None
+
+    report = {
+        "target_recall": args.target_recall,
+        "top_k": args.top_k,
+        "num_points": len(points),
+        "num_queries": len(golden),
+        "results": rows,
+        "recommendation": recommendation,
+    }
+    REPORT_FILE.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print("\n" + "=" * 60)
+    if recommendation:
+        print(f"✅ Recommended: QDRANT_INDEX_PROFILE={recommendation['profile']} "
+              f"hnsw_ef={recommendation['hnsw_ef']} (recall@{args.top_k}={recommendation['recall_at_k']})")
+    else:
+        print(f"⚠️ No profile reached recall {args.target_recall}; try a larger --ef grid.")
+    print(f"   Report: {REPORT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
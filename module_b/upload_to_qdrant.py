@@ -1,10 +1,12 @@
 import json
+import os
 from pathlib import Path
-<<<<<<< HEAD
 from typing import Any, Dict, List
 
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams, PointStruct
+from qdrant_client.http.models import PointIdsList, PointStruct
+
+from index_profiles import create_assets_collection, get_profile, points_version, stamp_collection_version
 
 
 def load_json(path: Path) -> Any:
@@ -12,6 +14,18 @@ def load_json(path: Path) -> Any:
         return json.load(f)
 
 
+def existing_point_ids(client: QdrantClient, collection_name: str, batch_size: int = 1000) -> List[Any]:
+    """All point ids in the collection (ids only: no payloads or vectors are fetched)."""
+    ids: List[Any] = []
+    offset = None
+    while True:
+        points, offset = client.scroll(collection_name=collection_name, limit=batch_size, offset=offset,
+                                       with_payload=False, with_vectors=False)
+        ids.extend(p.id for p in points)
+        if offset is None:
+            return ids
+
+
 def main() -> None:
     module_dir = Path(__file__).parent
 
@@ -25,25 +39,33 @@ def main() -> None:
         raise FileNotFoundError("assets_embeddings.json not found. Run generate_embeddings.py first.")
 
     assets: List[Dict[str, Any]] = load_json(assets_path)
+    # Point ids are positions in the full asset list, so they stay stable when dedupe drops some assets.
+    indexed = list(enumerate(assets))
+
+    # Skip near-duplicates found by dedupe_previews.py, keeping the (possibly enriched) metadata above.
+    deduped_path = module_dir / "data" / "assets.deduped.json"
+    if deduped_path.exists():
+        kept_ids = {a.get("id") for a in load_json(deduped_path)}
+        print(f"Using dedupe result: {len(kept_ids)}/{len(assets)} assets ({deduped_path.name})")
+        indexed = [(idx, a) for idx, a in indexed if a.get("id") in kept_ids]
     embeddings: List[Dict[str, Any]] = load_json(embeddings_path)
 
     # Map embeddings by id for quick lookup
     emb_map = {e["id"]: e["embedding"] for e in embeddings}
+    dim = len(embeddings[0]["embedding"]) if embeddings else 384
 
     client = QdrantClient(url="http://localhost:6333")
 
     collection_name = "assets"
 
-    # Create collection if missing
-    if not client.collection_exists(collection_name=collection_name):
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=VectorParams(size=384, distance=Distance.COSINE),
-        )
+    # Create collection if missing (QDRANT_RECREATE=1 rebuilds it, e.g. after switching profiles)
+    profile = get_profile()
+    recreate = os.environ.get("QDRANT_RECREATE", "").strip() == "1"
+    create_assets_collection(client, collection_name, dim, profile, recreate=recreate)
 
     points: List[PointStruct] = []
 
-    for idx, a in enumerate(assets):
+    for idx, a in indexed:
         asset_id = a.get("id")
         if not asset_id or asset_id not in emb_map:
             continue
@@ -72,58 +94,19 @@ def main() -> None:
 
     client.upsert(collection_name=collection_name, points=points)
 
-    print(f"✅ Uploaded {len(points)} points to Qdrant collection '{collection_name}'")
-=======
+    # Without a recreate, points from earlier uploads (e.g. assets dedupe now drops) stay searchable.
+    uploaded = {p.id for p in points}
+    stale = [pid for pid in existing_point_ids(client, collection_name) if pid not in uploaded]
+    if stale:
+        client.delete(collection_name=collection_name, points_selector=PointIdsList(points=stale))
+        print(f"🧹 Removed {len(stale)} points no longer in the asset list")
 
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, PointStruct, VectorParams
+    # The retriever keys its result cache by this marker instead of rescanning the collection.
+    stamp_collection_version(client, collection_name, points_version(points))
 
-EMBEDDINGS_PATH = Path("module_b/assets_embeddings.json")
-COLLECTION_NAME = "assets"
-QDRANT_HOST = "localhost"
-QDRANT_PORT = 6333
-
-
-def main() -> None:
-    if not EMBEDDINGS_PATH.exists():
-        raise FileNotFoundError(f"Missing {EMBEDDINGS_PATH}. Run generate_embeddings.py first.")
-
-    data = json.loads(EMBEDDINGS_PATH.read_text(encoding="utf-8"))
-    if not data:
-        raise RuntimeError("assets_embeddings.json is empty.")
-
-    dim = len(data[0]["embedding"])
-    print(f"Embedding dimension: {dim}")
-
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
-
-    client.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
-    )
-    print(f"Recreated collection: {COLLECTION_NAME}")
-
-    points = []
-    for idx, item in enumerate(data):
-        points.append(
-            PointStruct(
-                id=idx,
-                vector=item["embedding"],
-                payload={
-                    "id": item.get("id", ""),
-                    "name": item.get("name", ""),
-                    "category": item.get("category", ""),
-                    "style": item.get("style", ""),
-                    "preview_url": item.get("preview_url", ""),
-                    "freepik_url": item.get("freepik_url", ""),
-                },
-            )
-        )
-
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
-    print(f"Upserted {len(points)} points into Qdrant.")
->>>>>>> origin/main
+    print(f"✅ Uploaded {len(points)} points to Qdrant collection '{collection_name}' (profile: {profile.name})")
+    print(f"   AssetRetriever searches with hnsw_ef={profile.search_hnsw_ef} when QDRANT_INDEX_PROFILE={profile.name}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,316 @@
+"""
+Server-side frame renderer for adJson (the batch counterpart of index.html).
+
+Reads adJson.with_assets.json (or .with_atlas.json), compiles it into a
+timeline (timeline.py: per-frame x, y, scale, rotation, opacity of every element,
+camera zoom included) and draws each frame on the 360x640 scene used by
+index.html. The background is radial. Asset images are drawn "contain" inside the
+element's box, taken from the atlas rect, the assetCatalog entry or the `asset`
+URL, in renderShot's order. Elements without an image get fallback shapes. A
+timeline exported earlier (--timeline timeline.json) can be rendered directly.
+
+Frames are rendered in parallel. Each worker process receives the timeline and
+the decoded images once at start-up, then renders contiguous ranges of frames by
+looking up the transform arrays, writing PNGs. Per-frame render times are
+reported. The sequence can then be assembled into an animated WebP/GIF, or
+handed to ffmpeg when it is installed.
+
+Differences from the browser: box shadows are not drawn, and motions compose with
+an element's centering transform (CSS animations replace it; only the bottle's yaw
+keyframes repeat it) and rise-spin applies both of its animations.
+
+Run from repo root:
+    python -m module_c.render_frames                                   # PNG frames
+    python -m module_c.render_frames --format webp --fps 24 --scale 2
+    python -m module_c.render_frames --video module_c/out/ad.mp4       # needs ffmpeg
+    python -m module_c.render_frames --timeline module_c/out/timeline.json
+"""
+
+import argparse
+import io
+import math
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from module_a.pack_atlas import load_image
+from module_c.timeline import (
+    ADJSON_IN,
+    CAMERA_CYCLE_S,
+    DEFAULT_FPS,
+    SCENE_H,
+    SCENE_W,
+    Timeline,
+    compile_timeline,
+    load_timeline,
+    read_adjson,
+)
+
+OUT_DIR = Path("module_c/out")
+
+# Fallback visuals: (shape, corner radius px, gradient kind, [(offset, "#rrggbb"), ...])
+FALLBACK_STYLE = {
+    "bottle": ("rect", 40, "linear", [(0.0, "#ffbf6d"), (0.4, "#b54b16"), (1.0, "#5a1c06")]),
+    "pineapple": ("rect", 12, "radial", [(0.0, "#ffe699"), (0.4, "#ffbf3f"), (1.0, "#f28a00")]),
+    "ferris-wheel": ("ellipse", 0, "radial", [(0.0, "#ffe9f6"), (0.6, "#ffb6d9"), (1.0, "#ff8fc8")]),
+    "solo-can": ("rect", 16, "linear", [(0.0, "#ffffff"), (0.4, "#ffe3f7"), (1.0, "#ffc8ed")]),
+    "tree": ("ellipse", 0, "radial", [(0.0, "#e9ffef"), (0.4, "#58c978"), (1.0, "#21753c")]),
+    "person": ("rect", 3, "linear", [(0.0, "#333333"), (1.0, "#333333")]),
+}
+BACKGROUND_STOPS = [(0.0, "#ffe0f0"), (0.4, "#ffc0d8"), (0.8, "#f58ab0"), (1.0, "#f58ab0")]
+
+
+# -----------------------------
+# Sprites
+# -----------------------------
+
+def _hex(c: str) -> np.ndarray:
+    return np.array([int(c[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float32)
+
+
+def _gradient(pos: np.ndarray, stops: List[Tuple[float, str]]) -> np.ndarray:
+    offsets = np.array([o for o, _ in stops], dtype=np.float32)
+    colors = np.stack([_hex(c) for _, c in stops])
+    return np.stack([np.interp(pos, offsets, colors[:, i]) for i in range(3)], axis=-1)
+
+
+def _radial_pos(w: int, h: int, cx: float, cy: float) -> np.ndarray:
+    """Distance from (cx, cy) normalized to the farthest corner (CSS default extent)."""
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32) + 0.5
+    far = max(math.hypot(x - cx, y - cy) for x in (0, w) for y in (0, h)) or 1.0
+    return np.hypot(xs - cx, ys - cy) / far
+
+
+def background(scale: float) -> Image.Image:
+    w, h = round(SCENE_W * scale), round(SCENE_H * scale)
+    rgb = _gradient(_radial_pos(w, h, w / 2, 0.0), BACKGROUND_STOPS)
+    return Image.fromarray(rgb.astype(np.uint8), "RGB").convert("RGBA")
+
+
+def fallback_sprite(el_type: str, w: int, h: int, scale: float) -> Optional[Image.Image]:
+    style = FALLBACK_STYLE.get(el_type)
+    if not style or w < 1 or h < 1:
+        return None
+    shape, radius, kind, stops = style
+    if kind == "linear":
+        pos = np.repeat(((np.arange(h, dtype=np.float32) + 0.5) / h)[:, None], w, axis=1)
+    else:
+        pos = _radial_pos(w, h, w / 2, h / 2)
+    rgb = _gradient(pos, stops)
+
+    ys, xs = np.mgrid[0:h, 0:w].astype(np.float32) + 0.5
+    if shape == "ellipse":
+        inside = ((xs - w / 2) / (w / 2)) ** 2 + ((ys - h / 2) / (h / 2)) ** 2 <= 1.0
+    else:
+        r = min(radius * scale, w / 2, h / 2)
+        dx = np.maximum(np.maximum(r - xs, xs - (w - r)), 0)
+        dy = np.maximum(np.maximum(r - ys, ys - (h - r)), 0)
+        inside = dx ** 2 + dy ** 2 <= r ** 2
+    alpha = inside.astype(np.float32) * 255
+    return Image.fromarray(np.dstack([rgb, alpha]).astype(np.uint8), "RGBA")
+
+
+def contain(im: Image.Image, w: int, h: int) -> Image.Image:
+    """background-size: contain; background-position: center, on a transparent w x h canvas."""
+    s = min(w / im.width, h / im.height)
+    fitted = im.resize((max(1, round(im.width * s)), max(1, round(im.height * s))), Image.LANCZOS)
+    canvas = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    canvas.alpha_composite(fitted, ((w - fitted.width) // 2, (h - fitted.height) // 2))
+    return canvas
+
+
+def load_sources(tl: Timeline) -> Dict[str, bytes]:
+    """Decode every image the timeline uses once, as PNG bytes (cheap to ship to workers)."""
+    atlas_im: Optional[Image.Image] = None
+    sources: Dict[str, bytes] = {}
+    for track in tl.tracks:
+        key = track.source
+        if not key or key in sources:
+            continue
+        try:
+            if key.startswith("atlas:"):
+                if atlas_im is None:
+                    atlas_im = load_image(tl.atlas["url"])
+                x, y, w, h = (int(v) for v in key[len("atlas:"):].split(","))
+                im = atlas_im.crop((x, y, x + w, y + h))
+            else:
+                im = load_image(key)
+        except Exception as e:  # a missing image falls back to the CSS shape, like the browser
+            print(f"⚠️ image unavailable, using fallback shape: {key} ({e})", file=sys.stderr)
+            continue
+        buf = io.BytesIO()
+        im.save(buf, "PNG")
+        sources[key] = buf.getvalue()
+    return sources
+
+
+# -----------------------------
+# Frame rendering (worker side)
+# -----------------------------
+
+_ctx: Dict[str, Any] = {}
+
+
+def _init_worker(tl: Timeline, sources: Dict[str, bytes], scale: float) -> None:
+    images = {k: Image.open(io.BytesIO(v)).convert("RGBA") for k, v in sources.items()}
+    sprites: List[Optional[Image.Image]] = []
+    for track in tl.tracks:
+        w, h = max(1, round(track.width * scale)), max(1, round(track.height * scale))
+        if track.source in images:
+            sprites.append(contain(images[track.source], w, h))
+        else:
+            sprites.append(fallback_sprite(track.type, w, h, scale))
+    _ctx.update(timeline=tl, sprites=sprites, scale=scale, background=background(scale))
+
+
+def render_frame(frame_no: int) -> Image.Image:
+    tl: Timeline = _ctx["timeline"]
+    scale, frame = _ctx["scale"], _ctx["background"].copy()
+    values = tl.transforms[:, frame_no]
+
+    for ti in tl.visible(frame_no):
+        sprite = _ctx["sprites"][ti]
+        x, y, sx, sy, rotation, opacity = (float(v) for v in values[ti])
+        if sprite is None or opacity <= 0:
+            continue
+        im = sprite
+        if abs(sx - 1) > 1e-3 or abs(sy - 1) > 1e-3:
+            im = im.resize((max(1, round(im.width * sx)), max(1, round(im.height * sy))), Image.BILINEAR)
+        if rotation:
+            im = im.rotate(-rotation, resample=Image.BICUBIC, expand=True)
+        if opacity < 1:
+            im = im.copy()
+            im.putalpha(im.getchannel("A").point(lambda a: round(a * opacity)))
+        paste_centered(frame, im, x * scale, y * scale)
+    return frame
+
+
+def paste_centered(frame: Image.Image, im: Image.Image, cx: float, cy: float) -> None:
+    """Composite im centered on (cx, cy); what overflows the frame is cropped (overflow: hidden)."""
+    x, y = round(cx - im.width / 2), round(cy - im.height / 2)
+    l, t = max(0, -x), max(0, -y)
+    r, b = min(im.width, frame.width - x), min(im.height, frame.height - y)
+    if r > l and b > t:
+        frame.alpha_composite(im.crop((l, t, r, b)), (x + l, y + t))
+
+
+def render_range(frames: range, out_dir: str) -> List[float]:
+    """Render frames to out_dir/frame_#####.png; returns the render time of each (ms, excluding PNG encode)."""
+    times = []
+    for frame_no in frames:
+        t0 = time.perf_counter()
+        im = render_frame(frame_no).convert("RGB")
+        times.append((time.perf_counter() - t0) * 1000)
+        im.save(os.path.join(out_dir, f"frame_{frame_no:05d}.png"), compress_level=1)
+    return times
+
+
+# -----------------------------
+# Driver
+# -----------------------------
+
+def chunked(n_frames: int, workers: int) -> List[range]:
+    """Contiguous frame ranges (so a worker stays on one or two shots), a few per worker for balance."""
+    n = max(1, min(n_frames, workers * 4))
+    size = -(-n_frames // n)
+    return [range(i, min(i + size, n_frames)) for i in range(0, n_frames, size)]
+
+
+def render(tl: Timeline, frames_dir: Path, scale: float = 1.0, workers: Optional[int] = None) -> Dict[str, Any]:
+    frames_dir.mkdir(parents=True, exist_ok=True)
+    for old in frames_dir.glob("frame_*.png"):
+        old.unlink()
+
+    t0 = time.perf_counter()
+    sources = load_sources(tl)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tl, sources, scale)) as pool:
+        chunks = chunked(tl.n_frames, workers)
+        frame_ms = sorted(ms for part in pool.map(render_range, chunks, [str(frames_dir)] * len(chunks)) for ms in part)
+    elapsed = time.perf_counter() - t0
+    done = len(frame_ms)
+    return {
+        "frames": done,
+        "seconds": round(elapsed, 2),
+        "fps_rendered": round(done / elapsed, 1) if elapsed else None,
+        "duration_s": round(tl.n_frames / tl.fps, 2),
+        "frame_ms_p50": round(frame_ms[done // 2], 2) if done else None,
+        "frame_ms_max": round(frame_ms[-1], 2) if done else None,
+        "frames_dir": str(frames_dir),
+    }
+
+
+def assemble(frames_dir: Path, out_path: Path, fps: int) -> Path:
+    """Animated WebP or GIF from the PNG sequence (format from out_path's suffix)."""
+    files = sorted(frames_dir.glob("frame_*.png"))
+    if not files:
+        raise FileNotFoundError(f"No frames in {frames_dir}")
+    first, *rest = (Image.open(f) for f in files)
+    kwargs: Dict[str, Any] = {"save_all": True, "append_images": rest, "duration": round(1000 / fps), "loop": 0}
+    if out_path.suffix.lower() == ".webp":
+        kwargs.update(quality=80, method=4)
+    else:
+        kwargs.update(optimize=False, disposal=1)
+    first.save(out_path, **kwargs)
+    return out_path
+
+
+def encode_video(frames_dir: Path, out_path: Path, fps: int) -> Optional[Path]:
+    """Encode with ffmpeg (H.264) when it is on PATH; None otherwise."""
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return None
+    cmd = [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-i", str(frames_dir / "frame_%05d.png"),
+           "-c:v", "libx264", "-pix_fmt", "yuv420p", "-vf", "scale=trunc(iw/2)*2:trunc(ih/2)*2", str(out_path)]
+    subprocess.run(cmd, check=True)
+    return out_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render adJson into frames with a process pool.")
+    parser.add_argument("adjson", nargs="?", default=str(ADJSON_IN), help="adJson (bare or wrapped in {adJson: ...})")
+    parser.add_argument("--catalog", help="assetCatalog JSON for elements with assetId")
+    parser.add_argument("--timeline", help="render a timeline.json exported by module_c.timeline instead")
+    parser.add_argument("--out", default=str(OUT_DIR), help="output directory")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--scale", type=float, default=1.0, help="output pixels per scene px (2 = 720x1280)")
+    parser.add_argument("--speed", choices=sorted(CAMERA_CYCLE_S), default="normal")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--format", choices=["png", "webp", "gif"], default="png", help="png = frame sequence only")
+    parser.add_argument("--video", help="also encode this .mp4 with ffmpeg when available")
+    args = parser.parse_args()
+
+    if args.timeline:
+        tl = load_timeline(Path(args.timeline))
+    else:
+        adjson, catalog = read_adjson(Path(args.adjson), args.catalog)
+        tl = compile_timeline(adjson, args.fps, args.speed, catalog)
+
+    out_dir = Path(args.out)
+    frames_dir = out_dir / "frames"
+    summary = render(tl, frames_dir, args.scale, args.workers)
+    print(f"🎞️ {summary['frames']} frames ({summary['duration_s']}s @ {tl.fps}fps) in {summary['seconds']}s "
+          f"= {summary['fps_rendered']} frames/s, {summary['frame_ms_p50']}ms/frame p50, "
+          f"{summary['frame_ms_max']}ms max -> {frames_dir}")
+
+    if args.format != "png":
+        print("✅ wrote:", assemble(frames_dir, out_dir / f"ad.{args.format}", tl.fps))
+    if args.video:
+        video = encode_video(frames_dir, Path(args.video), tl.fps)
+        if video:
+            print("✅ wrote:", video)
+        else:
+            print("⚠️ ffmpeg not found; skipped video encode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Scene timeline compiler: adJson -> dense per-frame transform arrays.
+
+index.html and render_frames.py used to work out element motion from preset names
+on every frame. compile_timeline() does it once for the whole ad, at a target
+fps, with NumPy. It covers every shot and duration, the camera zoom and every
+element's motion. A renderer then only looks values up, so frame cost no longer
+depends on which motions are in play.
+
+Layout:
+- One track per element identity (id + type + image), in first-appearance order.
+  An element that stays in consecutive shots keeps its track, and its motion
+  carries on instead of restarting.
+- transforms[track, frame] = (x, y, scale_x, scale_y, rotation, opacity):
+  - x, y: box center in scene px, camera applied.
+  - scale_x, scale_y: box scale. scale_x includes the yaw foreshortening.
+  - rotation: degrees clockwise.
+  - opacity: 0 while the element is not on screen.
+- shots[i]["tracks"] lists the shot's tracks in paint order.
+
+export_timeline() writes <name>.json (metadata, tracks, shots) plus <name>.bin.
+The .bin holds little-endian float32 values for each track's on-screen frames
+only, as [frame][field] starting at track["offset"] (in floats). A browser can
+read it with one fetch and a Float32Array. load_timeline() reads it back.
+
+Run from repo root:
+    python -m module_c.timeline                                        # module_c/out/timeline.{json,bin}
+    python -m module_c.timeline module_a/out/adJson.with_atlas.json --fps 60 --speed fast
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ADJSON_IN = Path("module_a/out/adJson.with_assets.json")
+OUT_DIR = Path("module_c/out")
+FORMAT_VERSION = 1
+
+SCENE_W, SCENE_H = 360, 640
+DEFAULT_FPS = 30
+DEFAULT_DURATION_MS = 2200  # same per-shot default as module_a/generate_adjson.py
+CAMERA_CYCLE_S = {"normal": 9.0, "fast": 6.0}  # .cam-slow / .cam-fast
+CAMERA_ZOOM = 0.06
+FIELDS = ("x", "y", "scale_x", "scale_y", "rotation", "opacity")
+
+# -----------------------------
+# Scene description (mirrors the CSS in index.html)
+# -----------------------------
+
+# Element box sizes (px); types without a CSS size are not visible in the browser either.
+ELEMENT_BOX = {
+    "bottle": (120, 320),
+    "pineapple": (40, 40),
+    "ferris-wheel": (120, 120),
+    "solo-can": (40, 70),
+    "tree": (28, 28),
+    "person": (6, 12),
+}
+
+# Types / presets whose box is centered on its anchor (translate(-50%, -50%)).
+CENTERED_TYPES = {"bottle"}
+CENTERED_PRESETS = {"pos-bottle-center"}
+
+# presetPosition -> (left %, top %, right %, bottom %), None where the CSS leaves it unset.
+PRESET_POSITIONS = {
+    "pos-bottle-center": (50, 52, None, None),
+    "pos-wheel-right": (None, 36, -6, None),
+    "pos-solo-can-left": (10, None, None, 14),
+    "pos-tree-1": (23, 72, None, None),
+    "pos-person-1": (28, 80, None, None),
+}
+
+
+# -----------------------------
+# Easing, motion presets, camera
+# -----------------------------
+
+def ease_in_out(x: np.ndarray) -> np.ndarray:
+    """CSS ease-in-out, cubic-bezier(0.42, 0, 0.58, 1), solved with Newton steps."""
+    x = np.clip(np.asarray(x, dtype=np.float64), 0.0, 1.0)
+    u = x.copy()
+    for _ in range(8):
+        bx = 3 * (1 - u) ** 2 * u * 0.42 + 3 * (1 - u) * u ** 2 * 0.58 + u ** 3
+        dx = 3 * (1 - u) ** 2 * 0.42 + 6 * (1 - u) * u * (0.58 - 0.42) + 3 * u ** 2 * (1 - 0.58)
+        u = np.clip(u - (bx - x) / np.maximum(dx, 1e-6), 0.0, 1.0)
+    return 3 * (1 - u) * u ** 2 + u ** 3
+
+
+def _there_and_back(t: np.ndarray, period: float) -> np.ndarray:
+    """0 -> 1 -> 0 over one period, eased per half (keyframes 0% / 50% / 100%)."""
+    f = (t / period) % 1.0
+    return np.where(f < 0.5, ease_in_out(f * 2), 1 - ease_in_out(f * 2 - 1))
+
+
+def motion_transform(motion: Optional[str], t: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Transform of one motion preset over time: dx, dy (px), rotation (deg, clockwise),
+    scale_x. t is seconds since the element appeared.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    zero = np.zeros_like(t)
+    out = {"dx": zero, "dy": zero, "rotation": zero, "scale_x": np.ones_like(t)}
+    if motion == "yaw":  # rotateY(-3deg) <-> rotateY(3deg), 4s alternate
+        cycle = t / 4.0
+        f = ease_in_out(cycle % 1.0)
+        f = np.where(np.floor(cycle) % 2 == 0, f, 1 - f)
+        out["scale_x"] = np.cos(np.radians(-3 + 6 * f))
+    elif motion == "float":
+        out["dy"] = -6 * _there_and_back(t, 3.0)
+    elif motion == "rotate-wheel":
+        out["rotation"] = 360 * ((t / 20.0) % 1.0)
+    elif motion == "rise-spin":
+        out["dy"] = -80 * _there_and_back(t, 9.0)
+        out["rotation"] = 360 * ((t / 4.0) % 1.0)
+    elif motion == "sway":
+        out["dx"] = 2 * _there_and_back(t, 2.4)
+    return out
+
+
+def camera_scale(t: np.ndarray, speed: str = "normal", movement: Optional[str] = None) -> np.ndarray:
+    """
+    Zoom of scene-inner over ad time t. The zoom runs across shots like the CSS
+    animation. "static" holds at 1.0, a "zoom-out" movement runs 1.06 -> 1.0,
+    and anything else (the default "slow-zoom-in") runs 1.0 -> 1.06.
+    """
+    phase = (np.asarray(t, dtype=np.float64) / CAMERA_CYCLE_S[speed]) % 1.0
+    movement = (movement or "").lower()
+    if movement == "static":
+        return np.ones_like(phase)
+    if "zoom-out" in movement:
+        phase = 1.0 - phase
+    return 1.0 + CAMERA_ZOOM * phase
+
+
+def element_box(el: Dict[str, Any]) -> Optional[Tuple[float, float, float, float]]:
+    """(left, top, width, height) of the element's box in scene px, or None if it has no size."""
+    size = ELEMENT_BOX.get(el.get("type"))
+    if not size:
+        return None
+    w, h = size
+    left = top = 0.0
+    preset = PRESET_POSITIONS.get(el.get("presetPosition") or "")
+    if preset:
+        pl, pt, pr, pb = preset
+        if pl is not None:
+            left = pl / 100 * SCENE_W
+        elif pr is not None:
+            left = SCENE_W - pr / 100 * SCENE_W - w
+        if pt is not None:
+            top = pt / 100 * SCENE_H
+        elif pb is not None:
+            top = SCENE_H - pb / 100 * SCENE_H - h
+    # Inline left/top from `position` beat the preset class
+    pos = el.get("position") or {}
+    if "x" in pos:
+        left = float(pos["x"]) / 100 * SCENE_W
+    if "y" in pos:
+        top = float(pos["y"]) / 100 * SCENE_H
+    if el.get("type") in CENTERED_TYPES or el.get("presetPosition") in CENTERED_PRESETS:
+        left, top = left - w / 2, top - h / 2
+    return left, top, float(w), float(h)
+
+
+def element_source(el: Dict[str, Any], catalog: Dict[str, Any], atlas: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Key for the element's image: "atlas:x,y,w,h", a catalog URL or its asset URL (renderShot's order)."""
+    if atlas and el.get("atlas"):
+        r = el["atlas"]
+        return f"atlas:{r['x']},{r['y']},{r['w']},{r['h']}"
+    if el.get("assetId") and el["assetId"] in catalog:
+        return catalog[el["assetId"]].get("url")
+    return el.get("asset")
+
+
+# -----------------------------
+# Compiled timeline
+# -----------------------------
+
+@dataclass
+class Track:
+    id: str
+    type: str
+    source: Optional[str]
+    width: float
+    height: float
+
+
+@dataclass
+class Timeline:
+    fps: int
+    shot_index: np.ndarray  # (frames,) int16: shot on screen at each frame
+    transforms: np.ndarray  # (tracks, frames, len(FIELDS)) float32
+    tracks: List[Track]
+    shots: List[Dict[str, Any]]  # {"id", "start", "frames", "tracks": [paint order]}
+    atlas: Optional[Dict[str, Any]] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def n_frames(self) -> int:
+        return int(self.shot_index.shape[0])
+
+    def values(self, name: str) -> np.ndarray:
+        """(tracks, frames) view of one transform field."""
+        return self.transforms[:, :, FIELDS.index(name)]
+
+    def visible(self, frame: int) -> List[int]:
+        """Tracks on screen at frame, in paint order."""
+        return self.shots[int(self.shot_index[frame])]["tracks"]
+
+
+def compile_timeline(
+    adjson: Dict[str, Any],
+    fps: int = DEFAULT_FPS,
+    speed: str = "normal",
+    catalog: Optional[Dict[str, Any]] = None,
+) -> Timeline:
+    catalog = catalog or {}
+    atlas = adjson.get("atlas")
+    shots_in = adjson.get("shots") or []
+
+    # Frame ranges per shot
+    starts, counts = [], []
+    for shot in shots_in:
+        duration = (shot.get("duration") or DEFAULT_DURATION_MS) / 1000.0
+        starts.append(sum(counts))
+        counts.append(max(1, round(duration * fps)))
+    n_frames = sum(counts)
+
+    # Tracks: one per element identity; elements without a box are invisible and get none
+    tracks: List[Track] = []
+    track_of: Dict[Tuple[str, str, Optional[str]], int] = {}
+    placements: List[Tuple[int, int, Dict[str, Any]]] = []  # (shot, track, element)
+    shots: List[Dict[str, Any]] = []
+    for si, shot in enumerate(shots_in):
+        order = []
+        for i, el in enumerate(shot.get("elements") or []):
+            box = element_box(el)
+            if not box:
+                continue
+            # Elements without an id are keyed by position, like index.html's `#${i}`.
+            eid = str(el["id"]) if el.get("id") is not None else f"#{i}"
+            key = (eid, el["type"], element_source(el, catalog, atlas))
+            if key not in track_of:
+                track_of[key] = len(tracks)
+                tracks.append(Track(id=key[0], type=key[1], source=key[2], width=box[2], height=box[3]))
+            if track_of[key] in order:  # duplicate id within a shot: first one wins, as with refs[el.id]
+                continue
+            order.append(track_of[key])
+            placements.append((si, track_of[key], el))
+        shots.append({"id": shot.get("id", si + 1), "start": starts[si], "frames": counts[si], "tracks": order})
+
+    shot_index = np.repeat(np.arange(len(shots_in), dtype=np.int16), counts)
+    t_ad = np.arange(n_frames, dtype=np.float64) / fps
+    cams = [camera_scale(t_ad[starts[si]:starts[si] + counts[si]], speed, (shot.get("camera") or {}).get("movement"))
+            for si, shot in enumerate(shots_in)]
+
+    transforms = np.zeros((len(tracks), n_frames, len(FIELDS)), dtype=np.float32)
+    appeared: Dict[int, int] = {}  # track -> frame its current run of consecutive shots started
+    last_shot: Dict[int, int] = {}
+    cx0, cy0 = SCENE_W / 2, SCENE_H / 2
+    for si, ti, el in placements:
+        f0, n = starts[si], counts[si]
+        if last_shot.get(ti) != si - 1:
+            appeared[ti] = f0
+        last_shot[ti] = si
+
+        m = motion_transform(el.get("motion"), (np.arange(f0, f0 + n) - appeared[ti]) / fps)
+        left, top, w, h = element_box(el)
+        cam = cams[si]
+        out = transforms[ti, f0:f0 + n]
+        out[:, 0] = cx0 + cam * (left + w / 2 + m["dx"] - cx0)
+        out[:, 1] = cy0 + cam * (top + h / 2 + m["dy"] - cy0)
+        out[:, 2] = cam * np.abs(m["scale_x"])
+        out[:, 3] = cam
+        out[:, 4] = m["rotation"] % 360
+        out[:, 5] = 1.0
+
+    return Timeline(fps=fps, shot_index=shot_index, transforms=transforms, tracks=tracks, shots=shots,
+                    atlas=atlas, meta={"speed": speed, "scene": [SCENE_W, SCENE_H]})
+
+
+# -----------------------------
+# Export / import
+# -----------------------------
+
+def export_timeline(tl: Timeline, out_dir: Path, name: str = "timeline") -> Tuple[Path, Path]:
+    """Write <name>.json + <name>.bin (each track's on-screen frames only)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    json_path, bin_path = out_dir / f"{name}.json", out_dir / f"{name}.bin"
+
+    opacity = tl.values("opacity")
+    tracks_out, chunks, offset = [], [], 0
+    for ti, track in enumerate(tl.tracks):
+        on = np.flatnonzero(opacity[ti] > 0)
+        first, last = (int(on[0]), int(on[-1]) + 1) if on.size else (0, 0)
+        chunk = np.ascontiguousarray(tl.transforms[ti, first:last], dtype="<f4")
+        tracks_out.append({"id": track.id, "type": track.type, "source": track.source,
+                           "width": track.width, "height": track.height,
+                           "first": first, "frames": last - first, "offset": offset})
+        chunks.append(chunk)
+        offset += chunk.size
+
+    with bin_path.open("wb") as f:
+        for chunk in chunks:
+            f.write(chunk.tobytes())
+    doc = {
+        "version": FORMAT_VERSION,
+        "fps": tl.fps,
+        "frames": tl.n_frames,
+        "fields": list(FIELDS),
+        "binary": bin_path.name,
+        "atlas": tl.atlas,
+        "meta": tl.meta,
+        "shots": tl.shots,
+        "tracks": tracks_out,
+    }
+    json_path.write_text(json.dumps(doc, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    return json_path, bin_path
+
+
+def load_timeline(json_path: Path) -> Timeline:
+    doc = json.loads(json_path.read_text(encoding="utf-8"))
+    if doc.get("version") != FORMAT_VERSION or doc.get("fields") != list(FIELDS):
+        raise ValueError(f"Unsupported timeline format in {json_path}")
+    flat = np.fromfile(json_path.parent / doc["binary"], dtype="<f4")
+
+    n_frames, k = doc["frames"], len(FIELDS)
+    transforms = np.zeros((len(doc["tracks"]), n_frames, k), dtype=np.float32)
+    tracks = []
+    for ti, t in enumerate(doc["tracks"]):
+        size = t["frames"] * k
+        transforms[ti, t["first"]:t["first"] + t["frames"]] = flat[t["offset"]:t["offset"] + size].reshape(-1, k)
+        tracks.append(Track(id=t["id"], type=t["type"], source=t["source"], width=t["width"], height=t["height"]))
+
+    shot_index = np.zeros(n_frames, dtype=np.int16)
+    for si, shot in enumerate(doc["shots"]):
+        shot_index[shot["start"]:shot["start"] + shot["frames"]] = si
+    return Timeline(fps=doc["fps"], shot_index=shot_index, transforms=transforms, tracks=tracks,
+                    shots=doc["shots"], atlas=doc.get("atlas"), meta=doc.get("meta") or {})
+
+
+def read_adjson(path: Path, catalog_path: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(adJson, assetCatalog) from a bare adJson or a {adJson, assetCatalog} document."""
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    adjson = doc.get("adJson", doc)
+    catalog = doc.get("assetCatalog") or {}
+    if catalog_path:
+        catalog = json.loads(Path(catalog_path).read_text(encoding="utf-8"))
+    if not adjson.get("shots"):
+        raise ValueError(f"adJson has no shots: {path}")
+    return adjson, catalog
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile adJson into per-frame transform arrays.")
+    parser.add_argument("adjson", nargs="?", default=str(ADJSON_IN), help="adJson (bare or wrapped in {adJson: ...})")
+    parser.add_argument("--catalog", help="assetCatalog JSON for elements with assetId")
+    parser.add_argument("--out", default=str(OUT_DIR), help="output directory")
+    parser.add_argument("--name", default="timeline", help="basename of the .json/.bin pair")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--speed", choices=sorted(CAMERA_CYCLE_S), default="normal")
+    args = parser.parse_args()
+
+    adjson, catalog = read_adjson(Path(args.adjson), args.catalog)
+    t0 = time.perf_counter()
+    tl = compile_timeline(adjson, args.fps, args.speed, catalog)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    json_path, bin_path = export_timeline(tl, Path(args.out), args.name)
+
+    print(f"🧮 {len(tl.shots)} shots, {len(tl.tracks)} tracks, {tl.n_frames} frames @ {tl.fps}fps "
+          f"compiled in {elapsed_ms:.1f}ms", file=sys.stderr)
+    print(f"✅ wrote: {json_path} ({json_path.stat().st_size} B) + {bin_path} ({bin_path.stat().st_size} B)")
+
+
+if __name__ == "__main__":
+    main()
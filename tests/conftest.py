@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+# module_a is imported as a package from the repo root; module_b's scripts use
+# bare imports because they are run from inside module_b/.
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "module_b"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
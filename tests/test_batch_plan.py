@@ -0,0 +1,84 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from module_a import batch_plan, generate_adjson
+from module_a.shot_plan_cache import ShotPlanCache
+from module_a.stub_llm import StubGenerativeModel
+
+
+JOBS = [
+    {"id": "a", "brief": "Brand: Lumen; Product: desk lamp", "shot_count": 3},
+    {"id": "b", "brief": "Brand: Aqua; Product: water bottle", "shot_count": 4},
+    {"id": "c", "brief": "Brand: Volt; Product: sneakers", "shot_count": 2},
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_models(monkeypatch):
+    monkeypatch.setattr(generate_adjson, "_models", {})
+    monkeypatch.delenv("GEMINI_STUB", raising=False)
+
+
+def run(jobs, **kwargs):
+    out = io.StringIO()
+    summary = asyncio.run(batch_plan.run_batch(jobs, out, **kwargs))
+    return summary, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_stub_model_plans_every_brief_labelled_stub():
+    summary, results = run(JOBS, concurrency=2, model=StubGenerativeModel(latency_s=0.01, failure_rate=0))
+
+    assert summary["briefs"] == len(JOBS)
+    assert summary["sources"] == {"stub": len(JOBS)}
+    assert sorted(r["id"] for r in results) == ["a", "b", "c"]
+    for r in results:
+        assert "error" not in r
+        assert len(r["shot_plan"]["shots"]) == r["shot_count"]
+        assert r["adJson"]
+
+
+def test_gemini_stub_env_is_labelled_stub(monkeypatch):
+    monkeypatch.setenv("GEMINI_STUB", "1")
+    monkeypatch.setenv("GEMINI_STUB_FAILURE_RATE", "0")
+
+    summary, _ = run(JOBS)
+
+    assert summary["sources"] == {"stub": len(JOBS)}
+
+
+def test_missing_api_key_falls_back_per_brief(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+    summary, results = run(JOBS)
+
+    assert summary["sources"] == {"stub": len(JOBS)}
+    assert all("GEMINI_API_KEY" in r["error"] for r in results)
+
+
+class RealModel(StubGenerativeModel):
+    """Answers like the stub but stands in for Gemini (not flagged as a stub)."""
+
+    is_stub = False
+
+
+def test_cached_plans_skip_the_model(tmp_path):
+    cache = ShotPlanCache(tmp_path)
+    run(JOBS, model=RealModel(failure_rate=0), cache=cache)
+
+    summary, _ = run(JOBS, model=RealModel(failure_rate=1.0), cache=cache)
+
+    assert summary["sources"] == {"cache": len(JOBS)}
+
+
+def test_stub_plans_are_not_served_to_gemini(tmp_path, monkeypatch):
+    cache = ShotPlanCache(tmp_path)
+    run(JOBS, model=StubGenerativeModel(failure_rate=0), cache=cache)
+    monkeypatch.setenv("GEMINI_STUB", "1")
+    run(JOBS, cache=cache)
+
+    summary, _ = run(JOBS, model=RealModel(failure_rate=0), cache=cache)
+
+    assert summary["sources"] == {"gemini": len(JOBS)}
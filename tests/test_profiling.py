@@ -0,0 +1,26 @@
+import cProfile
+import pstats
+
+from module_a.profiling import collapse_pstats
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def test_calls_inside_an_enabled_block_are_collapsed():
+    # Like profile_section: the profiler starts inside a frame it never saw entered,
+    # so fib's only recorded caller is itself.
+    prof = cProfile.Profile()
+    prof.enable()
+    for _ in range(3):
+        fib(20)
+    prof.disable()
+
+    stats = pstats.Stats(prof)
+    folded = collapse_pstats(stats)
+    fib_us = sum(v for stack, v in folded.items() if stack.split(";")[-1].startswith("fib "))
+    fib_tt = next(tt for func, (_, _, tt, _, _) in stats.stats.items() if func[2] == "fib")
+
+    assert fib_us > 0
+    assert fib_us == int(fib_tt * 1e6)
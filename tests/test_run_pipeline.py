@@ -0,0 +1,31 @@
+import json
+
+from module_b.demo_qdrant import qdrant_topk_fallback
+from module_b.freepik_client import freepik_search_stub
+from module_b.run_pipeline import CATALOG_PATH, METADATA_PATH, enrich_candidates
+
+RING_QUERY = "ring / ferris wheel structure, clean dreamy style"
+
+
+def load_catalog():
+    catalog = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    metadata = {a["id"]: a for a in json.loads(METADATA_PATH.read_text(encoding="utf-8")) if a.get("id")}
+    return catalog, metadata
+
+
+def test_candidates_pick_up_asset_metadata():
+    catalog, metadata = load_catalog()
+    candidates = enrich_candidates(freepik_search_stub(RING_QUERY), catalog, metadata)
+
+    ring = next(c for c in candidates if c["asset_id"] == "ring_basic")
+    assert ring["name"] and ring["tags"]
+
+
+def test_ring_query_ranks_ring_first():
+    catalog, metadata = load_catalog()
+    candidates = enrich_candidates(freepik_search_stub(RING_QUERY), catalog, metadata)
+
+    topk, selected = qdrant_topk_fallback(RING_QUERY, candidates, k=5)
+
+    assert topk[0]["asset_id"] == "ring_basic"
+    assert selected["asset_id"] == "ring_basic"
@@ -0,0 +1,82 @@
+import pytest
+
+import sync_freepik_metadata as sync
+from freepik_api import FreepikClient
+from mock_freepik_server import MockConfig, assets_from_catalog, start_in_thread
+from rate_limit import TokenBucket
+
+
+@pytest.fixture
+def mock_api():
+    servers = []
+
+    def start(**overrides):
+        config = MockConfig(catalog_size=overrides.pop("catalog_size", 12), **overrides)
+        server, base_url = start_in_thread(config)
+        servers.append(server)
+        return server, base_url, assets_from_catalog(server.state.catalog, base_url)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def search_counts(server):
+    return server.state.stats()["routes"].get("search", {})
+
+
+def test_429_retry_after_penalizes_limiter(mock_api, tmp_path):
+    server, base_url, assets = mock_api(rate_limit_rps=4, retry_after=0.2)
+    client = FreepikClient(api_key="mock", base_url=f"{base_url}/v1")
+    limiter = TokenBucket(rate=50, capacity=50)
+
+    result = sync.sync_assets(assets, client, sync.Checkpoint(str(tmp_path / "ckpt.jsonl")), workers=4, limiter=limiter)
+
+    assert search_counts(server).get("429", 0) > 0
+    assert limiter.throttle_events > 0
+    assert result["failed"] == []
+    assert all(a["freepik_resolved"] for a in result["enriched"])
+
+
+def test_503_is_retried_with_backoff(mock_api, tmp_path, monkeypatch):
+    server, base_url, assets = mock_api(error_rate=0.3)
+    # No transport retries, so every 503 reaches search_with_retry; shrink its backoff.
+    client = FreepikClient(api_key="mock", base_url=f"{base_url}/v1", max_retries=0)
+    monkeypatch.setattr(sync, "backoff_delay", lambda attempt: 0.01)
+
+    result = sync.sync_assets(assets, client, sync.Checkpoint(str(tmp_path / "ckpt.jsonl")), workers=4,
+                              limiter=TokenBucket(rate=100, capacity=100))
+
+    assert search_counts(server).get("503", 0) > 0
+    assert result["failed"] == []
+    assert [a["id"] for a in result["enriched"]] == [a["id"] for a in assets]
+
+
+def test_checkpoint_resume_skips_finished_assets(mock_api, tmp_path):
+    server, base_url, assets = mock_api()
+    client = FreepikClient(api_key="mock", base_url=f"{base_url}/v1")
+    checkpoint = sync.Checkpoint(str(tmp_path / "ckpt.jsonl"))
+    half = len(assets) // 2
+
+    sync.sync_assets(assets[:half], client, checkpoint, limiter=TokenBucket(rate=100, capacity=100))
+    first_run = search_counts(server).get("200", 0)
+    result = sync.sync_assets(assets, client, checkpoint, limiter=TokenBucket(rate=100, capacity=100))
+
+    assert first_run == half
+    assert result["resumed"] == half
+    assert search_counts(server).get("200", 0) - first_run == len(assets) - half
+    assert result["failed"] == []
+
+
+def test_auth_error_stops_the_run(mock_api, tmp_path):
+    server, base_url, assets = mock_api(catalog_size=30)
+    client = FreepikClient(api_key="", base_url=f"{base_url}/v1")
+
+    result = sync.sync_assets(assets, client, sync.Checkpoint(str(tmp_path / "ckpt.jsonl")), workers=2,
+                              limiter=TokenBucket(rate=100, capacity=100))
+
+    assert "invalid or lacks permission" in result["auth_error"]
+    assert sorted(result["failed"]) == sorted(a["id"] for a in assets)
+    # Queued assets were cancelled rather than each hitting the API.
+    assert search_counts(server).get("401", 0) < len(assets)